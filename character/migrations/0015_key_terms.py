@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-16 20:55
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "character",
+            "0014_character_related_characters_character_related_items_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="character",
+            name="key_terms",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=255),
+                blank=True,
+                default=list,
+                editable=False,
+                size=None,
+            ),
+        ),
+        migrations.AddField(
+            model_name="character",
+            name="key_terms_digest",
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.3 on 2026-10-16 20:56
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("item", "0011_artifact_related_artifacts_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="artifact",
+            name="key_terms",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=255),
+                blank=True,
+                default=list,
+                editable=False,
+                size=None,
+            ),
+        ),
+        migrations.AddField(
+            model_name="artifact",
+            name="key_terms_digest",
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+        migrations.AddField(
+            model_name="item",
+            name="key_terms",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=255),
+                blank=True,
+                default=list,
+                editable=False,
+                size=None,
+            ),
+        ),
+        migrations.AddField(
+            model_name="item",
+            name="key_terms_digest",
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.conf import settings
 
 OPENAI_API_KEY = settings.OPENAI_API_KEY
+OPENAI_BASE_URL = settings.OPENAI_BASE_URL
 
 
 def openai_summarize_text(text):
@@ -10,7 +11,7 @@ def openai_summarize_text(text):
     """
     from openai import OpenAI
 
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
 
     # text = (
     #     "Given the following game log from a game of dungeons and dragons, "
@@ -64,7 +65,7 @@ def openai_summarize_text_chat(text):
     """
     from openai import OpenAI
 
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
 
     # text = (
     #     "Given the following game log from a role playing game, "
@@ -114,7 +115,7 @@ def openai_titles_from_text_chat(text):
     """
     from openai import OpenAI
 
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
 
     text = (
         '''
@@ -172,7 +173,7 @@ def openai_shorten_text(text, percent=70, max_tokens=2000):
     """
     from openai import OpenAI
 
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
 
     text = (
         f"Make the following text {percent}% shorter without losing any content. Especially be sure not to leave out any characters, places, items, etc. Text: "
@@ -0,0 +1,77 @@
+"""
+The owner rule for Alias.entity_content_type / entity_object_id, shared by the
+m2m signal handlers, migration 0028 and the backfill_alias_entities command.
+
+An alias linked to several entities belongs to the first link in
+ALIAS_ENTITY_MODELS order (the order Alias.entity probes them), lowest
+through-row id first; an alias with no link has no owner. The functions take an
+app registry so the migration can pass its historical one.
+"""
+
+ALIAS_ENTITY_MODELS = [
+    "character.Character",
+    "place.Place",
+    "item.Item",
+    "item.Artifact",
+    "association.Association",
+    "race.Race",
+]
+
+
+def iter_alias_links(apps, alias_ids=None):
+    """
+    Yield (alias_id, content_type_id, entity_id) for every alias link, in
+    owner precedence order. alias_ids limits the aliases looked at.
+    """
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    for label in ALIAS_ENTITY_MODELS:
+        model = apps.get_model(label)
+        field = model._meta.get_field("aliases")
+        alias_column = field.m2m_reverse_field_name() + "_id"
+        rows = field.remote_field.through.objects.order_by("pk")
+        if alias_ids is not None:
+            rows = rows.filter(**{f"{alias_column}__in": alias_ids})
+        content_type_id = None
+        for alias_id, entity_id in rows.values_list(
+            alias_column, field.m2m_field_name() + "_id"
+        ):
+            if content_type_id is None:
+                content_type_id = ContentType.objects.get_for_model(model).pk
+            yield alias_id, content_type_id, entity_id
+
+
+def stale_alias_owners(apps, alias_ids=None):
+    """
+    Aliases whose stored owner differs from the owner rule, with the correct
+    owner set but not saved. Returns (aliases, conflicts), where conflicts
+    counts the links that lost to an earlier one.
+    """
+    Alias = apps.get_model("nucleus", "Alias")
+    owners = {}  # alias_id -> (content_type_id, entity_id)
+    conflicts = 0
+    for alias_id, content_type_id, entity_id in iter_alias_links(apps, alias_ids):
+        if alias_id in owners:
+            conflicts += 1
+            continue
+        owners[alias_id] = (content_type_id, entity_id)
+
+    aliases = Alias.objects.only("id", "entity_content_type_id", "entity_object_id")
+    if alias_ids is not None:
+        aliases = aliases.filter(pk__in=alias_ids)
+    stale = []
+    for alias in aliases:
+        owner = owners.get(alias.pk, (None, None))
+        if (alias.entity_content_type_id, alias.entity_object_id) != owner:
+            alias.entity_content_type_id, alias.entity_object_id = owner
+            stale.append(alias)
+    return stale, conflicts
+
+
+def update_alias_owners(apps, alias_ids=None):
+    """Apply the owner rule to the given aliases (default all); returns them."""
+    Alias = apps.get_model("nucleus", "Alias")
+    stale, _ = stale_alias_owners(apps, alias_ids)
+    Alias.objects.bulk_update(
+        stale, ["entity_content_type", "entity_object_id"], batch_size=500
+    )
+    return stale
@@ -7,3 +7,5 @@ class NucleusConfig(AppConfig):
     
     def ready(self):
         import nucleus.signals  # noqa
+
+        nucleus.signals.connect_entity_signals()
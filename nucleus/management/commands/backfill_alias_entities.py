@@ -0,0 +1,37 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from nucleus.alias_owners import stale_alias_owners
+from nucleus.models import Alias
+
+
+class Command(BaseCommand):
+    help = "Set each Alias's entity_content_type/entity_object_id from the entities' aliases M2M"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change without writing",
+        )
+
+    def handle(self, *args, **options):
+        to_update, conflicts = stale_alias_owners(apps)
+
+        orphaned = sum(1 for a in to_update if a.entity_content_type_id is None)
+        self.stdout.write(
+            f"{len(to_update)} aliases to update ({orphaned} orphaned), "
+            f"{conflicts} aliases linked to more than one entity (first link kept)"
+        )
+
+        if options["dry_run"]:
+            return
+
+        with transaction.atomic():
+            Alias.objects.bulk_update(
+                to_update,
+                ["entity_content_type", "entity_object_id"],
+                batch_size=500,
+            )
+        self.stdout.write(self.style.SUCCESS(f"Updated {len(to_update)} aliases"))
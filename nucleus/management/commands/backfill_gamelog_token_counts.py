@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from nucleus.models import GameLog
+
+
+class Command(BaseCommand):
+    help = "Compute stored token counts for GameLog full_text/summary"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Recount every log, even if its stored counts are current",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="Logs written per bulk_update",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        logs = GameLog.objects.only("id", "token_counts", *GameLog.TOKEN_COUNTED_FIELDS)
+
+        updated = 0
+        batch = []
+        for log in logs.iterator(chunk_size=batch_size):
+            before = log.token_counts
+            if options["force"]:
+                log.token_counts = {}
+            log.refresh_token_counts()
+            if log.token_counts != before:
+                batch.append(log)
+            if len(batch) >= batch_size:
+                updated += self._write(batch)
+                batch = []
+        if batch:
+            updated += self._write(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated token counts for {updated} logs")
+        )
+
+    def _write(self, batch):
+        with transaction.atomic():
+            GameLog.objects.bulk_update(batch, ["token_counts"])
+        return len(batch)
@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Report database connection pool settings and statistics, and the "
+        "server's connections by application and state"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument(
+            "--checkouts",
+            type=int,
+            default=0,
+            help="Check out this many connections concurrently first, to "
+            "exercise the pool (its statistics are per process)",
+        )
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        connection = connections[alias]
+        pool = getattr(connection, "pool", None)
+
+        if pool is None:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Pooling is disabled for '{alias}' "
+                    f"(CONN_MAX_AGE={connection.settings_dict['CONN_MAX_AGE']})"
+                )
+            )
+        else:
+            pool_options = connection.settings_dict["OPTIONS"]["pool"]
+            self.stdout.write(self.style.SUCCESS(f"Pool '{alias}'"))
+            for key, value in sorted(pool_options.items()):
+                self.stdout.write(f"  {key:<22} {value}")
+            self.stdout.write(
+                f"  {'health_checks':<22} "
+                f"{connection.settings_dict['CONN_HEALTH_CHECKS']}"
+            )
+
+            if options["checkouts"]:
+                self._exercise(alias, options["checkouts"])
+
+            connection.ensure_connection()
+            self.stdout.write(self.style.SUCCESS("\nPool statistics (this process)"))
+            for key, value in sorted(pool.get_stats().items()):
+                self.stdout.write(f"  {key:<22} {value}")
+
+        self._server_connections(connection)
+
+    def _exercise(self, alias, count):
+        def _checkout():
+            with connections[alias].cursor() as cursor:
+                cursor.execute("SELECT pg_sleep(0.05)")
+            connections[alias].close()
+
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            for future in [executor.submit(_checkout) for _ in range(count)]:
+                future.result()
+
+    def _server_connections(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT coalesce(nullif(application_name, ''), '(none)'),
+                       coalesce(state, '(unknown)'),
+                       count(*)
+                FROM pg_stat_activity
+                WHERE datname = current_database()
+                GROUP BY 1, 2
+                ORDER BY 3 DESC
+                """
+            )
+            rows = cursor.fetchall()
+            cursor.execute("SHOW max_connections")
+            (max_connections,) = cursor.fetchone()
+
+        total = sum(count for _, _, count in rows)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\nServer connections to this database: {total} "
+                f"(max_connections {max_connections})"
+            )
+        )
+        for application, state, count in rows:
+            self.stdout.write(f"  {application:<30} {state:<22} {count}")
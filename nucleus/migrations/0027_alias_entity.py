@@ -0,0 +1,37 @@
+# Generated by Django 5.2.3 on 2026-10-16 20:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("nucleus", "0026_useractivity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="alias",
+            name="entity_content_type",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="contenttypes.contenttype",
+            ),
+        ),
+        migrations.AddField(
+            model_name="alias",
+            name="entity_object_id",
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="alias",
+            index=models.Index(
+                fields=["entity_content_type", "entity_object_id"],
+                name="alias_entity_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from nucleus.alias_owners import update_alias_owners
+
+
+def backfill_alias_entity(apps, schema_editor):
+    # Same owner rule as the m2m signals and the backfill_alias_entities command
+    update_alias_owners(apps)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nucleus", "0027_alias_entity"),
+        (
+            "character",
+            "0014_character_related_characters_character_related_items_and_more",
+        ),
+        ("place", "0013_place_related_places_place_related_races"),
+        ("item", "0011_artifact_related_artifacts_and_more"),
+        ("association", "0010_association_related_artifacts_and_more"),
+        ("race", "0010_race_related_races"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_alias_entity, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.3 on 2026-10-16 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nucleus", "0028_backfill_alias_entity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="gamelog",
+            name="token_counts",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                help_text="Token counts of full_text and summary per tiktoken encoding.",
+            ),
+        ),
+    ]
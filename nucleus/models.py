@@ -2,11 +2,12 @@ import datetime
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.contrib.contenttypes.models import ContentType
 from django.contrib.postgres.fields import ArrayField
 from django.contrib.postgres.indexes import GinIndex
 from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
-from django.db.models import Q
+from django.db.models import DEFERRED, Q
 from django.forms.models import model_to_dict
 from django.utils import timezone
 from django.utils.functional import cached_property
@@ -230,7 +231,7 @@ class PessimisticConcurrencyLockModel(models.Model):
             )
         self.lock_user = user
         self.lock_time = timezone.now()
-        self.save()
+        self.save(update_fields=["lock_user", "lock_time"])
         return self
 
     def release_lock(self, user):
@@ -244,7 +245,7 @@ class PessimisticConcurrencyLockModel(models.Model):
             )
         self.lock_user = None
         self.lock_time = None
-        self.save()
+        self.save(update_fields=["lock_user", "lock_time"])
         return self
 
 
@@ -284,6 +285,14 @@ class GameLog(PessimisticConcurrencyLockModel, models.Model):
         blank=True,
         help_text="Sequential session number for ordering and reference",
     )
+    token_counts = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Token counts of full_text and summary per tiktoken encoding.",
+    )
+
+    TOKEN_COUNTED_FIELDS = ("full_text", "summary")
 
     class Meta:
         indexes = [
@@ -312,8 +321,43 @@ class GameLog(PessimisticConcurrencyLockModel, models.Model):
         #         "full_text", config="simple"
         #     )  # or config="english" if "simple" isn't working well for narrative. Simple is better for fantasy names.
 
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or set(update_fields) & set(self.TOKEN_COUNTED_FIELDS):
+            if self.refresh_token_counts() and update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "token_counts"}
+
         super().save(*args, **kwargs)
 
+    def refresh_token_counts(self):
+        """
+        Recount tokens for full_text/summary where the text has changed since
+        the counts were stored. Does NOT save the model.
+
+        Returns False if token_counts isn't loaded and so wasn't refreshed.
+        """
+        from rag_chat.utils import stored_token_counts
+
+        deferred = self.get_deferred_fields()
+        if "token_counts" in deferred:
+            return False
+        counts = dict(self.token_counts or {})
+        for field in self.TOKEN_COUNTED_FIELDS:
+            if field in deferred:
+                continue
+            counts[field] = stored_token_counts(
+                getattr(self, field) or "", counts.get(field)
+            )
+        self.token_counts = counts
+        return True
+
+    def token_count(self, field: str, model: str) -> int:
+        """Stored token count of `field` for `model`'s encoding."""
+        from rag_chat.utils import stored_token_count
+
+        return stored_token_count(
+            (self.token_counts or {}).get(field), getattr(self, field) or "", model
+        )
+
     def update_from_google(self, overwrite=False):
         """
         Updates the model from google drive — Does NOT save the model
@@ -696,9 +740,28 @@ class AiLogSuggestion(CreatableModel, models.Model):
 class Alias(models.Model):
     name = models.CharField(max_length=255)
     is_primary = models.BooleanField(default=False)
+    # Denormalized owner of this alias, kept in sync with the entities'
+    # `aliases` M2M by nucleus.signals so lookups don't probe every entity type
+    entity_content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    entity_object_id = models.PositiveBigIntegerField(null=True, blank=True)
 
     @property
     def entity(self):
+        if self.entity_content_type_id and self.entity_object_id:
+            model = ContentType.objects.get_for_id(
+                self.entity_content_type_id
+            ).model_class()
+            entity = model.objects.filter(pk=self.entity_object_id).first()
+            if entity:
+                return entity
+
+        # Fall back to probing each relation (e.g. not yet backfilled)
         try:
             return (
                 self.base_characters.first()
@@ -723,9 +786,42 @@ class Alias(models.Model):
                 name="alias_name_trgm_idx",
                 opclasses=["gin_trgm_ops"],
             ),
+            models.Index(
+                fields=["entity_content_type", "entity_object_id"],
+                name="alias_entity_idx",
+            ),
         ]
 
 
+def resolve_alias_entities(aliases):
+    """
+    Resolve the owning entity of each alias, with one query per entity type.
+
+    Returns a list aligned with `aliases`; entries are None for orphaned aliases.
+    """
+    ids_by_content_type = {}
+    for alias in aliases:
+        if alias.entity_content_type_id and alias.entity_object_id:
+            ids_by_content_type.setdefault(alias.entity_content_type_id, set()).add(
+                alias.entity_object_id
+            )
+
+    entities = {}
+    for content_type_id, ids in ids_by_content_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        for entity in model.objects.filter(pk__in=ids):
+            entities[(content_type_id, entity.pk)] = entity
+
+    resolved = []
+    for alias in aliases:
+        entity = entities.get((alias.entity_content_type_id, alias.entity_object_id))
+        if entity is None and not alias.entity_content_type_id:
+            # Not backfilled yet — fall back to the slow path
+            entity = alias.entity
+        resolved.append(entity)
+    return resolved
+
+
 class Entity(
     # ModelDiffMixin,
     PessimisticConcurrencyLockModel,
@@ -736,6 +832,55 @@ class Entity(
 ):
     logs = models.ManyToManyField(GameLog, blank=True, related_name="%(class)ss")
     aliases = models.ManyToManyField(Alias, blank=True, related_name="base_%(class)ss")
+    # Salient terms of the description, maintained by rag_chat's
+    # compute_entity_key_terms task; key_terms_digest is the SHA-1 of the
+    # description they were computed from.
+    key_terms = ArrayField(
+        models.CharField(max_length=255), default=list, blank=True, editable=False
+    )
+    key_terms_digest = models.CharField(max_length=40, blank=True, editable=False)
+
+    # Field values as last loaded from or saved to the database, keyed by
+    # attname, so post_save handlers can tell what a save actually changed.
+    # None for instances that haven't been through the database yet.
+    _stored_values = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_values = {
+            name: value
+            for name, value in zip(field_names, values)
+            if value is not DEFERRED
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # After post_save: later saves compare against what is stored now
+        update_fields = kwargs.get("update_fields")
+        deferred = self.get_deferred_fields()
+        stored = dict(self._stored_values or {})
+        for field in self._meta.concrete_fields:
+            if field.attname in deferred:
+                continue
+            if update_fields is None or field.name in update_fields:
+                stored[field.attname] = getattr(self, field.attname)
+        self._stored_values = stored
+
+    def changed_fields(self):
+        """
+        Names of the fields whose value differs from the stored one, or None
+        if the stored values aren't known (e.g. a new instance).
+        """
+        if self._stored_values is None:
+            return None
+        return {
+            field.name
+            for field in self._meta.concrete_fields
+            if field.attname in self._stored_values
+            and getattr(self, field.attname) != self._stored_values[field.attname]
+        }
 
     # def save(self, *args, **kwargs):
     #     super().save(*args, **kwargs)
@@ -1,10 +1,14 @@
 """
-Signals for updating user activity tracking.
+Signals for updating user activity tracking and keeping alias owners in sync.
 """
+from django.apps import apps
 from django.contrib.auth.signals import user_logged_in
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import m2m_changed, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
-from .models import ActivityType, User, UserActivity
+from .alias_owners import update_alias_owners
+from .models import ActivityType, Alias, Entity, User, UserActivity
 
 
 def record_activity(user=None, activity_type=ActivityType.PAGE_VIEW, path=None, metadata=None):
@@ -45,3 +49,57 @@ def update_user_activity(user):
     """
     if user and user.is_authenticated:
         record_activity(user=user, activity_type=ActivityType.LOGIN)
+
+
+def sync_alias_entity(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """
+    Keep Alias.entity_content_type / entity_object_id in sync with an entity's
+    `aliases` M2M, from either side of the relation. The changed aliases get
+    their owner recomputed by the shared rule, so an alias still linked to
+    another entity moves to it rather than losing its owner.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if reverse:
+        # alias.base_<entities>.add/remove/clear(...)
+        alias_ids = [instance.pk]
+    elif action == "post_clear":
+        # entity.aliases.clear(): only the aliases it owned can change owner
+        alias_ids = list(_owned_alias_ids(instance))
+    else:
+        # entity.aliases.add/remove(...)
+        alias_ids = list(pk_set or ())
+    if alias_ids:
+        update_alias_owners(apps, alias_ids)
+
+
+def clear_alias_entity(sender, instance, **kwargs):
+    """Pass a deleted entity's aliases on to their next linked entity, if any."""
+    alias_ids = list(_owned_alias_ids(instance))
+    if alias_ids:
+        update_alias_owners(apps, alias_ids)
+
+
+def _owned_alias_ids(entity):
+    return Alias.objects.filter(
+        entity_content_type=ContentType.objects.get_for_model(entity),
+        entity_object_id=entity.pk,
+    ).values_list("pk", flat=True)
+
+
+def connect_entity_signals():
+    """Connect alias sync handlers for every concrete Entity subclass."""
+    for model in apps.get_models():
+        if not issubclass(model, Entity):
+            continue
+        m2m_changed.connect(
+            sync_alias_entity,
+            sender=model.aliases.through,
+            dispatch_uid=f"sync_alias_entity_{model._meta.label_lower}",
+        )
+        post_delete.connect(
+            clear_alias_entity,
+            sender=model,
+            dispatch_uid=f"clear_alias_entity_{model._meta.label_lower}",
+        )
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.3 on 2026-10-16 20:55
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("place", "0013_place_related_places_place_related_races"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="export",
+            name="key_terms",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=255),
+                blank=True,
+                default=list,
+                editable=False,
+                size=None,
+            ),
+        ),
+        migrations.AddField(
+            model_name="export",
+            name="key_terms_digest",
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+        migrations.AddField(
+            model_name="place",
+            name="key_terms",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=255),
+                blank=True,
+                default=list,
+                editable=False,
+                size=None,
+            ),
+        ),
+        migrations.AddField(
+            model_name="place",
+            name="key_terms_digest",
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+    ]
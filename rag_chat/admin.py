@@ -163,18 +163,55 @@ class ContentChunkAdmin(admin.ModelAdmin):
         limit = forms.IntegerField(required=False, label="Limit", initial=10)
 
 
+@admin.register(models.EmbeddingJob)
+class EmbeddingJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "status",
+        "content_types",
+        "total",
+        "done",
+        "failed",
+        "chunks",
+        "tokens",
+        "elapsed",
+        "started_at",
+    )
+    list_filter = ("status",)
+    readonly_fields = (
+        "content_types",
+        "force_reprocess",
+        "status",
+        "total",
+        "done",
+        "failed",
+        "chunks",
+        "tokens",
+        "elapsed",
+        "started_at",
+        "finished_at",
+    )
+
+    def has_add_permission(self, request):
+        # Jobs are started by process_all_content or `process_game_logs`
+        return False
+
+
 @admin.register(models.QueryCache)
 class QueryCacheAdmin(admin.ModelAdmin):
     list_display = (
         "id",
         "query_hash",
         "query_text",
+        "model",
         "tokens_saved",
         "hit_count",
         "expires_at",
         "created_at",
     )
+    list_filter = ("model",)
     search_fields = ("query_text", "query_hash")
+    exclude = ("query_embedding",)
 
 
 @admin.register(models.ChatSession)
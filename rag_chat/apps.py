@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class RagChatConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "rag_chat"
+
+    def ready(self):
+        import rag_chat.signals  # noqa
+
+        rag_chat.signals.connect_entity_signals()
@@ -0,0 +1,307 @@
+"""
+Offline support for `manage.py benchmark_rag_pipeline`.
+
+RecordedOpenAI stands in for the OpenAI client. Embedding and chat completion
+responses are keyed by a hash of the request and served from a JSON
+recordings file. With a real client it also records. A request missing from
+the recordings gets a deterministic synthetic answer, so the benchmark runs
+with no network:
+
+  - embeddings are hashed bags of words, so texts sharing words are similar
+  - completions echo the question being rewritten or summarized
+
+StageRecorder turns PipelineTimer steps into per-stage samples and counts
+database queries per top-level stage, across the fan-out threads.
+"""
+
+import base64
+import hashlib
+import json
+import math
+import random
+import re
+import statistics
+import threading
+import time
+from array import array
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+from unittest.mock import patch
+
+from django.db.backends.utils import CursorWrapper
+
+from .vector_search import EMBEDDING_DIMENSIONS
+
+FIXTURES_DIR = Path(__file__).parent / "benchmark_fixtures"
+DEFAULT_QUESTIONS_PATH = FIXTURES_DIR / "questions.json"
+DEFAULT_RECORDINGS_PATH = FIXTURES_DIR / "openai_recordings.json"
+
+
+# --- Synthetic responses ---
+
+_token_vectors: Dict[str, List[float]] = {}
+
+
+def _token_vector(token: str) -> List[float]:
+    vector = _token_vectors.get(token)
+    if vector is None:
+        seed = int.from_bytes(hashlib.sha256(token.encode()).digest()[:8], "big")
+        rng = random.Random(seed)
+        vector = [rng.gauss(0.0, 1.0) for _ in range(EMBEDDING_DIMENSIONS)]
+        _token_vectors[token] = vector
+    return vector
+
+
+def synthetic_embedding(text: str) -> List[float]:
+    """Pure. Unit-length sum of per-word random vectors."""
+    totals = [0.0] * EMBEDDING_DIMENSIONS
+    for token in re.findall(r"\w+", text.casefold()):
+        for i, value in enumerate(_token_vector(token)):
+            totals[i] += value
+    norm = math.sqrt(sum(value * value for value in totals))
+    if not norm:
+        return _token_vector("")
+    return [value / norm for value in totals]
+
+
+def synthetic_completion(messages: List[dict]) -> str:
+    """Pure. The last line of the last user message, e.g. its question."""
+    user_messages = [m["content"] for m in messages if m.get("role") == "user"]
+    lines = (user_messages[-1] if user_messages else "").strip().splitlines()
+    last = lines[-1] if lines else ""
+    return re.sub(r"^(Question|Current message):\s*", "", last).strip()
+
+
+# --- Recorded client ---
+
+
+def _request_key(kind: str, model: str, payload: Any) -> str:
+    content = json.dumps([kind, model, payload], sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _pack(embedding: List[float]) -> str:
+    return base64.b64encode(array("f", embedding).tobytes()).decode()
+
+
+def _unpack(packed: str) -> List[float]:
+    values = array("f")
+    values.frombytes(base64.b64decode(packed))
+    return values.tolist()
+
+
+class RecordedOpenAI:
+    """
+    The subset of the OpenAI client the RAG pipeline uses
+    (embeddings.create, chat.completions.create without streaming).
+
+    Pass `live` (a real OpenAI client) to record misses. With
+    replay_latency, recorded responses sleep for the latency they were
+    recorded with.
+    """
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_RECORDINGS_PATH,
+        live: Any = None,
+        replay_latency: bool = False,
+    ):
+        self.path = Path(path)
+        self.live = live
+        self.replay_latency = replay_latency
+        self.recordings: Dict[str, dict] = (
+            json.loads(self.path.read_text()) if self.path.exists() else {}
+        )
+        self.stats: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.embeddings = SimpleNamespace(create=self._create_embeddings)
+        self.chat = SimpleNamespace(
+            completions=SimpleNamespace(create=self._create_completion)
+        )
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.recordings, indent=1, sort_keys=True))
+
+    def _replay(self, key: str) -> Optional[dict]:
+        with self._lock:
+            recorded = self.recordings.get(key)
+        if recorded is not None:
+            self.stats["replayed"] += 1
+            if self.replay_latency:
+                time.sleep(recorded.get("latency", 0.0))
+        return recorded
+
+    def _record(self, key: str, recorded: dict):
+        with self._lock:
+            self.recordings[key] = recorded
+        self.stats["recorded"] += 1
+
+    def _create_embeddings(self, model: str, input: List[str], **kwargs):
+        vectors = []
+        for text in input:
+            key = _request_key("embedding", model, text)
+            recorded = self._replay(key)
+            if recorded is None and self.live is not None:
+                t0 = time.perf_counter()
+                response = self.live.embeddings.create(model=model, input=[text])
+                recorded = {
+                    "embedding": _pack(response.data[0].embedding),
+                    "latency": time.perf_counter() - t0,
+                }
+                self._record(key, recorded)
+            if recorded is None:
+                self.stats["synthetic"] += 1
+                vectors.append(synthetic_embedding(text))
+            else:
+                vectors.append(_unpack(recorded["embedding"]))
+
+        return SimpleNamespace(
+            data=[
+                SimpleNamespace(index=i, embedding=vector)
+                for i, vector in enumerate(vectors)
+            ]
+        )
+
+    def _create_completion(self, model: str, messages: List[dict], **kwargs):
+        if kwargs.get("stream"):
+            raise NotImplementedError("Recorded completions do not stream")
+
+        key = _request_key("completion", model, messages)
+        recorded = self._replay(key)
+        if recorded is None and self.live is not None:
+            t0 = time.perf_counter()
+            response = self.live.chat.completions.create(
+                model=model, messages=messages, **kwargs
+            )
+            recorded = {
+                "content": response.choices[0].message.content or "",
+                "latency": time.perf_counter() - t0,
+            }
+            self._record(key, recorded)
+        if recorded is None:
+            self.stats["synthetic"] += 1
+            content = synthetic_completion(messages)
+        else:
+            content = recorded["content"]
+
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+        )
+
+
+@contextmanager
+def openai_clients(client: RecordedOpenAI) -> Iterator[RecordedOpenAI]:
+    """Route every sync OpenAI call the pipeline makes through `client`."""
+    targets = [
+        "rag_chat.embeddings.openai_client",
+        "rag_chat.services.RAGService.openai_client",
+        "rag_chat.services.build_conversation_memory.openai_client",
+    ]
+    patchers = [patch(target, client) for target in targets]
+    for patcher in patchers:
+        patcher.start()
+    try:
+        yield client
+    finally:
+        for patcher in reversed(patchers):
+            patcher.stop()
+
+
+# --- Stage samples and query counts ---
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Pure. Nearest-rank percentile, as in the other benchmark commands."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * pct / 100) - 1)]
+
+
+class StageRecorder:
+    """
+    Collects PipelineTimer steps from every prepare_context call, and counts
+    queries from any thread against the top-level step running at the time.
+    """
+
+    OUTSIDE_STEPS = "(outside steps)"
+
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        self.queries: Dict[str, List[int]] = defaultdict(list)
+        self._turn_queries: Dict[str, int] = defaultdict(int)
+        self._stage = self.OUTSIDE_STEPS
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def active(self) -> Iterator["StageRecorder"]:
+        from .services.RAGService import PipelineTimer
+
+        recorder = self
+        original_step = PipelineTimer.step
+        original_execute = CursorWrapper.execute
+        original_executemany = CursorWrapper.executemany
+
+        @contextmanager
+        def step(timer, name):
+            top_level = not name.startswith(" ")
+            if top_level:
+                recorder._stage = name
+            try:
+                with original_step(timer, name):
+                    yield
+            finally:
+                if top_level:
+                    recorder._stage = recorder.OUTSIDE_STEPS
+
+        def count(method):
+            def wrapper(cursor, *args, **kwargs):
+                with recorder._lock:
+                    recorder._turn_queries[recorder._stage] += 1
+                return method(cursor, *args, **kwargs)
+
+            return wrapper
+
+        def summary(timer):
+            for name, duration in timer.steps:
+                recorder.durations[name.strip()].append(duration)
+            recorder.durations["TOTAL"].append(time.perf_counter() - timer._start)
+
+        with patch.object(PipelineTimer, "step", step), patch.object(
+            PipelineTimer, "summary", summary
+        ), patch.object(
+            CursorWrapper, "execute", count(original_execute)
+        ), patch.object(
+            CursorWrapper, "executemany", count(original_executemany)
+        ):
+            yield self
+
+    def start_turn(self):
+        """Discard queries made between prepare_context calls."""
+        with self._lock:
+            self._turn_queries = defaultdict(int)
+
+    def end_turn(self):
+        """Close off one prepare_context call's query counts."""
+        with self._lock:
+            total = sum(self._turn_queries.values())
+            for stage, count in self._turn_queries.items():
+                self.queries[stage].append(count)
+            self.queries["TOTAL"].append(total)
+            self._turn_queries = defaultdict(int)
+
+    def report(self) -> Dict[str, dict]:
+        stages = {}
+        for name, durations in self.durations.items():
+            stages[name] = {
+                "samples": len(durations),
+                "p50_ms": round(statistics.median(durations) * 1000, 3),
+                "p95_ms": round(percentile(durations, 95) * 1000, 3),
+            }
+        for name, counts in self.queries.items():
+            stage = stages.setdefault(name, {"samples": 0})
+            stage["queries_p50"] = statistics.median(counts)
+            stage["queries_max"] = max(counts)
+        return stages
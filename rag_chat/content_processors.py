@@ -2,6 +2,8 @@
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Tuple
 
+from django.db.models import QuerySet
+
 from association.models import Association
 from character.models import Character
 from item.models import Artifact, Item
@@ -9,7 +11,7 @@ from nucleus.models import GameLog
 from place.models import Place
 from race.models import Race
 
-from .embeddings import chunk_document, clean_text
+from .embeddings import clean_text, iter_chunks
 
 
 def entity_name_description_lines(entity) -> str:
@@ -26,6 +28,23 @@ class BaseContentProcessor(ABC):
 
     content_type: str | None = None
 
+    # Part of every chunk's content hash: bump when a processor's text or
+    # chunking changes, so reprocessing re-embeds its chunks
+    version: int = 2
+
+    # Relations touched by format_for_llm, loaded up front when objects are
+    # fetched in bulk (see optimize_queryset)
+    select_related: tuple[str, ...] = ()
+    prefetch_related: tuple[str, ...] = ("aliases",)
+
+    def optimize_queryset(self, queryset: QuerySet) -> QuerySet:
+        """Apply this processor's select/prefetch so format_for_llm needs no queries"""
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset
+
     @abstractmethod
     def extract_text(self, obj) -> str:
         """Extract searchable text from the object"""
@@ -70,11 +89,13 @@ class BaseContentProcessor(ABC):
         text = clean_text(text)
 
         if self.should_chunk(text):
-            chunks = chunk_document(text)
             results = []
-            for i, chunk_text in enumerate(chunks):
-                metadata = self.build_metadata(obj, chunk_text, i)
-                results.append((chunk_text, metadata))
+            for i, chunk in enumerate(iter_chunks(text)):
+                metadata = self.build_metadata(obj, chunk.text, i)
+                # Offsets into the cleaned text, clean_text(extract_text(obj))
+                metadata["char_start"] = chunk.start
+                metadata["char_end"] = chunk.end
+                results.append((chunk.text, metadata))
             return results
         else:
             # Single chunk
@@ -84,6 +105,7 @@ class BaseContentProcessor(ABC):
 
 class GameLogProcessor(BaseContentProcessor):
     content_type = "gamelog"
+    prefetch_related = ()
 
     def extract_text(self, gamelog) -> str:
         return gamelog.log_text or ""
@@ -123,6 +145,8 @@ class GameLogProcessor(BaseContentProcessor):
 
 class CharacterProcessor(BaseContentProcessor):
     content_type = "character"
+    select_related = ("race",)
+    prefetch_related = ("aliases", "associations")
 
     def extract_text(self, character) -> str:
         text_parts = []
@@ -192,6 +216,7 @@ class CharacterProcessor(BaseContentProcessor):
 
 class PlaceProcessor(BaseContentProcessor):
     content_type = "place"
+    select_related = ("parent",)
 
     def extract_text(self, place) -> str:
         text_parts = []
@@ -292,6 +317,7 @@ class ItemProcessor(BaseContentProcessor):
 
 class ArtifactProcessor(BaseContentProcessor):
     content_type = "artifact"
+    prefetch_related = ("aliases", "items")
 
     def extract_text(self, artifact) -> str:
         text_parts = []
@@ -311,10 +337,9 @@ class ArtifactProcessor(BaseContentProcessor):
 
     def format_for_llm(self, artifact) -> str:
         name_and_description = entity_name_description_lines(artifact)
+        items = artifact.items.all() if hasattr(artifact, "items") else []
         items_line = (
-            f"  Is a: {', '.join(item.name for item in artifact.items.all())}\n"
-            if hasattr(artifact, "items") and artifact.items.exists()
-            else ""
+            f"  Is a: {', '.join(item.name for item in items)}\n" if items else ""
         )
         return name_and_description + items_line
 
@@ -1,85 +1,391 @@
 import hashlib
+import logging
 import re
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
 
+from asgiref.sync import sync_to_async
+from cachetools import TTLCache
 from django.conf import settings
-from openai import OpenAI
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+from openai import AsyncOpenAI, OpenAI
+
+from .utils import count_tokens, token_offsets
+
+logger = logging.getLogger(__name__)
 
 # Initialize OpenAI client
 
-openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+openai_client = OpenAI(
+    api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL
+)
+async_openai_client = AsyncOpenAI(
+    api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL
+)
+
+
+# --- Query-embedding cache ---
+# Two tiers: a bounded in-process LRU (per web/Celery worker) in front of the
+# shared Redis cache. Vectors are stored as packed float32 — the precision the
+# API returns — which keeps each 1536-d entry around 6KB.
+
+EMBEDDING_CACHE_KEY_PREFIX = "embedding"
+
+# After a shared-cache error, skip the shared tier for this many seconds so a
+# missing Redis doesn't add a socket timeout to every call.
+_SHARED_CACHE_RETRY_SECONDS = 30
+
+_memory_cache: TTLCache = TTLCache(
+    maxsize=settings.EMBEDDING_CACHE_MAX_ENTRIES, ttl=settings.EMBEDDING_CACHE_TTL
+)
+_memory_cache_lock = threading.Lock()
+_cache_stats: Counter = Counter()
+_shared_cache_retry_at = 0.0
+
+
+def normalize_embedding_text(text: str) -> str:
+    """Normalize text for cache keying: collapse whitespace and casefold."""
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def embedding_cache_key(text: str, model: Optional[str] = None) -> str:
+    """Content-addressed cache key for (embedding model, normalized text)."""
+    model = model or settings.OPENAI_EMBEDDINGS_MODEL
+    content = f"{model}\n{normalize_embedding_text(text)}"
+    return (
+        f"{EMBEDDING_CACHE_KEY_PREFIX}:{hashlib.sha256(content.encode()).hexdigest()}"
+    )
+
+
+def _shared_cache():
+    """Return the shared cache backend, or None if disabled or backing off."""
+    if not settings.EMBEDDING_CACHE_ALIAS:
+        return None
+    if time.monotonic() < _shared_cache_retry_at:
+        return None
+    try:
+        return caches[settings.EMBEDDING_CACHE_ALIAS]
+    except InvalidCacheBackendError:
+        return None
+
+
+def _shared_cache_failed(e: Exception):
+    global _shared_cache_retry_at
+    _shared_cache_retry_at = time.monotonic() + _SHARED_CACHE_RETRY_SECONDS
+    _cache_stats["shared_errors"] += 1
+    logger.warning(f"Shared embedding cache unavailable: {str(e)}")
+
+
+def _cache_get(key: str) -> Optional[List[float]]:
+    with _memory_cache_lock:
+        packed = _memory_cache.get(key)
+    if packed is not None:
+        _cache_stats["memory_hits"] += 1
+        return packed.tolist()
+
+    shared = _shared_cache()
+    if shared is not None:
+        try:
+            raw = shared.get(key)
+        except Exception as e:
+            _shared_cache_failed(e)
+            raw = None
+        if raw is not None:
+            packed = array("f")
+            packed.frombytes(raw)
+            with _memory_cache_lock:
+                _memory_cache[key] = packed
+            _cache_stats["shared_hits"] += 1
+            return packed.tolist()
+
+    _cache_stats["misses"] += 1
+    return None
+
+
+def _cache_set(key: str, embedding: List[float]):
+    packed = array("f", embedding)
+    with _memory_cache_lock:
+        _memory_cache[key] = packed
+
+    shared = _shared_cache()
+    if shared is not None:
+        try:
+            shared.set(key, packed.tobytes(), timeout=settings.EMBEDDING_CACHE_TTL)
+        except Exception as e:
+            _shared_cache_failed(e)
+
+
+def get_embedding_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters for this process, plus the current in-memory size."""
+    with _memory_cache_lock:
+        size = len(_memory_cache)
+    return {
+        "memory_hits": _cache_stats["memory_hits"],
+        "shared_hits": _cache_stats["shared_hits"],
+        "misses": _cache_stats["misses"],
+        "shared_errors": _cache_stats["shared_errors"],
+        "memory_entries": size,
+    }
+
+
+def clear_embedding_cache():
+    """Empty the in-process tier and reset counters (the shared tier expires by TTL)."""
+    global _shared_cache_retry_at
+    with _memory_cache_lock:
+        _memory_cache.clear()
+    _cache_stats.clear()
+    _shared_cache_retry_at = 0.0
 
 
 def get_embedding(text: str) -> List[float]:
     """
     Get embedding using OpenAI's cheapest embedding model
+
+    Results are cached by (model, normalized text), so repeated queries skip
+    the API round-trip.
+    """
+    return get_embeddings([text], cache=True)[0]
+
+
+async def aget_embedding(text: str) -> List[float]:
     """
+    Async get_embedding, for the async RAG pipeline. Shares both cache tiers;
+    the shared-cache round-trips run off the event loop.
+    """
+    key = embedding_cache_key(text)
+    cached = await sync_to_async(_cache_get, thread_sensitive=False)(key)
+    if cached is not None:
+        return cached
+
     try:
-        response = openai_client.embeddings.create(
-            model=settings.OPENAI_EMBEDDINGS_MODEL,
-            input=text.strip(),
+        response = await async_openai_client.embeddings.create(
+            model=settings.OPENAI_EMBEDDINGS_MODEL, input=[text.strip()]
         )
-        return response.data[0].embedding
     except Exception as e:
         raise Exception(f"Failed to get embedding: {str(e)}")
 
+    embedding = response.data[0].embedding
+    await sync_to_async(_cache_set, thread_sensitive=False)(key, embedding)
+    return embedding
+
+
+# OpenAI embeddings request limits: inputs per request and summed input tokens.
+EMBEDDING_MAX_INPUTS_PER_REQUEST = 2048
+EMBEDDING_MAX_TOKENS_PER_REQUEST = 300_000
+
 
-def chunk_document(text: str, chunk_size: int = 800, overlap: int = 100) -> List[str]:
+def _batch_for_embedding(
+    texts: List[str], max_inputs: int, max_tokens: int
+) -> List[List[int]]:
     """
-    Split document into overlapping chunks for better context preservation
+    Pure. Group text indexes into request-sized batches, preserving order.
+    A single text over the token limit goes in a batch of its own.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for i, text in enumerate(texts):
+        tokens = count_tokens(text, model=settings.OPENAI_EMBEDDINGS_MODEL)
+        if current and (
+            len(current) >= max_inputs or current_tokens + tokens > max_tokens
+        ):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def get_embeddings(
+    texts: List[str],
+    max_inputs_per_request: int = EMBEDDING_MAX_INPUTS_PER_REQUEST,
+    max_tokens_per_request: int = EMBEDDING_MAX_TOKENS_PER_REQUEST,
+    cache: bool = False,
+) -> List[List[float]]:
+    """
+    Embed many texts, packing them into as few API requests as the input and
+    token limits allow. Returns vectors in the same order as texts.
+
+    The embedding cache is for queries, which repeat; only with cache=True
+    are texts looked up in and added to it. Ingestion leaves it off so that
+    document chunks, which are embedded once, don't evict the queries.
+    """
+    results: List[Optional[List[float]]] = [None] * len(texts)
+
+    # Dedupe by cache key so repeated texts are looked up and embedded once
+    indexes_by_key: Dict[str, List[int]] = {}
+    for i, text in enumerate(texts):
+        indexes_by_key.setdefault(embedding_cache_key(text), []).append(i)
+
+    missing_keys: List[str] = []
+    for key, indexes in indexes_by_key.items():
+        cached = _cache_get(key) if cache else None
+        if cached is None:
+            missing_keys.append(key)
+            continue
+        for i in indexes:
+            results[i] = cached
+
+    missing_texts = [texts[indexes_by_key[key][0]].strip() for key in missing_keys]
+    for batch in _batch_for_embedding(
+        missing_texts, max_inputs_per_request, max_tokens_per_request
+    ):
+        try:
+            response = openai_client.embeddings.create(
+                model=settings.OPENAI_EMBEDDINGS_MODEL,
+                input=[missing_texts[j] for j in batch],
+            )
+        except Exception as e:
+            raise Exception(f"Failed to get embedding: {str(e)}")
+
+        for item in response.data:
+            key = missing_keys[batch[item.index]]
+            if cache:
+                _cache_set(key, item.embedding)
+            for i in indexes_by_key[key]:
+                results[i] = item.embedding
+
+    return results  # type: ignore[return-value]
+
+
+# --- Chunking ---
+# Chunks are sized in tokens of the embedding model. The text is tokenized
+# once into token start offsets; everything after that is bisects and scans
+# within one chunk's window, so chunking stays linear in the text. A chunk ends
+# at the last sentence end in the final 40% of its budget, otherwise at a word
+# boundary. The next chunk starts about `overlap_tokens` earlier, at the start
+# of a word, so consecutive chunks share whole words (see log_excerpts).
+
+CHUNK_TOKENS = 1000
+CHUNK_OVERLAP_TOKENS = 128
+SENTENCE_SNAP_FRACTION = 0.6
+
+_SENTENCE_END_RE = re.compile(r"[.!?][\"')\]]*(?=\s)")
+
+
+class TextChunk(NamedTuple):
+    text: str
+    # Character offsets of `text` in the string that was chunked
+    start: int
+    end: int
+    token_count: int
+
+
+def _word_start_at_or_before(
+    text: str, offsets: List[int], index: int, floor: int
+) -> Optional[int]:
+    """The last token index in (floor, index] that starts a word, if any."""
+    while index > floor:
+        offset = offsets[index]
+        if text[offset].isspace() or text[offset - 1].isspace():
+            return index
+        index -= 1
+    return None
+
+
+def _sentence_end_in(
+    text: str, offsets: List[int], floor: int, index: int
+) -> Optional[int]:
+    """The last token index in (floor, index] that follows a sentence end."""
+    # One character past the window so the lookahead sees the next token
+    last = None
+    for last in _SENTENCE_END_RE.finditer(text, offsets[floor + 1], offsets[index] + 1):
+        pass
+    if last is None:
+        return None
+    return bisect_left(offsets, last.end(), floor + 1, index + 1)
+
+
+def iter_chunks(
+    text: str,
+    chunk_tokens: int = CHUNK_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+    model: Optional[str] = None,
+) -> Iterator[TextChunk]:
+    """
+    Lazily split text into overlapping chunks of at most `chunk_tokens` tokens
 
     Args:
-        text: The full document text
-        chunk_size: Target number of words per chunk
-        overlap: Number of words to overlap between chunks
+        text: The text to chunk, already cleaned; offsets index into it
+        chunk_tokens: Maximum tokens per chunk
+        overlap_tokens: Approximate tokens shared by consecutive chunks
+        model: Model whose tokenizer sizes the chunks (the embedding model)
 
-    Returns:
-        List of text chunks
+    Yields:
+        TextChunk per non-empty chunk, in order
     """
     if not text or not text.strip():
-        return []
+        return
 
-    # Clean up the text
-    text = clean_text(text)
-    words = text.split()
+    offsets = token_offsets(text, model or settings.OPENAI_EMBEDDINGS_MODEL)
+    total = len(offsets)
+    snap_floor = int(chunk_tokens * SENTENCE_SNAP_FRACTION)
 
-    if len(words) <= chunk_size:
-        return [text]
-
-    chunks = []
     start = 0
-
-    while start < len(words):
-        # Calculate initial end position
-        end = min(start + chunk_size, len(words))
-        chunk_words = words[start:end]
-        chunk_text = " ".join(chunk_words)
-
-        # If this isn't the last chunk, try to end on a sentence boundary
-        if end < len(words) and not chunk_text.endswith((".", "!", "?")):
-            # Look for the last sentence boundary in the chunk
-            last_sentence_end = max(
-                chunk_text.rfind("."), chunk_text.rfind("!"), chunk_text.rfind("?")
+    while True:
+        end = min(start + chunk_tokens, total)
+        if end < total:
+            end = (
+                _sentence_end_in(text, offsets, start + snap_floor, end)
+                or _word_start_at_or_before(text, offsets, end, start)
+                or end
             )
 
-            # Only cut at sentence boundary if it's not too early (keeps chunk reasonably sized)
-            if last_sentence_end > len(chunk_text) * 0.6:
-                chunk_text = chunk_text[: last_sentence_end + 1]
-                # Recalculate actual end position in words
-                actual_words = chunk_text.split()
-                end = start + len(actual_words)
+        first = offsets[start]
+        raw = text[first : offsets[end] if end < total else len(text)]
+        chunk_text = raw.strip()
+        if chunk_text:
+            first += len(raw) - len(raw.lstrip())
+            yield TextChunk(chunk_text, first, first + len(chunk_text), end - start)
+
+        if end >= total:
+            return
+
+        # Move start back by the overlap, ensuring we don't go backwards
+        next_start = max(start + 1, end - overlap_tokens)
+        start = _word_start_at_or_before(text, offsets, next_start, start) or next_start
+
+
+def chunk_document(
+    text: str,
+    chunk_tokens: int = CHUNK_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+) -> List[str]:
+    """
+    Split document into overlapping chunks for better context preservation
 
-        chunks.append(chunk_text.strip())
+    Args:
+        text: The full document text
+        chunk_tokens: Maximum tokens per chunk
+        overlap_tokens: Approximate tokens to overlap between chunks
 
-        # Check if we've processed all words
-        if end >= len(words):
-            break
+    Returns:
+        List of text chunks
+    """
+    return [
+        chunk.text
+        for chunk in iter_chunks(clean_text(text), chunk_tokens, overlap_tokens)
+    ]
 
-        # Move start position with overlap, ensuring we don't go backwards
-        next_start = max(start + 1, end - overlap)
-        start = next_start
 
-    return [chunk for chunk in chunks if chunk.strip()]
+def chunk_content_hash(
+    text: str, processor_version: int, model: Optional[str] = None
+) -> str:
+    """
+    What a stored chunk's vector depends on: its exact text, the version of
+    the processor that produced it and the embedding model. Reprocessing
+    keeps the vector of any chunk whose hash is unchanged.
+    """
+    model = model or settings.OPENAI_EMBEDDINGS_MODEL
+    content = f"{processor_version}\n{model}\n{text}"
+    return hashlib.sha256(content.encode()).hexdigest()
 
 
 def clean_text(text: str) -> str:
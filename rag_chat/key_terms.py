@@ -0,0 +1,65 @@
+"""
+Key terms (salient nouns/adjectives) of entity descriptions.
+
+Extraction needs NLTK POS tagging, which is slow and heavy to load, so terms
+are computed once per description change by the compute_entity_key_terms
+task and stored on the entity. The retrieval path only reads the stored
+terms; NLTK is imported lazily and never by the web process.
+"""
+
+import hashlib
+from functools import lru_cache
+
+# Terms stored per entity; callers slice down to what they need
+STORED_KEY_TERMS = 10
+
+
+def description_digest(description: str) -> str:
+    return hashlib.sha1((description or "").encode()).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _stopwords() -> frozenset[str]:
+    import nltk
+
+    return frozenset(nltk.corpus.stopwords.words("english"))
+
+
+def extract_key_terms(description: str, max_terms: int = 5) -> list[str]:
+    """
+    Extract salient nouns/adjectives from a description.
+    """
+    if not description:
+        return []
+
+    import nltk
+
+    tokens = nltk.word_tokenize(description)
+    tagged = nltk.pos_tag(tokens)
+
+    candidates = [
+        word.lower()
+        for word, tag in tagged
+        if (tag.startswith("NN") or tag.startswith("JJ"))
+    ]
+
+    stopwords = _stopwords()
+    filtered = [w for w in candidates if w not in stopwords and w.isalpha()]
+
+    # Deduplicate while preserving order
+    seen = set()
+    unique = [w for w in filtered if not (w in seen or seen.add(w))]
+
+    return unique[:max_terms]
+
+
+def key_terms_are_current(entity) -> bool:
+    return entity.key_terms_digest == description_digest(entity.description)
+
+
+def entity_key_terms(entity, max_terms: int = 5) -> list[str]:
+    """
+    Stored key terms of an entity. Empty until compute_entity_key_terms has
+    run for its current description.
+    """
+    return list(entity.key_terms or [])[:max_terms]
@@ -0,0 +1,47 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from nucleus.models import Entity
+from rag_chat.key_terms import (
+    STORED_KEY_TERMS,
+    description_digest,
+    extract_key_terms,
+)
+
+
+class Command(BaseCommand):
+    help = "Compute stored key terms for entities whose description has changed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Recompute every entity, even if its key terms are current",
+        )
+
+    def handle(self, *args, **options):
+        for model in apps.get_models():
+            if not issubclass(model, Entity):
+                continue
+
+            to_update = []
+            for entity in model.objects.only(
+                "id", "description", "key_terms", "key_terms_digest"
+            ).iterator():
+                digest = description_digest(entity.description)
+                if not options["force"] and entity.key_terms_digest == digest:
+                    continue
+                entity.key_terms = extract_key_terms(
+                    entity.description, max_terms=STORED_KEY_TERMS
+                )
+                entity.key_terms_digest = digest
+                to_update.append(entity)
+
+            with transaction.atomic():
+                model.objects.bulk_update(
+                    to_update, ["key_terms", "key_terms_digest"], batch_size=500
+                )
+            self.stdout.write(f"{model.__name__}: updated {len(to_update)}")
+
+        self.stdout.write(self.style.SUCCESS("Key terms up to date"))
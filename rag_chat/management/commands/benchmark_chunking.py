@@ -0,0 +1,128 @@
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from nucleus.models import GameLog
+from rag_chat.embeddings import chunk_document, clean_text
+from rag_chat.utils import count_tokens
+
+VOCABULARY = (
+    "the party Izar Bruno Dorinda travelled to Hielo and met a merchant who "
+    "sold them an artifact from the old library while the captain argued "
+    "about the price of passage across the sea"
+).split()
+
+
+def word_chunk_document(text: str, chunk_size: int = 800, overlap: int = 100):
+    """The word-split chunker chunk_document replaced, sized in words."""
+    if not text or not text.strip():
+        return []
+
+    text = clean_text(text)
+    words = text.split()
+
+    if len(words) <= chunk_size:
+        return [text]
+
+    chunks = []
+    start = 0
+
+    while start < len(words):
+        end = min(start + chunk_size, len(words))
+        chunk_words = words[start:end]
+        chunk_text = " ".join(chunk_words)
+
+        if end < len(words) and not chunk_text.endswith((".", "!", "?")):
+            last_sentence_end = max(
+                chunk_text.rfind("."), chunk_text.rfind("!"), chunk_text.rfind("?")
+            )
+            if last_sentence_end > len(chunk_text) * 0.6:
+                chunk_text = chunk_text[: last_sentence_end + 1]
+                actual_words = chunk_text.split()
+                end = start + len(actual_words)
+
+        chunks.append(chunk_text.strip())
+
+        if end >= len(words):
+            break
+
+        next_start = max(start + 1, end - overlap)
+        start = next_start
+
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+def synthetic_log_text(words: int, rng: random.Random) -> str:
+    """Session-log-like prose: sentences of 5-30 words, some paragraphs."""
+    sentences = []
+    written = 0
+    while written < words:
+        length = min(rng.randint(5, 30), words - written)
+        sentence = " ".join(rng.choice(VOCABULARY) for _ in range(length))
+        sentences.append(sentence.capitalize() + rng.choice(".....!?"))
+        if rng.random() < 0.1:
+            sentences.append("\n\n")
+        written += length
+    return " ".join(sentences)
+
+
+class Command(BaseCommand):
+    help = "Benchmark the token-aware chunker against the word-split reference"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--words",
+            type=int,
+            nargs="+",
+            default=[5_000, 20_000, 80_000],
+            help="Sizes of the synthetic logs to chunk",
+        )
+        parser.add_argument(
+            "--logs",
+            action="store_true",
+            help="Chunk the stored GameLogs instead of synthetic text",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Timed runs per implementation"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options["logs"]:
+            texts = [
+                (log.title or f"log {log.pk}", log.log_text)
+                for log in GameLog.objects.exclude(full_text="")
+            ]
+        else:
+            rng = random.Random(options["seed"])
+            texts = [
+                (f"{words} words", synthetic_log_text(words, rng))
+                for words in options["words"]
+            ]
+
+        model = settings.OPENAI_EMBEDDINGS_MODEL
+        for label, text in texts:
+            self.stdout.write(f"{label}: {len(text) / 1_000_000:.2f}MB")
+            for name, chunk in (
+                ("words", word_chunk_document),
+                ("tokens", chunk_document),
+            ):
+                chunks = chunk(text)  # warm-up
+                timings = []
+                for _ in range(options["repeat"]):
+                    t0 = time.perf_counter()
+                    chunks = chunk(text)
+                    timings.append(time.perf_counter() - t0)
+
+                median = statistics.median(timings)
+                sizes = [count_tokens(c, model=model) for c in chunks] or [0]
+                self.stdout.write(
+                    f"  {name:<7} median {median * 1000:>8.2f}ms"
+                    f"  {len(text) / 1_000_000 / median:>7.2f}MB/s"
+                    f"  {len(chunks):>4} chunks"
+                    f"  tokens min {min(sizes):>5} mean {statistics.mean(sizes):>7.1f}"
+                    f" max {max(sizes):>5}"
+                )
@@ -0,0 +1,105 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from rag_chat.services.fanout import fan_out, get_fanout_stats
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the chat pipeline's database fan-out with fresh per-thread "
+        "connections (the old behaviour) against the connection pool"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests", type=int, default=50, help="Simulated chat requests"
+        )
+        parser.add_argument(
+            "--fanout",
+            type=int,
+            default=3,
+            help="Parallel searches per request (the pipeline runs 2-3)",
+        )
+        parser.add_argument(
+            "--query-ms",
+            type=float,
+            default=5.0,
+            help="Simulated search time per query, in milliseconds",
+        )
+
+    def handle(self, *args, **options):
+        if getattr(connection, "pool", None) is None:
+            raise CommandError(
+                "Connection pooling is disabled; set DATABASE_POOL_ENABLED=True"
+            )
+
+        sql = "SELECT pg_sleep(%s)"
+        params = [options["query_ms"] / 1000]
+        connect_params = connection.get_connection_params()
+
+        def fresh_connection_search():
+            # What each new executor thread did: open, query, never reuse
+            with psycopg.connect(**connect_params) as conn:
+                conn.execute(sql, params)
+
+        def pooled_search():
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+
+        def unpooled_request():
+            with ThreadPoolExecutor(max_workers=options["fanout"]) as executor:
+                futures = [
+                    executor.submit(fresh_connection_search)
+                    for _ in range(options["fanout"])
+                ]
+                for future in futures:
+                    future.result()
+
+        def pooled_request():
+            fan_out(*[pooled_search] * options["fanout"])
+            connection.close()  # Return the request thread's connection
+
+        # Warm up the pool and the fan-out threads
+        pooled_request()
+
+        self.stdout.write(
+            f"{options['requests']} requests x {options['fanout']} searches "
+            f"of {options['query_ms']:.0f}ms\n"
+        )
+        results = {}
+        for name, request in (
+            ("fresh connections", unpooled_request),
+            ("pooled", pooled_request),
+        ):
+            timings = []
+            for _ in range(options["requests"]):
+                t0 = time.perf_counter()
+                request()
+                timings.append((time.perf_counter() - t0) * 1000)
+            results[name] = timings
+            self.stdout.write(
+                f"  {name:<18} p50 {statistics.median(timings):>7.1f}ms"
+                f"  p95 {_percentile(timings, 95):>7.1f}ms"
+                f"  max {max(timings):>7.1f}ms"
+            )
+
+        saved = _percentile(results["fresh connections"], 95) - _percentile(
+            results["pooled"], 95
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\nConnection setup removed from p95 per request: {saved:.1f}ms"
+            )
+        )
+        self.stdout.write(f"Pool: {connection.pool.get_stats()}")
+        self.stdout.write(f"Fan-out: {get_fanout_stats()}")
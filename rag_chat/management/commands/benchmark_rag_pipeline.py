@@ -0,0 +1,256 @@
+import json
+import random
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVector
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from openai import OpenAI
+
+from association.models import Association
+from character.models import Character
+from item.models import Item
+from nucleus.models import Alias, GameLog
+from place.models import Place
+from rag_chat.benchmarking import (
+    DEFAULT_QUESTIONS_PATH,
+    DEFAULT_RECORDINGS_PATH,
+    RecordedOpenAI,
+    StageRecorder,
+    openai_clients,
+)
+from rag_chat.embeddings import clear_embedding_cache
+from rag_chat.models import ChatMessage, ChatSession
+from rag_chat.services.RAGService import RAGService
+from rag_chat.tasks import process_content
+
+CHARACTERS = [
+    ("Izar", "A wandering scholar of the Branch of Teresias who reads the old script."),
+    ("Bruno", "An elf revealed to be this generation's Teresias."),
+    ("Hrothulf", "A broad-shouldered warrior who never forgets a face."),
+    ("Dorinda", "A cleric who joined the Branch on Hielo."),
+    ("Darnit", "A pilot who keeps the Starwake flying."),
+    ("Bode Augur", "A collector of relics who holds the Codex of Teresias."),
+]
+PLACES = [
+    ("Hielo", "An ice planet whose ruins hide the first Branch's vaults."),
+    ("Azura", "A trade world of foundries and glass markets."),
+    ("Glass Market", "A bazaar on Azura where relics change hands."),
+    ("Sunken Archive", "A flooded library holding records of earlier Branches."),
+    ("Ember Reach", "A mining belt between the two suns."),
+]
+ITEMS = [
+    ("Codex of Teresias", "A book of prophecies about the gods and the Vardum."),
+    ("Solar Cannon", "A weapon the Vardum are building to destroy the gods."),
+    ("Starwake", "The Branch's ship."),
+]
+ASSOCIATIONS = [
+    ("Vardum", "An order that seeks to control the gods."),
+    ("Branch of Teresias", "The latest Branch sworn to free the gods."),
+]
+VERBS = ["met", "argued with", "followed", "rescued", "bargained with", "fled from"]
+DETAILS = [
+    "under the light of both suns",
+    "while the ship's engines cooled",
+    "as the ice cracked beneath them",
+    "before the market bells rang",
+    "with the Codex hidden in a crate",
+    "after a long night of watch",
+]
+
+
+def synthetic_log_text(rng: random.Random, session_number: int, words: int) -> str:
+    """Pure given rng. Paragraphs of events naming campaign entities."""
+    names = [name for name, _ in CHARACTERS + ITEMS + ASSOCIATIONS]
+    places = [name for name, _ in PLACES]
+    sentences = []
+    length = 0
+    while length < words:
+        sentence = (
+            f"In session {session_number}, {rng.choice(names)} "
+            f"{rng.choice(VERBS)} {rng.choice(names)} at {rng.choice(places)} "
+            f"{rng.choice(DETAILS)}."
+        )
+        sentences.append(sentence)
+        length += len(sentence.split())
+    return " ".join(sentences)
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay multi-turn questions against prepare_context on a throwaway "
+        "database, with OpenAI responses from recorded fixtures, and report "
+        "per-stage latency and query counts as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--questions",
+            default=str(DEFAULT_QUESTIONS_PATH),
+            help="JSON corpus of conversations to replay",
+        )
+        parser.add_argument(
+            "--recordings",
+            default=str(DEFAULT_RECORDINGS_PATH),
+            help="Recorded OpenAI responses. Missing requests get deterministic "
+            "synthetic responses.",
+        )
+        parser.add_argument(
+            "--record",
+            action="store_true",
+            help="Call OpenAI for requests missing from --recordings and save them",
+        )
+        parser.add_argument(
+            "--replay-latency",
+            action="store_true",
+            help="Sleep for each recorded response's original latency",
+        )
+        parser.add_argument(
+            "--logs", type=int, default=12, help="Synthetic game logs to create"
+        )
+        parser.add_argument(
+            "--log-words", type=int, default=2500, help="Words per synthetic log"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Times to replay the corpus"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the benchmark database (and its campaign) between runs",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this path")
+
+    def handle(self, *args, **options):
+        conversations = json.loads(Path(options["questions"]).read_text())[
+            "conversations"
+        ]
+        live = None
+        if options["record"]:
+            if not settings.OPENAI_API_KEY:
+                raise CommandError("--record needs OPENAI_API_KEY")
+            live = OpenAI(api_key=settings.OPENAI_API_KEY)
+        client = RecordedOpenAI(
+            options["recordings"], live=live, replay_latency=options["replay_latency"]
+        )
+
+        # Never touch the configured database: run against its test database
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"], serialize=False
+        )
+        try:
+            with override_settings(
+                EMBEDDING_CACHE_ALIAS="",
+                LOG_SUMMARIES_CACHE_ALIAS="",
+                RAG_AUTO_REINDEX=False,
+            ), openai_clients(client):
+                if not GameLog.objects.exists():
+                    self._load_campaign(options)
+                report = self._replay(conversations, options["repeat"])
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            if options["record"]:
+                client.save()
+
+        report["openai"] = dict(client.stats)
+        report["settings"] = {
+            name: getattr(settings, name)
+            for name in (
+                "RAG_RETRIEVAL_MODE",
+                "RAG_VECTOR_SEARCH",
+                "RAG_LOG_CONTEXT_MODE",
+                "RAG_FANOUT_MAX_WORKERS",
+            )
+        }
+        self._write_report(report)
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2))
+            self.stdout.write(f"\nWrote {options['output']}")
+
+    def _load_campaign(self, options):
+        rng = random.Random(options["seed"])
+        self.stdout.write("Loading synthetic campaign...")
+
+        for model, rows in (
+            (Character, CHARACTERS),
+            (Place, PLACES),
+            (Item, ITEMS),
+            (Association, ASSOCIATIONS),
+        ):
+            for name, description in rows:
+                entity = model.objects.create(name=name, description=description)
+                entity.aliases.add(Alias.objects.create(name=name, is_primary=True))
+
+        # bulk_create: GameLog.save() would fetch the log from Google Drive
+        logs = []
+        for session_number in range(1, options["logs"] + 1):
+            full_text = synthetic_log_text(rng, session_number, options["log_words"])
+            log = GameLog(
+                url=f"benchmark-log-{session_number}",
+                title=f"Session {session_number}",
+                session_number=session_number,
+                full_text=full_text,
+                summary=" ".join(full_text.split()[:60]),
+            )
+            log.refresh_token_counts()
+            logs.append(log)
+        GameLog.objects.bulk_create(logs)
+        GameLog.objects.update(
+            full_text_search_vector=SearchVector("full_text", config="simple")
+        )
+
+        for content_type, model in (
+            ("character", Character),
+            ("place", Place),
+            ("item", Item),
+            ("association", Association),
+            ("gamelog", GameLog),
+        ):
+            for pk in model.objects.values_list("pk", flat=True):
+                process_content.apply(args=(content_type, pk)).get()
+
+    def _replay(self, conversations, repeat):
+        user, _ = get_user_model().objects.get_or_create(username="rag-benchmark")
+        service = RAGService()
+        recorder = StageRecorder()
+
+        with recorder.active():
+            for _ in range(repeat):
+                for conversation in conversations:
+                    session = ChatSession.objects.create(user=user)
+                    for turn in conversation["turns"]:
+                        clear_embedding_cache()
+                        recorder.start_turn()
+                        service.prepare_context(turn["question"], session=session)
+                        recorder.end_turn()
+                        ChatMessage.objects.create(
+                            session=session,
+                            message=turn["question"],
+                            response=turn["response"],
+                        )
+
+        turns = sum(len(c["turns"]) for c in conversations) * repeat
+        return {"turns": turns, "stages": recorder.report()}
+
+    def _write_report(self, report):
+        stages = report["stages"]
+        w = max(len(name) for name in stages)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n{report['turns']} turns; OpenAI {report['openai'] or 'no calls'}"
+            )
+        )
+        self.stdout.write(
+            f"  {'Stage':<{w}}  {'p50':>9}  {'p95':>9}  {'queries p50':>11}"
+        )
+        for name, stage in stages.items():
+            p50 = f"{stage['p50_ms']:.1f}ms" if "p50_ms" in stage else "-"
+            p95 = f"{stage['p95_ms']:.1f}ms" if "p95_ms" in stage else "-"
+            queries = stage.get("queries_p50", "-")
+            self.stdout.write(f"  {name:<{w}}  {p50:>9}  {p95:>9}  {queries:>11}")
@@ -0,0 +1,91 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from character.models import Character
+from rag_chat.services.normalize_and_hybrid_rank_fuse import (
+    ScoreSetElement,
+    fuse_scores,
+    hybrid_rank_fuse,
+    remove_results_more_than_stddev_below_mean,
+    z_score_normalize,
+)
+from rag_chat.services.RAGService import SEMANTIC_WEIGHT, TRIGRAM_WEIGHT
+
+
+def reference_fuse(*sets_with_weights):
+    """The pure-Python pipeline fuse_scores replaces."""
+    return remove_results_more_than_stddev_below_mean(
+        hybrid_rank_fuse(
+            *(
+                (z_score_normalize(elements), weight)
+                for elements, weight in sets_with_weights
+            )
+        )
+    )
+
+
+class Command(BaseCommand):
+    help = "Benchmark NumPy score fusion against the pure-Python reference"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--candidates",
+            type=int,
+            default=10_000,
+            help="Distinct results across both score sets",
+        )
+        parser.add_argument(
+            "--overlap",
+            type=float,
+            default=0.5,
+            help="Fraction of results that appear in both sets",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Timed runs per implementation"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        n = options["candidates"]
+        shared = int(n * options["overlap"])
+
+        # Unsaved instances: fusion only needs their pk and global_id()
+        entities = [Character(id=i + 1, name=f"Character {i}") for i in range(n)]
+        first_only = (n - shared) // 2
+        semantic = [
+            ScoreSetElement(e, rng.random()) for e in entities[: first_only + shared]
+        ]
+        trigram = [ScoreSetElement(e, rng.random()) for e in entities[first_only:]]
+        rng.shuffle(semantic)
+        rng.shuffle(trigram)
+        sets = ((semantic, SEMANTIC_WEIGHT), (trigram, TRIGRAM_WEIGHT))
+
+        self.stdout.write(
+            f"{n} candidates: {len(semantic)} semantic, {len(trigram)} trigram, "
+            f"{shared} in both"
+        )
+
+        results = {}
+        for name, fuse in (("reference", reference_fuse), ("numpy", fuse_scores)):
+            fuse(*sets)  # warm-up
+            timings = []
+            for _ in range(options["repeat"]):
+                t0 = time.perf_counter()
+                results[name] = fuse(*sets)
+                timings.append(time.perf_counter() - t0)
+            self.stdout.write(
+                f"  {name:<10} median {statistics.median(timings) * 1000:>8.2f}ms"
+                f"  min {min(timings) * 1000:>8.2f}ms"
+                f"  kept {len(results[name])}"
+            )
+
+        reference_order = [r.data.pk for r in results["reference"]]
+        numpy_order = [r.data.pk for r in results["numpy"]]
+        if reference_order == numpy_order:
+            self.stdout.write(self.style.SUCCESS("  orderings match"))
+        else:
+            self.stdout.write(self.style.WARNING("  orderings differ"))
@@ -0,0 +1,97 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rag_chat.services.alias_matcher import get_alias_matcher
+from rag_chat.services.entity_extractor import entity_extractor
+from rag_chat.services.trigram_entity_search import (
+    trigram_entity_search,
+    trigram_entity_search_per_candidate,
+)
+
+# Long, conversational queries of the kind the chat actually receives
+DEFAULT_QUERIES = [
+    "What happened when Bruno and Hrothulf went back to the old temple after the fight with the void spiders, and did anyone ever find out who sent them?",
+    "Can you remind me what Izar said to Bode Augur about the Codex of Teresias the last time we saw him, and whether the Vardum were involved in that conversation?",
+    "I keep forgetting which planet the Branch of Teresias first met Darnit on, and what Dorinda was doing there before she joined us on the ship.",
+    "Tell me everything we know about the Solar Cannon, who is building it, where the parts are coming from, and how the gods might be affected if it is ever finished.",
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmark single-statement trigram entity search against the per-candidate baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--query",
+            action="append",
+            dest="queries",
+            help="Query to benchmark (repeatable). Defaults to a built-in set.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Timed runs per query and implementation",
+        )
+
+    def handle(self, *args, **options):
+        queries = options["queries"] or DEFAULT_QUERIES
+        repeat = options["repeat"]
+
+        implementations = {
+            "per_candidate": trigram_entity_search_per_candidate,
+            "single_statement": trigram_entity_search,
+        }
+
+        matcher = get_alias_matcher()
+        self.stdout.write(f"Alias matcher: {len(matcher)} names")
+
+        for query in queries:
+            candidates = entity_extractor.extract_candidates(query)
+            self.stdout.write(
+                self.style.SUCCESS(f"\n{query[:80]}... ({len(candidates)} n-grams)")
+            )
+
+            timings = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                exact = matcher.find(query)
+                timings.append(time.perf_counter() - t0)
+            self.stdout.write(
+                f"  {'exact_matcher':<18} median {statistics.median(timings) * 1e6:>8.1f}us"
+                f"  exact hits {len(exact)}"
+            )
+
+            results_by_impl = {}
+            for name, search in implementations.items():
+                search(query)  # warm-up
+
+                timings = []
+                for _ in range(repeat):
+                    with CaptureQueriesContext(connection) as ctx:
+                        t0 = time.perf_counter()
+                        results = search(query)
+                        timings.append(time.perf_counter() - t0)
+
+                results_by_impl[name] = {(r.entity_type, r.entity_id) for r in results}
+                p95 = sorted(timings)[max(0, int(len(timings) * 0.95) - 1)]
+                self.stdout.write(
+                    f"  {name:<18} median {statistics.median(timings) * 1000:>8.1f}ms"
+                    f"  p95 {p95 * 1000:>8.1f}ms"
+                    f"  queries {len(ctx.captured_queries):>4}"
+                    f"  entities {len(results)}"
+                )
+
+            baseline = results_by_impl["per_candidate"]
+            single = results_by_impl["single_statement"]
+            if baseline != single:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"  result sets differ: only baseline {sorted(baseline - single)}, "
+                        f"only single-statement {sorted(single - baseline)}"
+                    )
+                )
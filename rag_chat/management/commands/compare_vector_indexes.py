@@ -0,0 +1,150 @@
+import random
+import statistics
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from rag_chat.embeddings import get_embedding
+from rag_chat.models import ContentChunk
+from rag_chat.services.RAGService import RAGService
+from rag_chat.vector_search import VECTOR_SEARCH_MODES
+
+INDEX_NAMES = {
+    "full": "embedding_hnsw_idx",
+    "halfvec": "embedding_halfvec_hnsw_idx",
+    "binary": "embedding_bit_hnsw_idx",
+    "short": "embedding_short_hnsw_idx",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare recall and latency of the full, halfvec, binary-quantized "
+        "and short-vector HNSW indexes against an exact (sequential scan) "
+        "search. Build the modes' indexes first with "
+        "`sync_vector_indexes --mode <mode> --keep`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--query",
+            action="append",
+            dest="queries",
+            help="Query to embed and search (repeatable). Defaults to sampling "
+            "stored chunk embeddings, which needs no OpenAI calls.",
+        )
+        parser.add_argument(
+            "--sample",
+            type=int,
+            default=20,
+            help="Stored chunks to use as queries when no --query is given",
+        )
+        parser.add_argument("--k", type=int, default=10, help="Results per search")
+        parser.add_argument(
+            "--rerank-candidates",
+            type=int,
+            default=settings.RAG_VECTOR_RERANK_CANDIDATES,
+            help="Candidates the coarse modes rerank",
+        )
+        parser.add_argument(
+            "--ef-search",
+            type=int,
+            default=None,
+            help="hnsw.ef_search for the session; an HNSW scan returns at most "
+            "this many rows, so keep it >= --rerank-candidates",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Timed runs per query and mode"
+        )
+
+    def handle(self, *args, **options):
+        k = options["k"]
+        repeat = options["repeat"]
+        embeddings = self._query_embeddings(options)
+        if not embeddings:
+            self.stdout.write(self.style.WARNING("No queries: no chunks are embedded"))
+            return
+
+        self._write_index_sizes()
+
+        ef_search = options["ef_search"] or max(40, options["rerank_candidates"])
+        service = RAGService()
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET hnsw.ef_search = %s", [ef_search])
+
+        search = partial(
+            self._top_k, service, k=k, rerank_candidates=options["rerank_candidates"]
+        )
+        exact = [search(embedding, "full", exact=True) for embedding in embeddings]
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n{len(embeddings)} queries, k={k}, "
+                f"rerank candidates={options['rerank_candidates']}, "
+                f"ef_search={ef_search}"
+            )
+        )
+        for mode in VECTOR_SEARCH_MODES:
+            recalls, timings = [], []
+            for embedding, truth in zip(embeddings, exact):
+                search(embedding, mode)  # warm-up
+                for _ in range(repeat):
+                    t0 = time.perf_counter()
+                    found = search(embedding, mode)
+                    timings.append(time.perf_counter() - t0)
+                if truth:
+                    recalls.append(len(set(found) & set(truth)) / len(truth))
+
+            p95 = sorted(timings)[max(0, int(len(timings) * 0.95) - 1)]
+            recall = statistics.mean(recalls) if recalls else 0.0
+            self.stdout.write(
+                f"  {mode:<8} recall@{k} {recall:>6.3f}"
+                f"  median {statistics.median(timings) * 1000:>8.1f}ms"
+                f"  p95 {p95 * 1000:>8.1f}ms"
+            )
+
+    def _query_embeddings(self, options):
+        if options["queries"]:
+            return [get_embedding(query) for query in options["queries"]]
+
+        pks = list(ContentChunk.objects.values_list("pk", flat=True))
+        sample = random.sample(pks, min(options["sample"], len(pks)))
+        return [
+            list(embedding)
+            for embedding in ContentChunk.objects.filter(pk__in=sample).values_list(
+                "embedding", flat=True
+            )
+        ]
+
+    def _top_k(self, service, embedding, mode, k, rerank_candidates, exact=False):
+        queryset = service._semantic_search_queryset(
+            embedding,
+            similarity_threshold=-1.0,
+            vector_search=mode,
+            rerank_candidates=rerank_candidates,
+        )
+        if not exact:
+            return list(queryset.values_list("pk", flat=True)[:k])
+        # Ground truth: forbid index scans so Postgres compares every chunk
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_indexscan = off")
+            return list(queryset.values_list("pk", flat=True)[:k])
+
+    def _write_index_sizes(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname, pg_relation_size(indexname::regclass) "
+                "FROM pg_indexes WHERE indexname = ANY(%s)",
+                [list(INDEX_NAMES.values())],
+            )
+            sizes = dict(cursor.fetchall())
+
+        self.stdout.write(f"Chunks: {ContentChunk.objects.count()}")
+        for mode, name in INDEX_NAMES.items():
+            size = sizes.get(name)
+            shown = f"{size / 1024 / 1024:>8.1f} MiB" if size is not None else "missing"
+            self.stdout.write(f"  {mode:<8} {name:<28} {shown}")
@@ -0,0 +1,94 @@
+from django.core.management.base import BaseCommand
+
+from rag_chat.openai_standin import (
+    LATENCY_DISTRIBUTIONS,
+    LATENCY_FIXED,
+    StandInConfig,
+    StandInServer,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve a local stand-in for the OpenAI embeddings, chat completions and "
+        "audio transcription endpoints, for load and soak testing"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8900)
+        parser.add_argument(
+            "--latency",
+            choices=LATENCY_DISTRIBUTIONS,
+            default=LATENCY_FIXED,
+            help="Distribution of the wait before each response",
+        )
+        parser.add_argument(
+            "--latency-ms", type=float, default=0.0, help="Mean latency"
+        )
+        parser.add_argument(
+            "--jitter-ms",
+            type=float,
+            default=0.0,
+            help="Latency standard deviation (normal and lognormal)",
+        )
+        parser.add_argument(
+            "--tokens-per-second",
+            type=float,
+            default=0.0,
+            help="Completion token rate, streamed or not (0 for no pacing)",
+        )
+        parser.add_argument(
+            "--completion-words",
+            type=int,
+            default=0,
+            help="Pad completions to this many words (0 echoes the question)",
+        )
+        parser.add_argument(
+            "--rate-limit-rate",
+            type=float,
+            default=0.0,
+            help="Share of requests answered with a 429",
+        )
+        parser.add_argument(
+            "--server-error-rate",
+            type=float,
+            default=0.0,
+            help="Share of requests answered with a 500, 502 or 503",
+        )
+        parser.add_argument(
+            "--retry-after",
+            type=float,
+            default=1.0,
+            help="Retry-After seconds sent with 429s",
+        )
+        parser.add_argument("--seed", type=int, help="Seed for latency and errors")
+
+    def handle(self, *args, **options):
+        config = StandInConfig(
+            latency=options["latency"],
+            latency_ms=options["latency_ms"],
+            jitter_ms=options["jitter_ms"],
+            tokens_per_second=options["tokens_per_second"],
+            completion_words=options["completion_words"],
+            rate_limit_rate=options["rate_limit_rate"],
+            server_error_rate=options["server_error_rate"],
+            retry_after=options["retry_after"],
+            seed=options["seed"],
+        )
+        server = StandInServer(
+            (options["host"], options["port"]),
+            config,
+            quiet=options["verbosity"] < 2,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"OpenAI stand-in listening on {server.base_url}")
+        )
+        self.stdout.write(f"Point clients at it with OPENAI_BASE_URL={server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"\nRequests: {dict(server.stats) or 'none'}")
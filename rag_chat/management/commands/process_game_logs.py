@@ -5,11 +5,14 @@ from django.apps import apps
 from django.core.management.base import BaseCommand
 
 from rag_chat.content_processors import CONTENT_PROCESSORS
-from rag_chat.models import ContentChunk
+from rag_chat.models import ContentChunk, EmbeddingJob
 from rag_chat.tasks import (
     cleanup_orphaned_chunks,
+    get_content_items,
     process_all_content,
     process_content,
+    run_embedding_job,
+    start_embedding_job,
 )
 
 
@@ -53,6 +56,32 @@ class Command(BaseCommand):
             action="store_true",
             help="Run synchronously instead of using Celery (for testing)",
         )
+        parser.add_argument(
+            "--parallel",
+            type=int,
+            default=1,
+            help="With --sync, process this many objects at once in threads",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Objects per Celery task (default RAG_EMBED_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            help="Celery tasks running at once (default RAG_EMBED_CONCURRENCY)",
+        )
+        parser.add_argument(
+            "--job",
+            type=int,
+            help="Show the progress of an embedding job",
+        )
+        parser.add_argument(
+            "--jobs",
+            action="store_true",
+            help="List recent embedding jobs",
+        )
         parser.add_argument(
             "--cleanup",
             action="store_true",
@@ -69,6 +98,10 @@ class Command(BaseCommand):
             self.show_stats()
             return
 
+        if options["job"] or options["jobs"]:
+            self.show_jobs(options["job"])
+            return
+
         if options["cleanup"]:
             self.handle_cleanup(options)
             return
@@ -80,7 +113,7 @@ class Command(BaseCommand):
         else:
             self.stdout.write(
                 self.style.ERROR(
-                    "Please specify one of: --id with --type, --all, --types, --cleanup, or --stats"
+                    "Please specify one of: --id with --type, --all, --types, --cleanup, --stats, or --jobs"
                 )
             )
 
@@ -142,51 +175,68 @@ class Command(BaseCommand):
                 content_types=content_types,
                 force_reprocess=options["force"],
                 limit=options["limit"],
+                batch_size=options["batch_size"],
+                concurrency=options["concurrency"],
             )
             self.stdout.write(
                 self.style.SUCCESS(f"Queued batch processing task: {task.id}")
             )
+            self.stdout.write(
+                "Follow its progress with --jobs, or in the admin under Embedding jobs"
+            )
 
     def handle_sync_batch(self, content_types, options):
-        """Handle synchronous batch processing"""
-        for content_type in content_types:
-            self.stdout.write(f"\n--- Processing {content_type} ---")
-
-            try:
-                objects = self.get_objects_to_process(
-                    content_type, options["force"], options["limit"]
-                )
-                total = len(objects)
-
-                if total == 0:
-                    self.stdout.write(f"No {content_type} objects to process")
-                    continue
-
-                self.stdout.write(f"Found {total} {content_type} objects to process")
+        """Handle synchronous batch processing, optionally in threads"""
+        items = get_content_items(content_types, options["force"], options["limit"])
+        total = len(items)
+        if total == 0:
+            self.stdout.write("No objects to process")
+            return
 
-                for i, obj in enumerate(objects, 1):
-                    object_id = str(obj.id)
-                    title = getattr(obj, "name", getattr(obj, "title", str(obj)))
+        job = start_embedding_job(content_types, options["force"], total)
+        self.stdout.write(
+            f"Embedding job {job.pk}: {total} objects, {options['parallel']} at a time"
+        )
 
-                    self.stdout.write(f"Processing {i}/{total}: {title}")
+        finished = 0
 
-                    from rag_chat.tasks import process_content
+        def report(result):
+            nonlocal finished
+            finished += 1
+            status_style = (
+                self.style.SUCCESS
+                if result["status"] == "success"
+                else self.style.WARNING
+            )
+            self.stdout.write(
+                f"{finished}/{total} {result['content_type']} {result['object_id']} "
+                f"{status_style(result['status'])}: {result.get('title') or result.get('message', '')}"
+            )
 
-                    result = process_content(content_type, object_id, options["force"])
+        run_embedding_job(
+            job.pk,
+            items,
+            force_reprocess=options["force"],
+            workers=options["parallel"],
+            on_result=report,
+        )
 
-                    status_style = (
-                        self.style.SUCCESS
-                        if result["status"] == "success"
-                        else self.style.WARNING
-                    )
-                    self.stdout.write(
-                        f"  {status_style(result['status'])}: {result.get('message', '')}"
-                    )
+        job.refresh_from_db()
+        self.stdout.write(self.style.SUCCESS(f"\n{job}"))
 
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f"Failed to process {content_type}: {str(e)}")
-                )
+    def show_jobs(self, job_id=None):
+        """Show one embedding job's progress, or the most recent jobs"""
+        jobs = EmbeddingJob.objects.all()
+        if job_id:
+            jobs = jobs.filter(pk=job_id)
+            if not jobs:
+                self.stdout.write(self.style.ERROR(f"No embedding job {job_id}"))
+                return
+        for job in jobs[:10]:
+            self.stdout.write(
+                f"{job.pk}  {job.status:<9}  {job.started_at:%Y-%m-%d %H:%M}  "
+                f"{', '.join(job.content_types)}\n    {job.progress()}"
+            )
 
     def handle_cleanup(self, options):
         """Handle orphaned chunk cleanup"""
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from rag_chat.models import ContentChunk
+from rag_chat.vector_search import VECTOR_SEARCH_MODES, sync_vector_indexes
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the HNSW indexes of a vector search mode (default "
+        "RAG_VECTOR_SEARCH), then drop the other modes' indexes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--mode",
+            choices=VECTOR_SEARCH_MODES,
+            default=None,
+            help="Vector search mode to build the indexes of",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the other modes' indexes, e.g. to compare them with "
+            "compare_vector_indexes",
+        )
+
+    def handle(self, *args, **options):
+        mode = options["mode"] or settings.RAG_VECTOR_SEARCH
+        try:
+            with connection.schema_editor(atomic=False) as schema_editor:
+                built, dropped = sync_vector_indexes(
+                    ContentChunk,
+                    schema_editor,
+                    mode,
+                    drop_unused=not options["keep"],
+                )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for name in built:
+            self.stdout.write(f"Built {name}")
+        for name in dropped:
+            self.stdout.write(f"Dropped {name}")
+        self.stdout.write(self.style.SUCCESS(f"Indexes match vector search '{mode}'"))
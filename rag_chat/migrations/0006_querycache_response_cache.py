@@ -0,0 +1,55 @@
+# Generated by Django 5.2.3 on 2026-10-16 21:07
+
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rag_chat", "0005_add_is_archived_to_chatsession"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="querycache",
+            name="corpus_version",
+            field=models.BigIntegerField(
+                default=0, help_text="Corpus version the response was generated from"
+            ),
+        ),
+        migrations.AddField(
+            model_name="querycache",
+            name="model",
+            field=models.CharField(
+                blank=True,
+                help_text="Chat model that generated the response",
+                max_length=100,
+            ),
+        ),
+        migrations.AddField(
+            model_name="querycache",
+            name="query_embedding",
+            field=pgvector.django.vector.VectorField(
+                blank=True,
+                dimensions=1536,
+                help_text="Embedding of the query, for near-duplicate lookups",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="querycache",
+            name="scope_hash",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="Hash of model, system prompt, threshold and corpus version",
+                max_length=64,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="querycache",
+            index=models.Index(
+                fields=["expires_at"], name="rag_chat_qu_expires_d1efea_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.3 on 2026-10-16 21:15
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.db.models.functions.comparison
+import pgvector.django.bit
+import pgvector.django.halfvec
+import pgvector.django.indexes
+import rag_chat.vector_search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Build the HNSW indexes without blocking writes to content chunks
+    atomic = False
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("rag_chat", "0006_querycache_response_cache"),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="contentchunk",
+            index=pgvector.django.indexes.HnswIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.comparison.Cast(
+                        "embedding",
+                        pgvector.django.halfvec.HalfVectorField(dimensions=1536),
+                    ),
+                    name="halfvec_cosine_ops",
+                ),
+                ef_construction=64,
+                m=16,
+                name="embedding_halfvec_hnsw_idx",
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="contentchunk",
+            index=pgvector.django.indexes.HnswIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.comparison.Cast(
+                        rag_chat.vector_search.BinaryQuantize("embedding"),
+                        pgvector.django.bit.BitField(length=1536),
+                    ),
+                    name="bit_hamming_ops",
+                ),
+                ef_construction=64,
+                m=16,
+                name="embedding_bit_hnsw_idx",
+            ),
+        ),
+    ]
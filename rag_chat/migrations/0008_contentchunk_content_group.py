@@ -0,0 +1,61 @@
+# Generated by Django 5.2.3 on 2026-10-16 21:40
+
+import django.contrib.postgres.operations
+import pgvector.django.indexes
+from django.db import migrations, models
+
+
+def backfill_content_group(apps, schema_editor):
+    ContentChunk = apps.get_model("rag_chat", "ContentChunk")
+    ContentChunk.objects.filter(content_type__model="gamelog").update(
+        content_group="gamelog"
+    )
+    ContentChunk.objects.exclude(content_type__model="gamelog").update(
+        content_group="entity"
+    )
+
+
+class Migration(migrations.Migration):
+    # Build the HNSW indexes without blocking writes to content chunks
+    atomic = False
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("rag_chat", "0007_contentchunk_quantized_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contentchunk",
+            name="content_group",
+            field=models.CharField(
+                blank=True,
+                choices=[("entity", "Entity"), ("gamelog", "Game log")],
+                help_text="Entity or game log; selects the partial HNSW index searched",
+                max_length=16,
+            ),
+        ),
+        migrations.RunPython(backfill_content_group, migrations.RunPython.noop),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="contentchunk",
+            index=pgvector.django.indexes.HnswIndex(
+                condition=models.Q(("content_group", "entity")),
+                ef_construction=64,
+                fields=["embedding"],
+                m=16,
+                name="embedding_entity_hnsw_idx",
+                opclasses=["vector_cosine_ops"],
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="contentchunk",
+            index=pgvector.django.indexes.HnswIndex(
+                condition=models.Q(("content_group", "gamelog")),
+                ef_construction=64,
+                fields=["embedding"],
+                m=16,
+                name="embedding_gamelog_hnsw_idx",
+                opclasses=["vector_cosine_ops"],
+            ),
+        ),
+    ]
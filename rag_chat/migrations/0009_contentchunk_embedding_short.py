@@ -0,0 +1,45 @@
+# Generated by Django 5.2.3 on 2026-10-16 22:05
+
+import django.contrib.postgres.operations
+import pgvector.django.indexes
+import pgvector.django.vector
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Build the HNSW index without blocking writes to content chunks
+    atomic = False
+
+    dependencies = [
+        ("rag_chat", "0008_contentchunk_content_group"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contentchunk",
+            name="embedding_short",
+            field=pgvector.django.vector.VectorField(
+                blank=True,
+                dimensions=256,
+                help_text="Leading dimensions of the embedding, renormalized, for the coarse search pass",
+                null=True,
+            ),
+        ),
+        # Same as vector_search.shorten_embedding, computed in the database
+        migrations.RunSQL(
+            "UPDATE rag_chat_contentchunk "
+            "SET embedding_short = l2_normalize(subvector(embedding, 1, 256)) "
+            "WHERE embedding_short IS NULL",
+            migrations.RunSQL.noop,
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="contentchunk",
+            index=pgvector.django.indexes.HnswIndex(
+                ef_construction=64,
+                fields=["embedding_short"],
+                m=16,
+                name="embedding_short_hnsw_idx",
+                opclasses=["vector_cosine_ops"],
+            ),
+        ),
+    ]
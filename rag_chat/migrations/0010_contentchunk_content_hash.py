@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-16 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rag_chat", "0009_contentchunk_embedding_short"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contentchunk",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                help_text="Hash of chunk text, processor version and embedding model; unchanged chunks keep their embedding when reprocessed",
+                max_length=64,
+            ),
+        ),
+    ]
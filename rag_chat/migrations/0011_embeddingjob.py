@@ -0,0 +1,62 @@
+# Generated by Django 5.2.3 on 2026-10-17 00:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rag_chat", "0010_contentchunk_content_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmbeddingJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("content_types", models.JSONField(default=list)),
+                ("force_reprocess", models.BooleanField(default=False)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("running", "Running"), ("completed", "Completed")],
+                        default="running",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "total",
+                    models.IntegerField(default=0, help_text="Objects to process"),
+                ),
+                (
+                    "done",
+                    models.IntegerField(
+                        default=0, help_text="Objects processed or skipped"
+                    ),
+                ),
+                (
+                    "failed",
+                    models.IntegerField(default=0, help_text="Objects that failed"),
+                ),
+                ("chunks", models.IntegerField(default=0, help_text="Chunks embedded")),
+                (
+                    "tokens",
+                    models.IntegerField(
+                        default=0, help_text="Tokens sent to the embeddings API"
+                    ),
+                ),
+                ("started_at", models.DateTimeField(auto_now_add=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "ordering": ["-started_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.3 on 2026-10-17 02:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rag_chat", "0011_embeddingjob"),
+    ]
+
+    # Which HNSW indexes exist now depends on RAG_VECTOR_SEARCH, so they leave
+    # the migration state without touching the database. `manage.py
+    # sync_vector_indexes` builds the configured mode's indexes and drops the
+    # others (see vector_search.VECTOR_INDEXES).
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveIndex(
+                    model_name="contentchunk",
+                    name="embedding_hnsw_idx",
+                ),
+                migrations.RemoveIndex(
+                    model_name="contentchunk",
+                    name="embedding_entity_hnsw_idx",
+                ),
+                migrations.RemoveIndex(
+                    model_name="contentchunk",
+                    name="embedding_gamelog_hnsw_idx",
+                ),
+                migrations.RemoveIndex(
+                    model_name="contentchunk",
+                    name="embedding_halfvec_hnsw_idx",
+                ),
+                migrations.RemoveIndex(
+                    model_name="contentchunk",
+                    name="embedding_bit_hnsw_idx",
+                ),
+            ],
+        ),
+    ]
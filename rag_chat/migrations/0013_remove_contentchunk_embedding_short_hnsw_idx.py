@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-17 02:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rag_chat", "0012_vector_search_indexes"),
+    ]
+
+    # Like the other modes' indexes (0012), the short-vector index is only
+    # wanted while RAG_VECTOR_SEARCH is "short"; `manage.py
+    # sync_vector_indexes` builds or drops it.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveIndex(
+                    model_name="contentchunk",
+                    name="embedding_short_hnsw_idx",
+                ),
+            ],
+        ),
+    ]
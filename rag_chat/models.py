@@ -1,8 +1,18 @@
+from datetime import timedelta
+
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
-from pgvector.django import HnswIndex, VectorField
+from django.utils import timezone
+from pgvector.django import VectorField
+
+from .vector_search import (
+    CONTENT_GROUP_CHOICES,
+    SHORT_EMBEDDING_DIMENSIONS,
+    content_group_for,
+    shorten_embedding,
+)
 
 
 class ContentChunk(models.Model):
@@ -40,6 +50,12 @@ class ContentChunk(models.Model):
         help_text="ID of the source object (primary key of the related model)",
     )
     content_object = GenericForeignKey("content_type", "object_id")
+    content_group = models.CharField(
+        max_length=16,
+        choices=CONTENT_GROUP_CHOICES,
+        blank=True,
+        help_text="Entity or game log; selects the partial HNSW index searched",
+    )
     chunk_text = models.TextField(help_text="The actual text content of this chunk")
     chunk_index = models.IntegerField(
         default=0,
@@ -48,6 +64,18 @@ class ContentChunk(models.Model):
     embedding = VectorField(
         dimensions=1536, help_text="OpenAI text-embedding-3-small vector"
     )
+    embedding_short = VectorField(
+        dimensions=SHORT_EMBEDDING_DIMENSIONS,
+        null=True,
+        blank=True,
+        help_text="Leading dimensions of the embedding, renormalized, for the coarse search pass",
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Hash of chunk text, processor version and embedding model; "
+        "unchanged chunks keep their embedding when reprocessed",
+    )
     metadata = models.JSONField(
         default=dict,
         help_text="Content-specific metadata: titles, URLs, relationships, dates, etc.",
@@ -61,18 +89,21 @@ class ContentChunk(models.Model):
             models.Index(fields=["object_id"]),
             models.Index(fields=["content_type", "object_id"]),
             models.Index(fields=["chunk_index"]),
-            # HNSW vector index for cosine similarity search
-            HnswIndex(
-                name="embedding_hnsw_idx",
-                fields=["embedding"],
-                m=16,
-                ef_construction=64,
-                opclasses=["vector_cosine_ops"],
-            ),
+            # The HNSW indexes depend on RAG_VECTOR_SEARCH, see
+            # vector_search.VECTOR_INDEXES
         ]
         unique_together = ["content_type", "object_id", "chunk_index"]
         ordering = ["content_type", "object_id", "chunk_index"]
 
+    def save(self, *args, **kwargs):
+        if self.embedding_short is None and self.embedding is not None:
+            self.embedding_short = shorten_embedding(self.embedding)
+        if not self.content_group and self.content_type_id:
+            self.content_group = content_group_for(
+                ContentType.objects.get_for_id(self.content_type_id).model
+            )
+        super().save(*args, **kwargs)
+
     def __str__(self):
         title = self.metadata.get("title", self.object_id)
         content_type_name = self.content_type.model if self.content_type else "Unknown"
@@ -81,6 +112,50 @@ class ContentChunk(models.Model):
         return f"{content_type_name.title()}: {title}"
 
 
+class EmbeddingJob(models.Model):
+    """
+    Progress of a full-corpus embedding run (tasks.process_all_content, or
+    `process_game_logs --sync`), updated as each object finishes
+    """
+
+    content_types = models.JSONField(default=list)
+    force_reprocess = models.BooleanField(default=False)
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            ("running", "Running"),
+            ("completed", "Completed"),
+        ],
+        default="running",
+    )
+    total = models.IntegerField(default=0, help_text="Objects to process")
+    done = models.IntegerField(default=0, help_text="Objects processed or skipped")
+    failed = models.IntegerField(default=0, help_text="Objects that failed")
+    chunks = models.IntegerField(default=0, help_text="Chunks embedded")
+    tokens = models.IntegerField(
+        default=0, help_text="Tokens sent to the embeddings API"
+    )
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-started_at"]
+
+    @property
+    def elapsed(self) -> timedelta:
+        return (self.finished_at or timezone.now()) - self.started_at
+
+    def progress(self) -> str:
+        return (
+            f"{self.done + self.failed}/{self.total} objects ({self.failed} failed), "
+            f"{self.chunks} chunks, {self.tokens} tokens, "
+            f"{self.elapsed.total_seconds():.0f}s"
+        )
+
+    def __str__(self):
+        return f"Embedding job {self.pk} ({self.status}): {self.progress()}"
+
+
 class ChatSession(models.Model):
     """
     Represents a chat conversation with the RAG bot
@@ -172,11 +247,32 @@ class QueryCache(models.Model):
     hit_count = models.IntegerField(
         default=0, help_text="How many times this cache was used"
     )
+    model = models.CharField(
+        max_length=100, blank=True, help_text="Chat model that generated the response"
+    )
+    corpus_version = models.BigIntegerField(
+        default=0, help_text="Corpus version the response was generated from"
+    )
+    scope_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        help_text="Hash of model, system prompt, threshold and corpus version",
+    )
+    query_embedding = VectorField(
+        dimensions=1536,
+        null=True,
+        blank=True,
+        help_text="Embedding of the query, for near-duplicate lookups",
+    )
     expires_at = models.DateTimeField(help_text="When this cache entry expires")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["expires_at"]),
+        ]
 
     def __str__(self):
         return f"Cache: {self.query_text[:50]}... (hits: {self.hit_count})"
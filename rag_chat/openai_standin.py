@@ -0,0 +1,386 @@
+"""
+A local stand-in for the OpenAI API, for load and soak testing.
+
+`manage.py openai_standin` serves the endpoints this project calls:
+
+  POST /v1/embeddings            float or base64 encoding, `dimensions`
+  POST /v1/chat/completions      plain or streamed (SSE), with the usage
+                                 chunk when stream_options.include_usage
+  POST /v1/audio/transcriptions  json, text or verbose_json
+
+Point every client at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1.
+
+Responses are deterministic: embeddings and completions are the synthetic
+ones from benchmarking.py, and a transcript depends only on the audio bytes
+and prompt. Latency, streaming token rate and injected 429/5xx errors are set
+by StandInConfig and are random per request (seed them for repeatable runs).
+"""
+
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .benchmarking import _pack, synthetic_completion, synthetic_embedding
+from .utils import count_tokens
+from .vector_search import shorten_embedding
+
+LATENCY_FIXED = "fixed"
+LATENCY_NORMAL = "normal"
+LATENCY_LOGNORMAL = "lognormal"
+LATENCY_DISTRIBUTIONS = [LATENCY_FIXED, LATENCY_NORMAL, LATENCY_LOGNORMAL]
+
+SERVER_ERROR_STATUSES = [500, 502, 503]
+
+# Rough bytes per second of compressed speech audio, for transcript durations
+AUDIO_BYTES_PER_SECOND = 16000
+TRANSCRIPT_SEGMENT_SECONDS = 5.0
+
+
+@dataclass
+class StandInConfig:
+    latency: str = LATENCY_FIXED
+    latency_ms: float = 0.0  # mean time before the response (first token)
+    jitter_ms: float = 0.0  # standard deviation, for normal and lognormal
+    tokens_per_second: float = 0.0  # completion pacing; 0 sends at once
+    completion_words: int = 0  # pad replies to this many words; 0 echoes
+    rate_limit_rate: float = 0.0  # share of requests answered 429
+    server_error_rate: float = 0.0  # share answered 500/502/503
+    retry_after: float = 1.0  # seconds, sent with 429s
+    seed: Optional[int] = None
+
+
+def sample_latency(config: StandInConfig, rng: random.Random) -> float:
+    """Seconds to wait before responding, from the configured distribution."""
+    mean = config.latency_ms / 1000
+    jitter = config.jitter_ms / 1000
+    if config.latency == LATENCY_NORMAL:
+        return max(0.0, rng.gauss(mean, jitter))
+    if config.latency == LATENCY_LOGNORMAL and mean > 0:
+        # Parameters giving the lognormal the configured mean and deviation
+        sigma = math.sqrt(math.log(1 + (jitter / mean) ** 2))
+        return rng.lognormvariate(math.log(mean) - sigma**2 / 2, sigma)
+    return mean
+
+
+def reply_words(messages: List[dict], completion_words: int = 0) -> List[str]:
+    """Pure. The synthetic completion, repeated up to completion_words words."""
+    words = synthetic_completion(messages).split() or ["OK."]
+    if completion_words:
+        words = (words * math.ceil(completion_words / len(words)))[:completion_words]
+    return words
+
+
+def synthetic_transcript(audio: bytes, prompt: str = "") -> Tuple[str, List[dict]]:
+    """
+    Pure. Text and verbose_json segments for an audio file: one sentence per
+    TRANSCRIPT_SEGMENT_SECONDS of estimated duration, from the prompt's words.
+    """
+    duration = max(1.0, len(audio) / AUDIO_BYTES_PER_SECOND)
+    vocabulary = re.findall(r"[A-Za-z']+", prompt) or ["the", "party", "rests"]
+    rng = random.Random(hashlib.sha256(audio + prompt.encode()).digest())
+
+    segments = []
+    start = 0.0
+    while start < duration:
+        end = min(duration, start + TRANSCRIPT_SEGMENT_SECONDS)
+        sentence = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(4, 12)))
+        segments.append(
+            {
+                "id": len(segments),
+                "seek": 0,
+                "start": round(start, 2),
+                "end": round(end, 2),
+                "text": f" {sentence[0].upper()}{sentence[1:]}.",
+                "tokens": [],
+                "temperature": 0.0,
+                "avg_logprob": -0.2,
+                "compression_ratio": 1.2,
+                "no_speech_prob": 0.01,
+            }
+        )
+        start = end
+    return "".join(s["text"] for s in segments).strip(), segments
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: StandInConfig, quiet: bool = True):
+        super().__init__(address, StandInHandler)
+        self.config = config
+        self.quiet = quiet
+        self.rng = random.Random(config.seed)
+        self.stats: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._ids = 0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def draw(self) -> Tuple[Optional[int], float]:
+        """Injected error status (or None) and latency for one request."""
+        with self._lock:
+            roll = self.rng.random()
+            latency = sample_latency(self.config, self.rng)
+            status = None
+            if roll < self.config.rate_limit_rate:
+                status = 429
+            elif roll < self.config.rate_limit_rate + self.config.server_error_rate:
+                status = self.rng.choice(SERVER_ERROR_STATUSES)
+            return status, latency
+
+    def next_id(self, prefix: str) -> str:
+        with self._lock:
+            self._ids += 1
+            return f"{prefix}-standin-{self._ids}"
+
+    def count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StandInServer
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def do_POST(self):
+        routes = {
+            "/v1/embeddings": self._embeddings,
+            "/v1/chat/completions": self._chat_completions,
+            "/v1/audio/transcriptions": self._transcriptions,
+        }
+        path = self.path.split("?")[0]
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        route = routes.get(path)
+        if route is None:
+            self._error(404, f"Unknown endpoint {path}", "invalid_request_error")
+            return
+
+        self.server.count(path)
+        status, latency = self.server.draw()
+        time.sleep(latency)
+        if status == 429:
+            self.server.count("429")
+            self._error(
+                429,
+                "Rate limit reached (stand-in)",
+                "requests",
+                code="rate_limit_exceeded",
+                headers={"Retry-After": str(self.server.config.retry_after)},
+            )
+        elif status:
+            self.server.count(str(status))
+            self._error(status, "The server had an error (stand-in)", "server_error")
+        else:
+            route(body)
+
+    # --- Endpoints ---
+
+    def _embeddings(self, body: bytes):
+        request = json.loads(body)
+        inputs = request["input"]
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dimensions = request.get("dimensions")
+        base64_encoded = request.get("encoding_format") == "base64"
+
+        data = []
+        for index, text in enumerate(inputs):
+            embedding = synthetic_embedding(text)
+            if dimensions:
+                embedding = shorten_embedding(embedding, dimensions)
+            data.append(
+                {
+                    "object": "embedding",
+                    "index": index,
+                    "embedding": _pack(embedding) if base64_encoded else embedding,
+                }
+            )
+        tokens = sum(count_tokens(text) for text in inputs)
+        self._json(
+            {
+                "object": "list",
+                "data": data,
+                "model": request["model"],
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            }
+        )
+
+    def _chat_completions(self, body: bytes):
+        request = json.loads(body)
+        config = self.server.config
+        words = reply_words(request["messages"], config.completion_words)
+        limit = request.get("max_completion_tokens") or request.get("max_tokens")
+        if limit:
+            words = words[:limit]
+        content = " ".join(words)
+        prompt_tokens = sum(
+            count_tokens(message.get("content") or "")
+            for message in request["messages"]
+        )
+        completion_tokens = count_tokens(content)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        envelope = {
+            "id": self.server.next_id("chatcmpl"),
+            "created": int(time.time()),
+            "model": request["model"],
+        }
+        delay = 1 / config.tokens_per_second if config.tokens_per_second else 0.0
+
+        if not request.get("stream"):
+            time.sleep(delay * len(words))
+            self._json(
+                {
+                    **envelope,
+                    "object": "chat.completion",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                            "logprobs": None,
+                        }
+                    ],
+                    "usage": usage,
+                }
+            )
+            return
+
+        def chunk(delta: dict, finish_reason: Optional[str] = None) -> dict:
+            return {
+                **envelope,
+                "object": "chat.completion.chunk",
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+
+        # No Content-Length for a stream: the connection ends the body
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self._event(chunk({"role": "assistant", "content": ""}))
+        for i, word in enumerate(words):
+            time.sleep(delay)
+            self._event(chunk({"content": word if i == 0 else " " + word}))
+        self._event(chunk({}, finish_reason="stop"))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            self._event(
+                {
+                    **envelope,
+                    "object": "chat.completion.chunk",
+                    "choices": [],
+                    "usage": usage,
+                }
+            )
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _transcriptions(self, body: bytes):
+        fields, audio = self._form(body)
+        text, segments = synthetic_transcript(audio, fields.get("prompt", ""))
+        response_format = fields.get("response_format", "json")
+        if response_format == "verbose_json":
+            self._json(
+                {
+                    "task": "transcribe",
+                    "language": fields.get("language") or "english",
+                    "duration": segments[-1]["end"],
+                    "text": text,
+                    "segments": segments,
+                }
+            )
+        elif response_format == "json":
+            self._json({"text": text})
+        else:
+            # text, srt and vtt: plain text is enough for load testing
+            self._send(200, "text/plain; charset=utf-8", text.encode())
+
+    # --- Helpers ---
+
+    def _form(self, body: bytes) -> Tuple[Dict[str, str], bytes]:
+        """Text fields and file bytes of a multipart/form-data body."""
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+        message = BytesParser(policy=HTTP).parsebytes(header + body)
+        fields: Dict[str, str] = {}
+        audio = b""
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            payload = part.get_payload(decode=True) or b""
+            if part.get_filename() is not None:
+                audio = payload
+            elif name:
+                fields[name] = payload.decode()
+        return fields, audio
+
+    def _event(self, payload: dict):
+        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+        self.wfile.flush()
+
+    def _json(self, payload: dict, status: int = 200, headers: Optional[dict] = None):
+        self._send(status, "application/json", json.dumps(payload).encode(), headers)
+
+    def _error(
+        self,
+        status: int,
+        message: str,
+        error_type: str,
+        code: Optional[str] = None,
+        headers: Optional[dict] = None,
+    ):
+        error = {"message": message, "type": error_type, "param": None, "code": code}
+        self._json({"error": error}, status=status, headers=headers)
+
+    def _send(
+        self,
+        status: int,
+        content_type: str,
+        body: bytes,
+        headers: Optional[dict] = None,
+    ):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@contextmanager
+def running_standin(
+    config: Optional[StandInConfig] = None, host: str = "127.0.0.1", port: int = 0
+) -> Iterator[StandInServer]:
+    """Serve the stand-in from a background thread (port 0 picks a free port)."""
+    server = StandInServer((host, port), config or StandInConfig())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -0,0 +1,515 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from openai import AsyncOpenAI
+
+from association.models import Association
+from character.models import Character
+from item.models import Artifact, Item
+from nucleus.models import Entity, GameLog
+from place.models import Place
+from race.models import Race
+
+from ..embeddings import aget_embedding
+from ..models import ChatSession, ContentChunk
+from ..source_models import create_sources
+from .async_db import afetch
+from .build_conversation_memory import build_conversation_memory
+from .game_log_full_text_search import weighted_fts_search_logs
+from .RAGService import (
+    ENTITY_CONTENT_TYPES,
+    RETRIEVAL_MODE_SKIP_REWRITE,
+    RETRIEVAL_MODE_SPECULATIVE,
+    PipelineTimer,
+    PreparedContext,
+    RAGService,
+    SemanticSearchResult,
+    bulk_resolve_content_objects,
+)
+from .trigram_entity_search import atrigram_entity_search
+
+logger = logging.getLogger(__name__)
+
+async_openai_client = AsyncOpenAI(
+    api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL
+)
+
+
+async def _atimed(coro):
+    """Await coro, return (result, elapsed_seconds)."""
+    t0 = time.perf_counter()
+    result = await coro
+    return result, time.perf_counter() - t0
+
+
+class AsyncRAGService(RAGService):
+    """
+    Async variant of the RAG pipeline, for ASGI views.
+
+    OpenAI calls use AsyncOpenAI and the vector, trigram and full-text
+    searches run on a native async psycopg pool (see async_db), so the
+    parallel stages are plain asyncio.gather calls and a single worker can
+    serve many chats at once. ORM work that remains (loading the matched
+    objects, conversation memory, context assembly, saving) runs through
+    sync_to_async. Scoring, fusion and prompt building are shared with
+    RAGService.
+    """
+
+    async def asemantic_search(
+        self,
+        query: str,
+        limit: Optional[int] = None,
+        similarity_threshold: Optional[float] = None,
+        content_types: Optional[List[str]] = None,
+        ef_search: Optional[int] = None,
+        iterative_scan: Optional[str] = None,
+    ) -> List[SemanticSearchResult]:
+        """Async semantic_search."""
+        if limit is None:
+            limit = self.max_context_chunks
+        if similarity_threshold is None:
+            similarity_threshold = self.default_similarity_threshold
+
+        try:
+            query_embedding = await aget_embedding(query)
+
+            def _compile():
+                queryset = self._semantic_search_queryset(
+                    query_embedding, similarity_threshold, content_types
+                )
+                return queryset.values_list("id", "similarity")[
+                    :limit
+                ].query.sql_with_params()
+
+            sql, params = await sync_to_async(_compile)()
+            rows = await afetch(
+                sql, params, self._hnsw_settings(ef_search, iterative_scan)
+            )
+
+            def _resolve():
+                chunks_by_id = ContentChunk.objects.defer("embedding").in_bulk(
+                    [chunk_id for chunk_id, _ in rows]
+                )
+                chunks = []
+                for chunk_id, similarity in rows:
+                    chunk = chunks_by_id.get(chunk_id)
+                    if chunk is not None:
+                        chunk.similarity = similarity
+                        chunks.append(chunk)
+                return self._semantic_search_results(
+                    chunks, bulk_resolve_content_objects(chunks)
+                )
+
+            results = await sync_to_async(_resolve)()
+            logger.info(
+                f"Semantic search found {len(results)} relevant chunks for query: {query[:50]}... "
+                f"(content_types: {content_types or 'all'})"
+            )
+            return results
+
+        except Exception as e:
+            logger.error(f"Semantic search failed: {str(e)}")
+            return []
+
+    async def _aweighted_fts_search_logs(
+        self, query: str, entities: list[Entity]
+    ) -> List[GameLog]:
+        """weighted_fts_search_logs, with the ranking query on the async pool."""
+
+        def _compile():
+            queryset = weighted_fts_search_logs(query, entities)
+            return queryset.values_list("pk", flat=True).query.sql_with_params()
+
+        sql, params = await sync_to_async(_compile)()
+        pks = [pk for (pk,) in await afetch(sql, params)]
+
+        def _load():
+            logs = GameLog.objects.in_bulk(pks)
+            return [logs[pk] for pk in pks if pk in logs]
+
+        return await sync_to_async(_load)()
+
+    async def _aget_enhanced_query(
+        self,
+        query: str,
+        conversation_messages: str,
+        session: ChatSession | None,
+        similarity_threshold: float | None,
+        timer: PipelineTimer | None = None,
+    ) -> str:
+        query_with_history = conversation_messages + f"\n\nQuestion: {query}"
+
+        (
+            (trigram_results, t_tri),
+            (semantic_results, t_sem),
+            (entities_from_past_messages, t_past),
+        ) = await asyncio.gather(
+            _atimed(atrigram_entity_search(query)),
+            _atimed(
+                self.asemantic_search(
+                    query_with_history,
+                    limit=self.max_context_chunks,
+                    similarity_threshold=similarity_threshold,
+                    content_types=ENTITY_CONTENT_TYPES,
+                )
+            ),
+            _atimed(sync_to_async(self._past_message_entities)(session)),
+        )
+
+        if timer:
+            timer.record("  enh: trigram_search", t_tri)
+            timer.record("  enh: semantic_search", t_sem)
+            timer.record("  enh: past_msg_sources", t_past)
+
+        entities_for_query = self._entities_for_query_enhancement(
+            trigram_results, semantic_results, entities_from_past_messages
+        )
+        # Aliases are prefetched, but descriptions etc. may still be lazy
+        messages = await sync_to_async(self._query_enhancement_messages)(
+            query, conversation_messages, entities_for_query
+        )
+
+        t0 = time.perf_counter()
+        enhancement_response = await async_openai_client.chat.completions.create(
+            model=settings.OPENAI_CHEAP_CHAT_MODEL,
+            messages=messages,
+            temperature=0.0,
+        )
+        if timer:
+            timer.record("  enh: llm_rewrite", time.perf_counter() - t0)
+
+        enhanced_search_query = (
+            enhancement_response.choices[0].message.content or query
+        ).strip()
+        logger.info(f"Enhanced search query: {enhanced_search_query[:100]}...")
+
+        return enhanced_search_query
+
+    async def _aretrieve_entities(
+        self,
+        query: str,
+        similarity_threshold: Optional[float] = None,
+        timer: PipelineTimer | None = None,
+        semantic_query: Optional[str] = None,
+        label: str = "ret",
+    ) -> list:
+        """Async _retrieve_entities."""
+        (trigram_results, t_tri), (
+            semantic_entity_chunks,
+            t_sem,
+        ) = await asyncio.gather(
+            _atimed(atrigram_entity_search(query)),
+            _atimed(
+                self.asemantic_search(
+                    semantic_query or query,
+                    self.max_context_chunks,
+                    similarity_threshold,
+                    ENTITY_CONTENT_TYPES,
+                )
+            ),
+        )
+
+        if timer:
+            timer.record(f"  {label}: entity_trigram", t_tri)
+            timer.record(f"  {label}: entity_semantic", t_sem)
+
+        return self._fuse_entity_results(
+            semantic_entity_chunks, trigram_results, timer, label
+        )
+
+    async def _aretrieve_logs(
+        self,
+        query: str,
+        entities: list[Entity],
+        similarity_threshold: Optional[float] = None,
+        timer: PipelineTimer | None = None,
+        label: str = "ret",
+    ) -> list:
+        """Async _retrieve_logs."""
+        enhanced_query_for_log_search = await sync_to_async(
+            self.build_enriched_text_for_semantic_search
+        )(query, entities)
+
+        (fts_results, t_fts), (semantic_log_chunks, t_sem_log) = await asyncio.gather(
+            _atimed(self._aweighted_fts_search_logs(query, entities)),
+            _atimed(
+                self.asemantic_search(
+                    enhanced_query_for_log_search,
+                    self.max_context_chunks,
+                    similarity_threshold,
+                    ["gamelog"],
+                )
+            ),
+        )
+
+        if timer:
+            timer.record(f"  {label}: log_fts", t_fts)
+            timer.record(f"  {label}: log_semantic", t_sem_log)
+
+        if not semantic_log_chunks and not fts_results:
+            return []
+
+        return self._fuse_log_results(semantic_log_chunks, fts_results, timer, label)
+
+    async def _aretrieve(
+        self,
+        query: str,
+        similarity_threshold: Optional[float] = None,
+        timer: PipelineTimer | None = None,
+        semantic_query: Optional[str] = None,
+        label: str = "ret",
+    ) -> tuple[list, list]:
+        """Async _retrieve."""
+        fused_entity_results = await self._aretrieve_entities(
+            query, similarity_threshold, timer, semantic_query, label
+        )
+        entities_for_log_search: list[Entity] = [
+            r.data for r in fused_entity_results if not isinstance(r.data, GameLog)
+        ]
+        fused_log_results = await self._aretrieve_logs(
+            query, entities_for_log_search, similarity_threshold, timer, label
+        )
+        return list(fused_log_results), list(fused_entity_results)
+
+    async def _aget_logs_and_entities_for_query(
+        self,
+        query: str,
+        similarity_threshold: Optional[float] = None,
+        max_logs_to_include: int = 10,
+        max_entities_to_include: int = 15,
+        timer: PipelineTimer | None = None,
+    ) -> tuple[
+        List[GameLog], List[Association | Character | Place | Item | Artifact | Race]
+    ]:
+        fused_log_results, fused_entity_results = await self._aretrieve(
+            query, similarity_threshold, timer
+        )
+        return self._logs_and_entities_to_include(
+            fused_log_results,
+            fused_entity_results,
+            max_logs_to_include,
+            max_entities_to_include,
+        )
+
+    async def _aspeculative_retrieve(
+        self,
+        query: str,
+        conversation_messages: str,
+        session: ChatSession | None,
+        similarity_threshold: float | None,
+        timer: PipelineTimer,
+    ) -> tuple[list, list]:
+        """Async _speculative_retrieve."""
+        query_with_history = conversation_messages + f"\n\nQuestion: {query}"
+
+        t0 = time.perf_counter()
+        (enhanced_search_query, t_enh), (speculative, t_spec) = await asyncio.gather(
+            _atimed(
+                self._aget_enhanced_query(
+                    query,
+                    conversation_messages=conversation_messages,
+                    session=session,
+                    similarity_threshold=similarity_threshold,
+                    timer=timer,
+                )
+            ),
+            _atimed(
+                self._aretrieve(
+                    query,
+                    similarity_threshold,
+                    timer,
+                    semantic_query=query_with_history,
+                    label="spec",
+                )
+            ),
+        )
+        t_overlap = time.perf_counter() - t0
+        timer.record("query_enhancement", t_enh)
+        timer.record("speculative_retrieval", t_spec)
+
+        t0 = time.perf_counter()
+        entity_results = speculative[1]
+        rewritten_entities: list = []
+        speculative_entities = [
+            r.data for r in entity_results if not isinstance(r.data, GameLog)
+        ]
+        if await sync_to_async(self._rewrite_adds_entities)(
+            enhanced_search_query, speculative_entities
+        ):
+            rewritten_entities = await self._aretrieve_entities(
+                enhanced_search_query, similarity_threshold, timer, label="delta"
+            )
+            _, entity_results = self._merge_retrievals(
+                ([], entity_results), ([], rewritten_entities)
+            )
+        else:
+            logger.info("Rewrite added no entities; searching only logs again")
+
+        rewritten_logs = await self._aretrieve_logs(
+            enhanced_search_query,
+            [r.data for r in entity_results if not isinstance(r.data, GameLog)],
+            similarity_threshold,
+            timer,
+            label="delta",
+        )
+        merged = self._merge_retrievals(
+            speculative, (rewritten_logs, rewritten_entities)
+        )
+        t_delta = time.perf_counter() - t0
+        timer.record("delta_retrieval", t_delta)
+
+        timer.record_saving("speculative: saved", t_enh + t_spec - t_overlap - t_delta)
+        return merged
+
+    async def aprepare_context(
+        self,
+        query: str,
+        similarity_threshold: Optional[float] = None,
+        session: Optional[ChatSession] = None,
+        max_logs_to_include: int = 10,
+        max_entities_to_include: int = 15,
+    ) -> Optional[PreparedContext]:
+        """Async prepare_context."""
+        timer = PipelineTimer()
+
+        t0 = time.perf_counter()
+        conversation_messages = (
+            await sync_to_async(build_conversation_memory)(
+                session, query, model=self.model
+            )
+            if session
+            else ""
+        )
+        timer.record("conversation_history", time.perf_counter() - t0)
+
+        if self.retrieval_mode == RETRIEVAL_MODE_SPECULATIVE:
+            fused_log_results, fused_entity_results = await self._aspeculative_retrieve(
+                query,
+                conversation_messages=conversation_messages,
+                session=session,
+                similarity_threshold=similarity_threshold,
+                timer=timer,
+            )
+            (
+                logs_to_include_candidates,
+                entities_to_include,
+            ) = self._logs_and_entities_to_include(
+                fused_log_results,
+                fused_entity_results,
+                max_logs_to_include,
+                max_entities_to_include,
+            )
+
+        elif self.retrieval_mode == RETRIEVAL_MODE_SKIP_REWRITE:
+            t0 = time.perf_counter()
+            fused_log_results, fused_entity_results = await self._aretrieve(
+                query,
+                similarity_threshold,
+                timer,
+                semantic_query=conversation_messages + f"\n\nQuestion: {query}",
+            )
+            timer.record("retrieval", time.perf_counter() - t0)
+            (
+                logs_to_include_candidates,
+                entities_to_include,
+            ) = self._logs_and_entities_to_include(
+                fused_log_results,
+                fused_entity_results,
+                max_logs_to_include,
+                max_entities_to_include,
+            )
+
+        else:
+            t0 = time.perf_counter()
+            enhanced_search_query = await self._aget_enhanced_query(
+                query,
+                conversation_messages=conversation_messages,
+                session=session,
+                similarity_threshold=similarity_threshold,
+                timer=timer,
+            )
+            timer.record("query_enhancement", time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            (
+                logs_to_include_candidates,
+                entities_to_include,
+            ) = await self._aget_logs_and_entities_for_query(
+                enhanced_search_query,
+                similarity_threshold=similarity_threshold,
+                max_logs_to_include=max_logs_to_include,
+                max_entities_to_include=max_entities_to_include,
+                timer=timer,
+            )
+            timer.record("retrieval", time.perf_counter() - t0)
+
+        if not logs_to_include_candidates and not entities_to_include:
+            timer.summary()
+            return None
+
+        def _finish():
+            assembled_context, logs_included = self._assemble_context(
+                conversation_messages=conversation_messages,
+                entities_to_include=entities_to_include,
+                logs_to_include_candidates=logs_to_include_candidates,
+                timer=timer,
+            )
+            return (
+                assembled_context,
+                logs_included,
+                self._build_system_prompt(session),
+                create_sources(entities_to_include + logs_included),
+            )
+
+        t0 = time.perf_counter()
+        assembled_context, logs_included, system_prompt, sources = await sync_to_async(
+            _finish
+        )()
+        timer.record("assemble_context", time.perf_counter() - t0)
+
+        timer.summary()
+
+        return PreparedContext(
+            system_prompt=system_prompt,
+            assembled_context=assembled_context,
+            sources=sources,
+            entities_to_include=entities_to_include,
+            logs_included=logs_included,
+            similarity_threshold=similarity_threshold
+            or self.default_similarity_threshold,
+            used_session_context=session is not None,
+        )
+
+    async def agenerate_response_stream(
+        self,
+        query: str,
+        prepared_context: PreparedContext,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Async generate_response_stream; yields the same dicts."""
+        try:
+            stream = await async_openai_client.chat.completions.create(
+                model=self.model,
+                messages=self._response_messages(query, prepared_context),
+                temperature=0.3,
+                max_completion_tokens=2000,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+
+            tokens_used = None
+            async for chunk in stream:
+                if chunk.usage:
+                    tokens_used = chunk.usage.total_tokens
+
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield {"type": "token", "token": chunk.choices[0].delta.content}
+
+            yield {"type": "done", "tokens_used": tokens_used}
+
+        except Exception as e:
+            logger.error(f"Streaming response failed: {str(e)}")
+            yield {"type": "error", "error": str(e)}
@@ -1,13 +1,15 @@
-import concurrent.futures
 import logging
 import time
+from collections import defaultdict
 from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import partial
 from typing import Any, Dict, Generator, List, Optional
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import QuerySet
+from django.db import connection, transaction
+from django.db.models import F, QuerySet
 from openai import OpenAI
 from pgvector.django import CosineDistance
 
@@ -20,20 +22,35 @@ from place.models import Place
 from race.models import Race
 from rag_chat.services.normalize_and_hybrid_rank_fuse import (
     ScoreSetElement,
-    hybrid_rank_fuse,
-    remove_results_more_than_stddev_below_mean,
-    z_score_normalize,
+    fuse_scores,
 )
 
 from ..content_processors import get_processor
 from ..embeddings import get_embedding
+from ..key_terms import entity_key_terms
 from ..models import ChatMessage, ChatSession, ContentChunk
 from ..source_models import create_sources, parse_sources, bulk_resolve_sources
 from ..utils import count_tokens
+from ..vector_search import (
+    VECTOR_SEARCH_FULL,
+    apply_hnsw_settings,
+    coarse_distance,
+    content_group_for,
+    hnsw_settings,
+)
 from .build_conversation_memory import build_conversation_memory
+from .fanout import fan_out
 from .game_log_full_text_search import weighted_fts_search_logs
+from .alias_matcher import find_exact_entity_mentions
+from .log_excerpts import build_log_excerpts, format_log_excerpt
+from .log_summaries import get_log_summaries_digest
+from .response_cache import (
+    ResponseCacheKey,
+    cache_response,
+    get_cached_response,
+    response_cache_key,
+)
 from .trigram_entity_search import trigram_entity_search
-from .game_log_full_text_search import key_terms
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +60,8 @@ class PipelineTimer:
 
     def __init__(self):
         self.steps: list[tuple[str, float]] = []
+        self.savings: list[tuple[str, float]] = []
+        self.token_reductions: list[tuple[str, int, int]] = []
         self._start = time.perf_counter()
 
     @contextmanager
@@ -55,9 +74,19 @@ class PipelineTimer:
         """Record a pre-measured duration (e.g. from a timed closure)."""
         self.steps.append((name, duration))
 
+    def record_saving(self, name: str, duration: float):
+        """Record latency taken off the critical path (reported after TOTAL)."""
+        self.savings.append((name, duration))
+
+    def record_tokens(self, name: str, before: int, after: int):
+        """Record a prompt-token reduction (reported after the savings)."""
+        self.token_reductions.append((name, before, after))
+
     def summary(self):
         total = time.perf_counter() - self._start
-        w = max((len(n) for n, _ in self.steps), default=20)
+        names = [n for n, _ in self.steps + self.savings]
+        names += [n for n, _, _ in self.token_reductions]
+        w = max((len(n) for n in names), default=20)
         lines = [
             "",
             f"{'─' * (w + 22)}",
@@ -69,6 +98,13 @@ class PipelineTimer:
             lines.append(f"{name:<{w}}  {dur:>6.2f}s  {pct:>4.0f}%")
         lines.append(f"{'─' * (w + 22)}")
         lines.append(f"{'TOTAL':<{w}}  {total:>6.2f}s")
+        for name, dur in self.savings:
+            lines.append(f"{name:<{w}}  {-dur:>+6.2f}s")
+        for name, before, after in self.token_reductions:
+            pct = ((before - after) / before * 100) if before else 0
+            lines.append(
+                f"{name:<{w}}  {before:,} -> {after:,} tokens (-{pct:.0f}%)"
+            )
         lines.append("")
         msg = "\n".join(lines)
         print(msg)
@@ -95,8 +131,70 @@ _CONTENT_TYPE_MODEL_MAP: dict[str, type] = {
     "association": Association,
 }
 
+# Content types searched when looking for entities (everything but logs)
+ENTITY_CONTENT_TYPES = ["character", "place", "item", "artifact", "race", "association"]
+
+# Hybrid rank fusion weights
+SEMANTIC_WEIGHT = 0.6
+FTS_WEIGHT = 0.3
+TRIGRAM_WEIGHT = 0.1
+
+# settings.RAG_RETRIEVAL_MODE values
+RETRIEVAL_MODE_SEQUENTIAL = "sequential"
+RETRIEVAL_MODE_SPECULATIVE = "speculative"
+RETRIEVAL_MODE_SKIP_REWRITE = "skip_rewrite"
+RETRIEVAL_MODES = (
+    RETRIEVAL_MODE_SEQUENTIAL,
+    RETRIEVAL_MODE_SPECULATIVE,
+    RETRIEVAL_MODE_SKIP_REWRITE,
+)
+
+# settings.RAG_LOG_CONTEXT_MODE values
+LOG_CONTEXT_MODE_FULL = "full"
+LOG_CONTEXT_MODE_CHUNKS = "chunks"
+
+# Weights when fusing speculative (raw query) and rewritten-query results
+SPECULATIVE_WEIGHT = 0.4
+REWRITTEN_WEIGHT = 0.6
+
 # Initialize OpenAI client
-openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+openai_client = OpenAI(
+    api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL
+)
+
+
+def bulk_resolve_content_objects(
+    chunks: List[ContentChunk],
+) -> Dict[tuple[int, int], Any]:
+    """
+    Resolve the content objects behind many chunks with one query per content
+    type (plus the processor's prefetches), instead of one per chunk.
+
+    Returns a dict keyed by (content_type_id, object_id).
+    """
+    ids_by_content_type: Dict[int, set[int]] = defaultdict(set)
+    for chunk in chunks:
+        if chunk.content_type_id is not None:
+            ids_by_content_type[chunk.content_type_id].add(chunk.object_id)
+
+    resolved: Dict[tuple[int, int], Any] = {}
+    for content_type_id, object_ids in ids_by_content_type.items():
+        # get_for_id is served from ContentType's in-process cache
+        content_type = ContentType.objects.get_for_id(content_type_id)
+        model_cls = content_type.model_class()
+        if model_cls is None:
+            continue
+
+        queryset = model_cls.objects.filter(pk__in=object_ids)
+        try:
+            queryset = get_processor(content_type.model).optimize_queryset(queryset)
+        except ValueError:
+            pass  # No processor for this type; fetch without prefetches
+
+        for obj in queryset:
+            resolved[(content_type_id, obj.pk)] = obj
+
+    return resolved
 
 
 @dataclass
@@ -109,6 +207,7 @@ class SemanticSearchResult:
     chunk_id: int
     content_type: str
     content_object: Association | Character | Place | Item | Artifact | Race | GameLog
+    chunk: ContentChunk | None = None
 
 
 @dataclass
@@ -125,8 +224,18 @@ class PreparedContext:
 
 
 class RAGService:
-    def __init__(self, model: str = settings.OPENAI_CHEAP_CHAT_MODEL):
+    def __init__(
+        self,
+        model: str = settings.OPENAI_CHEAP_CHAT_MODEL,
+        retrieval_mode: Optional[str] = None,
+    ):
         self.model = model
+        self.retrieval_mode = retrieval_mode or settings.RAG_RETRIEVAL_MODE
+        if self.retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(
+                f"Unknown retrieval mode {self.retrieval_mode!r}; "
+                f"expected one of {', '.join(RETRIEVAL_MODES)}"
+            )
         self.default_similarity_threshold = 0.1
         self.max_context_chunks = 8  # Increased to handle more diverse content
         self.token_limit: int = (
@@ -139,6 +248,8 @@ class RAGService:
         limit: Optional[int] = None,
         similarity_threshold: Optional[float] = None,
         content_types: Optional[List[str]] = None,
+        ef_search: Optional[int] = None,
+        iterative_scan: Optional[str] = None,
     ) -> List[SemanticSearchResult]:
         """
         Find relevant chunks using cosine similarity across different content types
@@ -148,6 +259,9 @@ class RAGService:
             limit: Maximum number of results
             similarity_threshold: Minimum similarity score
             content_types: List of content types to search (None = search all)
+            ef_search: hnsw.ef_search for this query (default settings.RAG_HNSW_EF_SEARCH)
+            iterative_scan: hnsw.iterative_scan for this query
+                (default settings.RAG_HNSW_ITERATIVE_SCAN)
 
         Returns:
             List of SemanticSearchResult objects
@@ -161,44 +275,19 @@ class RAGService:
             # Get query embedding
             query_embedding = get_embedding(query)
 
-            queryset = ContentChunk.objects.annotate(
-                similarity=1 - CosineDistance("embedding", query_embedding)
-            ).filter(similarity__gte=similarity_threshold)
-
-            # Filter by content types if specified
-            if content_types:
-                content_type_objects = [
-                    ContentType.objects.get_for_model(model_cls)
-                    for ct_str in content_types
-                    if (model_cls := _CONTENT_TYPE_MODEL_MAP.get(ct_str))
-                ]
-                if content_type_objects:
-                    queryset = queryset.filter(content_type__in=content_type_objects)
-
-            chunks = queryset.order_by("-similarity")[:limit]
-
-            results = []
-            for chunk in chunks:
-                # Get the string representation of content type for backwards compatibility
-                content_type_str = (
-                    chunk.content_type.model if chunk.content_type else "unknown"
+            queryset = self._semantic_search_queryset(
+                query_embedding, similarity_threshold, content_types
+            )
+            # SET LOCAL the HNSW knobs for just this query
+            with transaction.atomic(), connection.cursor() as cursor:
+                apply_hnsw_settings(
+                    cursor, self._hnsw_settings(ef_search, iterative_scan)
                 )
-
-                # The similarity is added by the annotation, so we access it directly
-                similarity_score = getattr(chunk, "similarity", 0.0)
-
-                # Ensure content_object exists before adding to results
-                if chunk.content_object:
-                    results.append(
-                        SemanticSearchResult(
-                            chunk_text=chunk.chunk_text,
-                            metadata=chunk.metadata,
-                            similarity=float(similarity_score),
-                            chunk_id=chunk.pk,
-                            content_type=content_type_str,
-                            content_object=chunk.content_object,
-                        )
-                    )
+                # The embedding column is only needed for the ORDER BY, not in Python
+                chunks = list(queryset.defer("embedding")[:limit])
+            results = self._semantic_search_results(
+                chunks, bulk_resolve_content_objects(chunks)
+            )
 
             logger.info(
                 f"Semantic search found {len(results)} relevant chunks for query: {query[:50]}... "
@@ -210,6 +299,102 @@ class RAGService:
             logger.error(f"Semantic search failed: {str(e)}")
             return []
 
+    def _semantic_search_queryset(
+        self,
+        query_embedding: List[float],
+        similarity_threshold: float,
+        content_types: Optional[List[str]] = None,
+        vector_search: Optional[str] = None,
+        rerank_candidates: Optional[int] = None,
+    ) -> QuerySet[ContentChunk]:
+        """
+        Chunks at or above the similarity threshold, most similar first.
+
+        vector_search (default settings.RAG_VECTOR_SEARCH) picks the index to
+        search. The coarse ones only nominate rerank_candidates (default
+        settings.RAG_VECTOR_RERANK_CANDIDATES) chunks, which are then reranked
+        by exact similarity in the same query. Fewer candidates trade recall
+        for speed.
+        """
+        vector_search = vector_search or settings.RAG_VECTOR_SEARCH
+        queryset = ContentChunk.objects.all()
+
+        # Filter by content types if specified
+        if content_types:
+            content_type_objects = [
+                ContentType.objects.get_for_model(model_cls)
+                for ct_str in content_types
+                if (model_cls := _CONTENT_TYPE_MODEL_MAP.get(ct_str))
+            ]
+            if content_type_objects:
+                queryset = queryset.filter(content_type__in=content_type_objects)
+                # A single group lets the planner use that group's partial index
+                groups = {content_group_for(ct.model) for ct in content_type_objects}
+                if len(groups) == 1:
+                    queryset = queryset.filter(content_group=groups.pop())
+
+        if vector_search != VECTOR_SEARCH_FULL:
+            candidates = queryset.order_by(
+                coarse_distance(query_embedding, vector_search)
+            ).values("pk")[
+                : rerank_candidates or settings.RAG_VECTOR_RERANK_CANDIDATES
+            ]
+            queryset = ContentChunk.objects.filter(pk__in=candidates)
+
+        # Order by the distance itself (not the similarity) so that an HNSW
+        # index can serve the ORDER BY ... LIMIT
+        return (
+            queryset.annotate(distance=CosineDistance("embedding", query_embedding))
+            .annotate(similarity=1 - F("distance"))
+            .filter(similarity__gte=similarity_threshold)
+            .order_by("distance")
+        )
+
+    def _hnsw_settings(
+        self, ef_search: Optional[int] = None, iterative_scan: Optional[str] = None
+    ) -> List[tuple[str, str]]:
+        """Per-query HNSW settings, falling back to the configured defaults."""
+        return hnsw_settings(
+            ef_search or settings.RAG_HNSW_EF_SEARCH,
+            iterative_scan or settings.RAG_HNSW_ITERATIVE_SCAN,
+        )
+
+    def _semantic_search_results(
+        self,
+        chunks: List[ContentChunk],
+        content_objects: Dict[tuple[int, int], Any],
+    ) -> List[SemanticSearchResult]:
+        """Pair chunks with their resolved source objects."""
+        results = []
+        for chunk in chunks:
+            content_object = content_objects.get(
+                (chunk.content_type_id, chunk.object_id)
+            )
+
+            # Skip chunks whose source object no longer exists
+            if content_object is None:
+                continue
+
+            content_type = ContentType.objects.get_for_id(chunk.content_type_id)
+
+            # Populate the relation caches so callers don't re-query them
+            chunk.content_type = content_type
+            chunk.content_object = content_object
+
+            results.append(
+                SemanticSearchResult(
+                    chunk_text=chunk.chunk_text,
+                    metadata=chunk.metadata,
+                    # The similarity is added by the annotation
+                    similarity=float(getattr(chunk, "similarity", 0.0)),
+                    chunk_id=chunk.pk,
+                    content_type=content_type.model,
+                    content_object=content_object,
+                    chunk=chunk,
+                )
+            )
+        return results
+
     def build_enriched_text_for_semantic_search(
         self,
         raw_query: str,
@@ -222,7 +407,7 @@ class RAGService:
         for e in entities:
             # Work with local copies to avoid modifying the original lists
             current_aliases = list(e.aliases.all()[:alias_cap])
-            current_terms = key_terms(e.description)[:keyterm_cap]
+            current_terms = entity_key_terms(e, max_terms=keyterm_cap)
 
             # Build the initial entity line
             def build_entity_line(
@@ -263,59 +448,21 @@ class RAGService:
 
         return "\n".join(lines)[:max_chars]
 
-    def _get_enhanced_query(
-        self,
-        query: str,
-        conversation_messages: str,
-        session: ChatSession | None,
-        similarity_threshold: float | None,
-        timer: PipelineTimer | None = None,
-    ) -> str:
-        ######### GET ENTITIES FOR QUERY ENHANCEMENT #########
-        query_with_history = conversation_messages + f"\n\nQuestion: {query}"
-
-        def _trigram_search():
-            return trigram_entity_search(query)
-
-        def _semantic_search():
-            return self.semantic_search(
-                query_with_history,
-                limit=self.max_context_chunks,
-                similarity_threshold=similarity_threshold,
-                content_types=[
-                    "character",
-                    "place",
-                    "item",
-                    "artifact",
-                    "race",
-                    "association",
-                ],
-            )
-
-        def _past_message_sources():
-            if not session:
-                return []
-            messages_sources = list(session.messages.values_list("sources", flat=True))
-            all_sources = bulk_resolve_sources(messages_sources)
-            return [s for s in all_sources if not isinstance(s, GameLog)]
-
-        # Run all three entity-gathering operations concurrently
-        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-            trigram_future = executor.submit(_timed, _trigram_search)
-            semantic_future = executor.submit(_timed, _semantic_search)
-            past_msg_future = executor.submit(_timed, _past_message_sources)
-
-            trigram_results_for_query_enhancement, t_tri = trigram_future.result()
-            semantic_search_results_for_query_enhancement, t_sem = (
-                semantic_future.result()
-            )
-            entities_from_past_messages, t_past = past_msg_future.result()
-
-        if timer:
-            timer.record("  enh: trigram_search", t_tri)
-            timer.record("  enh: semantic_search", t_sem)
-            timer.record("  enh: past_msg_sources", t_past)
+    def _past_message_entities(self, session: ChatSession | None) -> list[Entity]:
+        """Entities cited as sources earlier in the session."""
+        if not session:
+            return []
+        messages_sources = list(session.messages.values_list("sources", flat=True))
+        all_sources = bulk_resolve_sources(messages_sources)
+        return [s for s in all_sources if not isinstance(s, GameLog)]
 
+    def _entities_for_query_enhancement(
+        self,
+        trigram_results_for_query_enhancement: list,
+        semantic_search_results_for_query_enhancement: List[SemanticSearchResult],
+        entities_from_past_messages: list,
+    ) -> list[Entity]:
+        """Dedupe the entities gathered for query enhancement."""
         trigram_entities_for_query_enhancement = [
             res.entity for res in trigram_results_for_query_enhancement
         ]
@@ -325,7 +472,7 @@ class RAGService:
             if not isinstance(result.content_object, GameLog)
         ]
 
-        entities_for_query = dedupe_model_instances(
+        return dedupe_model_instances(
             [
                 *trigram_entities_for_query_enhancement,
                 *entities_from_semantic_search,
@@ -333,6 +480,10 @@ class RAGService:
             ]
         )
 
+    def _query_enhancement_messages(
+        self, query: str, conversation_messages: str, entities_for_query: list[Entity]
+    ) -> list[dict]:
+        """Chat messages asking the LLM to rewrite the query with context."""
         entities_formatted_for_query_enhancement = (
             "\n".join(
                 [
@@ -343,7 +494,6 @@ class RAGService:
             or "No entities retrieved."
         )
 
-        ######### ENHANCE QUERY #########
         system_prompt_for_query_enhancement = """You are a helpful assistant that rewrites user queries into enriched,
 contextually clear forms suitable for retrieving information from narrative logs
 and entity databases.
@@ -366,6 +516,58 @@ Task:
 Rewrite the original query so that it is explicit, unambiguous, and makes
 use of relevant entities, aliases, or prior context. Output only the enriched query.
 """
+        return [
+            {"role": "system", "content": system_prompt_for_query_enhancement},
+            {"role": "user", "content": user_prompt_for_query_enhancement},
+        ]
+
+    def _get_enhanced_query(
+        self,
+        query: str,
+        conversation_messages: str,
+        session: ChatSession | None,
+        similarity_threshold: float | None,
+        timer: PipelineTimer | None = None,
+    ) -> str:
+        ######### GET ENTITIES FOR QUERY ENHANCEMENT #########
+        query_with_history = conversation_messages + f"\n\nQuestion: {query}"
+
+        def _trigram_search():
+            return trigram_entity_search(query)
+
+        def _semantic_search():
+            return self.semantic_search(
+                query_with_history,
+                limit=self.max_context_chunks,
+                similarity_threshold=similarity_threshold,
+                content_types=ENTITY_CONTENT_TYPES,
+            )
+
+        def _past_message_sources():
+            return self._past_message_entities(session)
+
+        # Run all three entity-gathering operations concurrently
+        (
+            (trigram_results_for_query_enhancement, t_tri),
+            (semantic_search_results_for_query_enhancement, t_sem),
+            (entities_from_past_messages, t_past),
+        ) = fan_out(
+            partial(_timed, _trigram_search),
+            partial(_timed, _semantic_search),
+            partial(_timed, _past_message_sources),
+        )
+
+        if timer:
+            timer.record("  enh: trigram_search", t_tri)
+            timer.record("  enh: semantic_search", t_sem)
+            timer.record("  enh: past_msg_sources", t_past)
+
+        entities_for_query = self._entities_for_query_enhancement(
+            trigram_results_for_query_enhancement,
+            semantic_search_results_for_query_enhancement,
+            entities_from_past_messages,
+        )
+
         # Use a cheaper, faster model for query enhancement since it's a simpler rewriting task
         enhancement_model = settings.OPENAI_CHEAP_CHAT_MODEL
         with_llm = (
@@ -376,10 +578,9 @@ use of relevant entities, aliases, or prior context. Output only the enriched qu
         with with_llm:
             enhancement_response = openai_client.chat.completions.create(
                 model=enhancement_model,
-                messages=[
-                    {"role": "system", "content": system_prompt_for_query_enhancement},
-                    {"role": "user", "content": user_prompt_for_query_enhancement},
-                ],
+                messages=self._query_enhancement_messages(
+                    query, conversation_messages, entities_for_query
+                ),
                 temperature=0.0,
             )
         enhanced_search_query = (
@@ -389,44 +590,14 @@ use of relevant entities, aliases, or prior context. Output only the enriched qu
 
         return enhanced_search_query
 
-    def _get_logs_and_entities_for_query(
+    def _fuse_entity_results(
         self,
-        query: str,
-        similarity_threshold: Optional[float] = None,
-        max_logs_to_include: int = 10,
-        max_entities_to_include: int = 15,
+        semantic_entity_chunks: List[SemanticSearchResult],
+        trigram_results: list,
         timer: PipelineTimer | None = None,
-    ) -> tuple[
-        List[GameLog], List[Association | Character | Place | Item | Artifact | Race]
-    ]:
-        SEMANTIC_WEIGHT = 0.6
-        FTS_WEIGHT = 0.3
-        TRIGRAM_WEIGHT = 0.1
-
-        # Run the entity search operations in parallel
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            # Submit both entity searches simultaneously
-            trigram_future = executor.submit(
-                _timed, lambda: trigram_entity_search(query)
-            )
-            semantic_entity_future = executor.submit(
-                _timed,
-                lambda: self.semantic_search(
-                    query,
-                    self.max_context_chunks,
-                    similarity_threshold,
-                    ["character", "place", "item", "artifact", "race", "association"],
-                ),
-            )
-
-            # Wait for results
-            trigram_results, t_tri = trigram_future.result()
-            semantic_entity_chunks, t_sem = semantic_entity_future.result()
-
-        if timer:
-            timer.record("  ret: entity_trigram", t_tri)
-            timer.record("  ret: entity_semantic", t_sem)
-
+        label: str = "ret",
+    ) -> list:
+        """Hybrid-rank semantic and trigram entity matches."""
         semantic_entity_scores = [
             ScoreSetElement(chunk.content_object, chunk.similarity)
             for chunk in semantic_entity_chunks
@@ -436,41 +607,113 @@ use of relevant entities, aliases, or prior context. Output only the enriched qu
         ]
 
         with_entity_fusion = (
-            timer.step("  ret: entity_fusion")
+            timer.step(f"  {label}: entity_fusion")
             if timer
             else contextmanager(lambda: (yield))()
         )
         with with_entity_fusion:
-            semantic_entity_scores_normalized = z_score_normalize(
-                semantic_entity_scores
-            )
-            trigram_scores_normalized = z_score_normalize(trigram_scores)
-
-            all_fused_entity_results = hybrid_rank_fuse(
-                (semantic_entity_scores_normalized, SEMANTIC_WEIGHT),
-                (trigram_scores_normalized, TRIGRAM_WEIGHT),
-            )
-            fused_entity_results = remove_results_more_than_stddev_below_mean(
-                all_fused_entity_results
+            return fuse_scores(
+                (semantic_entity_scores, SEMANTIC_WEIGHT),
+                (trigram_scores, TRIGRAM_WEIGHT),
             )
 
-        # Now run log searches in parallel
-        entities_for_log_search: list[Entity] = [
-            r.data for r in fused_entity_results if not isinstance(r.data, GameLog)
+    def _fuse_log_results(
+        self,
+        semantic_log_chunks: List[SemanticSearchResult],
+        fts_results: List[GameLog],
+        timer: PipelineTimer | None = None,
+        label: str = "ret",
+    ) -> list:
+        """Hybrid-rank semantic and full-text log matches."""
+        semantic_log_scores = [
+            ScoreSetElement(chunk.content_object, chunk.similarity)
+            for chunk in semantic_log_chunks
+        ]
+        fts_scores = [
+            ScoreSetElement(r, (len(fts_results) - idx) / len(fts_results) * 1.0)
+            for idx, r in enumerate(fts_results)
         ]
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as log_executor:
-            fts_future = log_executor.submit(
-                _timed, lambda: weighted_fts_search_logs(query, entities_for_log_search)
+        with_log_fusion = (
+            timer.step(f"  {label}: log_fusion")
+            if timer
+            else contextmanager(lambda: (yield))()
+        )
+        with with_log_fusion:
+            fused_log_results = fuse_scores(
+                (semantic_log_scores, SEMANTIC_WEIGHT),
+                (fts_scores, FTS_WEIGHT),
             )
 
-            enhanced_query_for_log_search = (
-                self.build_enriched_text_for_semantic_search(
-                    query,
-                    entities_for_log_search,
+        # Remember which chunks matched, for excerpting long logs in the context
+        matched_chunk_indexes: Dict[int, set[int]] = defaultdict(set)
+        for chunk in semantic_log_chunks:
+            if chunk.chunk is not None:
+                matched_chunk_indexes[chunk.content_object.pk].add(
+                    chunk.chunk.chunk_index
                 )
+        for result in fused_log_results:
+            result.data.matched_chunk_indexes = sorted(
+                matched_chunk_indexes.get(result.data.pk, ())
             )
-            semantic_log_future = log_executor.submit(
+
+        return fused_log_results
+
+    def _retrieve_entities(
+        self,
+        query: str,
+        similarity_threshold: Optional[float] = None,
+        timer: PipelineTimer | None = None,
+        semantic_query: Optional[str] = None,
+        label: str = "ret",
+    ) -> list:
+        """
+        Trigram and semantic entity search, hybrid-ranked. semantic_query, if
+        given, replaces query for the semantic search.
+        """
+        (trigram_results, t_tri), (semantic_entity_chunks, t_sem) = fan_out(
+            partial(_timed, lambda: trigram_entity_search(query)),
+            partial(
+                _timed,
+                lambda: self.semantic_search(
+                    semantic_query or query,
+                    self.max_context_chunks,
+                    similarity_threshold,
+                    ENTITY_CONTENT_TYPES,
+                ),
+            ),
+        )
+
+        if timer:
+            timer.record(f"  {label}: entity_trigram", t_tri)
+            timer.record(f"  {label}: entity_semantic", t_sem)
+
+        return self._fuse_entity_results(
+            semantic_entity_chunks, trigram_results, timer, label
+        )
+
+    def _retrieve_logs(
+        self,
+        query: str,
+        entities: list[Entity],
+        similarity_threshold: Optional[float] = None,
+        timer: PipelineTimer | None = None,
+        label: str = "ret",
+    ) -> list:
+        """
+        Full-text and semantic log search for query, weighted and enriched by
+        the entities already found, hybrid-ranked.
+        """
+        enhanced_query_for_log_search = self.build_enriched_text_for_semantic_search(
+            query,
+            entities,
+        )
+        (fts_results, t_fts), (semantic_log_chunks, t_sem_log) = fan_out(
+            partial(
+                _timed,
+                lambda: list(weighted_fts_search_logs(query, entities)),
+            ),
+            partial(
                 _timed,
                 lambda: self.semantic_search(
                     enhanced_query_for_log_search,
@@ -478,50 +721,71 @@ use of relevant entities, aliases, or prior context. Output only the enriched qu
                     similarity_threshold,
                     ["gamelog"],
                 ),
-            )
-
-            # Get log search results
-            fts_results, t_fts = fts_future.result()
-            semantic_log_chunks, t_sem_log = semantic_log_future.result()
+            ),
+        )
 
         if timer:
-            timer.record("  ret: log_fts", t_fts)
-            timer.record("  ret: log_semantic", t_sem_log)
+            timer.record(f"  {label}: log_fts", t_fts)
+            timer.record(f"  {label}: log_semantic", t_sem_log)
+
+        if not semantic_log_chunks and not fts_results:
+            return []
 
-        if not semantic_log_chunks and not fused_entity_results and not fts_results:
-            return [], []
+        return self._fuse_log_results(semantic_log_chunks, fts_results, timer, label)
 
-        semantic_log_scores = [
-            ScoreSetElement(chunk.content_object, chunk.similarity)
-            for chunk in semantic_log_chunks
+    def _retrieve(
+        self,
+        query: str,
+        similarity_threshold: Optional[float] = None,
+        timer: PipelineTimer | None = None,
+        semantic_query: Optional[str] = None,
+        label: str = "ret",
+    ) -> tuple[list, list]:
+        """
+        Search entities, then logs, and hybrid-rank each. Returns the fused
+        (log_results, entity_results) as ScoreSetElements, best first.
+        semantic_query, if given, replaces query for the semantic entity search.
+        """
+        fused_entity_results = self._retrieve_entities(
+            query, similarity_threshold, timer, semantic_query, label
+        )
+        entities_for_log_search: list[Entity] = [
+            r.data for r in fused_entity_results if not isinstance(r.data, GameLog)
         ]
-        fts_scores = (
-            [
-                ScoreSetElement(r, (len(fts_results) - idx) / len(fts_results) * 1.0)
-                for idx, r in enumerate(fts_results)
-            ]
-            if fts_results.count() > 0
-            else []
+        fused_log_results = self._retrieve_logs(
+            query, entities_for_log_search, similarity_threshold, timer, label
         )
+        return list(fused_log_results), list(fused_entity_results)
 
-        with_log_fusion = (
-            timer.step("  ret: log_fusion")
-            if timer
-            else contextmanager(lambda: (yield))()
+    def _get_logs_and_entities_for_query(
+        self,
+        query: str,
+        similarity_threshold: Optional[float] = None,
+        max_logs_to_include: int = 10,
+        max_entities_to_include: int = 15,
+        timer: PipelineTimer | None = None,
+    ) -> tuple[
+        List[GameLog], List[Association | Character | Place | Item | Artifact | Race]
+    ]:
+        fused_log_results, fused_entity_results = self._retrieve(
+            query, similarity_threshold, timer
+        )
+        return self._logs_and_entities_to_include(
+            fused_log_results,
+            fused_entity_results,
+            max_logs_to_include,
+            max_entities_to_include,
         )
-        with with_log_fusion:
-            semantic_log_scores_normalized = z_score_normalize(semantic_log_scores)
-            fts_scores_normalized = z_score_normalize(fts_scores)
-
-            all_fused_log_results = hybrid_rank_fuse(
-                (semantic_log_scores_normalized, SEMANTIC_WEIGHT),
-                (fts_scores_normalized, FTS_WEIGHT),
-            )
-
-            fused_log_results = remove_results_more_than_stddev_below_mean(
-                all_fused_log_results
-            )
 
+    def _logs_and_entities_to_include(
+        self,
+        fused_log_results: list,
+        fused_entity_results: list,
+        max_logs_to_include: int,
+        max_entities_to_include: int,
+    ) -> tuple[
+        List[GameLog], List[Association | Character | Place | Item | Artifact | Race]
+    ]:
         # Type assertions since we know the specific types from how we constructed the scores
         logs_to_include_candidates: list[GameLog] = [r.data for r in fused_log_results]  # type: ignore
         entities_to_include: list[Association | Character | Place | Item | Artifact | Race] = [r.data for r in fused_entity_results]  # type: ignore
@@ -531,6 +795,130 @@ use of relevant entities, aliases, or prior context. Output only the enriched qu
             entities_to_include[:max_entities_to_include],
         )
 
+    def _rewrite_adds_entities(
+        self, enhanced_query: str, known_entities: list[Entity]
+    ) -> bool:
+        """
+        Whether the rewritten query names an entity (verbatim name or alias)
+        that is not among known_entities. Rewrites mostly resolve pronouns and
+        vague references to names, so when every name is already known the
+        speculative entity results stand in for a second entity search.
+        """
+        known = {
+            (ContentType.objects.get_for_model(entity).id, entity.pk)
+            for entity in known_entities
+        }
+        return any(
+            (match.content_type_id, match.object_id) not in known
+            for match in find_exact_entity_mentions(enhanced_query)
+        )
+
+    def _merge_retrievals(
+        self,
+        speculative: tuple[list, list],
+        rewritten: tuple[list, list],
+    ) -> tuple[list, list]:
+        """Fuse (logs, entities) results of the raw and rewritten queries."""
+        merged_logs, merged_entities = (
+            fuse_scores(
+                (speculative_results, SPECULATIVE_WEIGHT),
+                (rewritten_results, REWRITTEN_WEIGHT),
+                drop_below_stddev=False,
+            )
+            for speculative_results, rewritten_results in zip(speculative, rewritten)
+        )
+
+        # A log found by both passes keeps the chunks either of them matched
+        speculative_matches = {
+            r.data.pk: getattr(r.data, "matched_chunk_indexes", [])
+            for r in speculative[0]
+        }
+        for result in merged_logs:
+            result.data.matched_chunk_indexes = sorted(
+                set(getattr(result.data, "matched_chunk_indexes", []))
+                | set(speculative_matches.get(result.data.pk, []))
+            )
+        return merged_logs, merged_entities
+
+    def _speculative_retrieve(
+        self,
+        query: str,
+        conversation_messages: str,
+        session: ChatSession | None,
+        similarity_threshold: float | None,
+        timer: PipelineTimer,
+    ) -> tuple[list, list]:
+        """
+        Retrieve on the raw query while the rewrite is in flight, then run a
+        delta retrieval on the rewritten query and fuse the two result sets.
+        The delta always searches logs with the rewritten text (it may add
+        synonyms, dates or misspelled names the raw query lacks), but only
+        searches entities again if the rewrite names ones the speculative pass
+        missed.
+        """
+        query_with_history = conversation_messages + f"\n\nQuestion: {query}"
+
+        t0 = time.perf_counter()
+        (enhanced_search_query, t_enh), (speculative, t_spec) = fan_out(
+            partial(
+                _timed,
+                lambda: self._get_enhanced_query(
+                    query,
+                    conversation_messages=conversation_messages,
+                    session=session,
+                    similarity_threshold=similarity_threshold,
+                    timer=timer,
+                ),
+            ),
+            partial(
+                _timed,
+                lambda: self._retrieve(
+                    query,
+                    similarity_threshold,
+                    timer,
+                    semantic_query=query_with_history,
+                    label="spec",
+                ),
+            ),
+        )
+        t_overlap = time.perf_counter() - t0
+        timer.record("query_enhancement", t_enh)
+        timer.record("speculative_retrieval", t_spec)
+
+        t0 = time.perf_counter()
+        entity_results = speculative[1]
+        rewritten_entities: list = []
+        speculative_entities = [
+            r.data for r in entity_results if not isinstance(r.data, GameLog)
+        ]
+        if self._rewrite_adds_entities(enhanced_search_query, speculative_entities):
+            rewritten_entities = self._retrieve_entities(
+                enhanced_search_query, similarity_threshold, timer, label="delta"
+            )
+            _, entity_results = self._merge_retrievals(
+                ([], entity_results), ([], rewritten_entities)
+            )
+        else:
+            logger.info("Rewrite added no entities; searching only logs again")
+
+        rewritten_logs = self._retrieve_logs(
+            enhanced_search_query,
+            [r.data for r in entity_results if not isinstance(r.data, GameLog)],
+            similarity_threshold,
+            timer,
+            label="delta",
+        )
+        merged = self._merge_retrievals(
+            speculative, (rewritten_logs, rewritten_entities)
+        )
+        t_delta = time.perf_counter() - t0
+        timer.record("delta_retrieval", t_delta)
+
+        # Sequential would have been the rewrite, then one retrieval like the
+        # speculative one; negative when the speculative pass outlasts the rewrite
+        timer.record_saving("speculative: saved", t_enh + t_spec - t_overlap - t_delta)
+        return merged
+
     def _assemble_context(
         self,
         conversation_messages: str,
@@ -538,6 +926,7 @@ use of relevant entities, aliases, or prior context. Output only the enriched qu
             Association | Character | Place | Item | Artifact | Race
         ],
         logs_to_include_candidates: List[GameLog],
+        timer: PipelineTimer | None = None,
     ) -> tuple[str, List[GameLog]]:
 
         # --- Entities formatted ---
@@ -546,10 +935,9 @@ use of relevant entities, aliases, or prior context. Output only the enriched qu
             or "No entities retrieved."
         )
 
-        # --- Log summaries (all logs) ---
-        summaries_text = "\n".join(
-            f"Log {log.session_number} — {log.title}:\n{log.summary}"
-            for log in GameLog.objects.all()
+        # --- Log summaries (all logs), cached until a log changes ---
+        summaries = get_log_summaries_digest(
+            "Narrative Summaries of All Logs", model=self.model
         )
 
         # --- Base sections ---
@@ -560,37 +948,67 @@ use of relevant entities, aliases, or prior context. Output only the enriched qu
                 else "No prior conversation."
             ),
             "Retrieved Entities": entity_text,
-            "Narrative Summaries of All Logs": summaries_text,
         }
 
         # --- Count base token usage ---
         assembled = ""
         for title, content in sections.items():
             assembled += f"=== {title} ===\n{content}\n\n"
+        tokens_added = count_tokens(assembled, model=self.model)
+        assembled += summaries.text
+        tokens_added += summaries.token_count
+
+        # --- Long logs are cut down to their matched chunk windows ---
+        excerpts: Dict[int, str] = {}
+        if settings.RAG_LOG_CONTEXT_MODE == LOG_CONTEXT_MODE_CHUNKS:
+            excerpts = build_log_excerpts(
+                {
+                    log.pk: log.matched_chunk_indexes
+                    for log in logs_to_include_candidates
+                    if getattr(log, "matched_chunk_indexes", None)
+                    and log.token_count("full_text", self.model)
+                    > settings.RAG_LOG_FULL_TEXT_MAX_TOKENS
+                },
+                settings.RAG_LOG_CHUNK_NEIGHBOURS,
+            )
 
-        # --- Add full logs within budget ---
+        # --- Add logs within budget ---
         content_processor = get_processor("gamelog")
         logs_to_include: list[GameLog] = []
-        tokens_added = count_tokens(assembled, model=self.model)
+        log_texts: Dict[int, str] = {}
+        full_text_tokens = 0
         for log in logs_to_include_candidates:
-            candidate = (
-                f"Log {log.session_number} (Full) — {log.title}:\n{log.full_text}\n\n"
+            # Full text is counted once at save time; only the header is live
+            header = f"Log {log.session_number} (Full) — {log.title}:\n\n\n"
+            log_full_tokens = count_tokens(header, model=self.model) + log.token_count(
+                "full_text", self.model
             )
-            cand_tokens = count_tokens(candidate, model=self.model)
+            if log.pk in excerpts:
+                log_texts[log.pk] = format_log_excerpt(log, excerpts[log.pk])
+                cand_tokens = count_tokens(log_texts[log.pk], model=self.model)
+            else:
+                log_texts[log.pk] = content_processor.format_for_llm(log)
+                cand_tokens = log_full_tokens
             if tokens_added + cand_tokens > self.token_limit:
                 break
             logs_to_include.append(log)
             tokens_added += cand_tokens
+            full_text_tokens += log_full_tokens - cand_tokens
 
         if logs_to_include:
             logs_text = "\n\n".join(
                 [
-                    content_processor.format_for_llm(log)
+                    log_texts[log.pk]
                     for log in sorted(logs_to_include, key=lambda l: l.session_number)
                 ]
             )
             assembled += f"=== Full Logs (Retrieved Subset) ===\n{logs_text}\n\n"
 
+        if timer and excerpts:
+            timer.record_tokens(
+                "context: log excerpts", tokens_added + full_text_tokens, tokens_added
+            )
+
         return assembled, logs_to_include
 
     def _build_system_prompt(self, session: Optional[ChatSession] = None) -> str:
@@ -669,27 +1087,65 @@ Your goal: Be the ultimate space fantasy campaign ship's computer that understan
                 else ""
             )
 
-        ######### ENHANCE QUERY WITH CONTEXT #########
-        with timer.step("query_enhancement"):
-            enhanced_search_query = self._get_enhanced_query(
+        if self.retrieval_mode == RETRIEVAL_MODE_SPECULATIVE:
+            ######### RETRIEVE WHILE THE QUERY IS BEING ENHANCED #########
+            fused_log_results, fused_entity_results = self._speculative_retrieve(
                 query,
                 conversation_messages=conversation_messages,
                 session=session,
                 similarity_threshold=similarity_threshold,
                 timer=timer,
             )
+            logs_to_include_candidates, entities_to_include = (
+                self._logs_and_entities_to_include(
+                    fused_log_results,
+                    fused_entity_results,
+                    max_logs_to_include,
+                    max_entities_to_include,
+                )
+            )
 
-        ######### RETRIEVE LOGS AND ENTITIES USING ENHANCED QUERY #########
-        with timer.step("retrieval"):
+        elif self.retrieval_mode == RETRIEVAL_MODE_SKIP_REWRITE:
+            ######### RETRIEVE LOGS AND ENTITIES USING THE RAW QUERY #########
+            with timer.step("retrieval"):
+                fused_log_results, fused_entity_results = self._retrieve(
+                    query,
+                    similarity_threshold,
+                    timer,
+                    semantic_query=conversation_messages
+                    + f"\n\nQuestion: {query}",
+                )
             logs_to_include_candidates, entities_to_include = (
-                self._get_logs_and_entities_for_query(
-                    enhanced_search_query,
+                self._logs_and_entities_to_include(
+                    fused_log_results,
+                    fused_entity_results,
+                    max_logs_to_include,
+                    max_entities_to_include,
+                )
+            )
+
+        else:
+            ######### ENHANCE QUERY WITH CONTEXT #########
+            with timer.step("query_enhancement"):
+                enhanced_search_query = self._get_enhanced_query(
+                    query,
+                    conversation_messages=conversation_messages,
+                    session=session,
                     similarity_threshold=similarity_threshold,
-                    max_logs_to_include=max_logs_to_include,
-                    max_entities_to_include=max_entities_to_include,
                     timer=timer,
                 )
-            )
+
+            ######### RETRIEVE LOGS AND ENTITIES USING ENHANCED QUERY #########
+            with timer.step("retrieval"):
+                logs_to_include_candidates, entities_to_include = (
+                    self._get_logs_and_entities_for_query(
+                        enhanced_search_query,
+                        similarity_threshold=similarity_threshold,
+                        max_logs_to_include=max_logs_to_include,
+                        max_entities_to_include=max_entities_to_include,
+                        timer=timer,
+                    )
+                )
 
         if not logs_to_include_candidates and not entities_to_include:
             timer.summary()
@@ -701,6 +1157,7 @@ Your goal: Be the ultimate space fantasy campaign ship's computer that understan
                 conversation_messages=conversation_messages,
                 entities_to_include=entities_to_include,
                 logs_to_include_candidates=logs_to_include_candidates,
+                timer=timer,
             )
 
         with timer.step("build_system_prompt"):
@@ -720,6 +1177,15 @@ Your goal: Be the ultimate space fantasy campaign ship's computer that understan
             used_session_context=session is not None,
         )
 
+    def _response_messages(
+        self, query: str, prepared_context: PreparedContext
+    ) -> list[dict]:
+        return [
+            {"role": "system", "content": prepared_context.system_prompt},
+            {"role": "assistant", "content": prepared_context.assembled_context},
+            {"role": "user", "content": query},
+        ]
+
     def generate_response_stream(
         self,
         query: str,
@@ -734,14 +1200,7 @@ Your goal: Be the ultimate space fantasy campaign ship's computer that understan
         try:
             stream = openai_client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": prepared_context.system_prompt},
-                    {
-                        "role": "assistant",
-                        "content": prepared_context.assembled_context,
-                    },
-                    {"role": "user", "content": query},
-                ],
+                messages=self._response_messages(query, prepared_context),
                 temperature=0.3,
                 max_completion_tokens=2000,
                 stream=True,
@@ -782,6 +1241,12 @@ Your goal: Be the ultimate space fantasy campaign ship's computer that understan
             Dict with response, sources, tokens_used, etc.
         """
         try:
+            cache_key = self.response_cache_key(similarity_threshold, session)
+            query_embedding = self.response_cache_embedding(query, cache_key)
+            cached = self.get_cached_response(query, cache_key, query_embedding)
+            if cached is not None:
+                return cached
+
             prepared = self.prepare_context(
                 query=query,
                 similarity_threshold=similarity_threshold,
@@ -804,11 +1269,7 @@ Your goal: Be the ultimate space fantasy campaign ship's computer that understan
             t0 = time.perf_counter()
             response = openai_client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": prepared.system_prompt},
-                    {"role": "assistant", "content": prepared.assembled_context},
-                    {"role": "user", "content": query},
-                ],
+                messages=self._response_messages(query, prepared),
                 temperature=0.3,
                 max_completion_tokens=2000,
             )
@@ -832,6 +1293,7 @@ Your goal: Be the ultimate space fantasy campaign ship's computer that understan
                 f"Generated response for query: {query[:50]}... "
                 f"(tokens: {tokens_used})"
             )
+            self.cache_response(query, cache_key, response_data, query_embedding)
             return response_data
 
         except Exception as e:
@@ -843,6 +1305,80 @@ Your goal: Be the ultimate space fantasy campaign ship's computer that understan
                 "error": str(e),
             }
 
+    def response_cache_key(
+        self,
+        similarity_threshold: Optional[float] = None,
+        session: Optional[ChatSession] = None,
+    ) -> Optional[ResponseCacheKey]:
+        """
+        The response cache scope for a question, or None if its answer must not
+        be cached: sessions with earlier messages give questions context.
+        Call before saving the new message.
+        """
+        try:
+            if session is not None and session.messages.exists():
+                return None
+            return response_cache_key(
+                self.model,
+                self._build_system_prompt(session),
+                similarity_threshold or self.default_similarity_threshold,
+            )
+        except Exception as e:
+            logger.warning(f"Response cache unavailable: {str(e)}")
+            return None
+
+    def response_cache_embedding(
+        self, query: str, cache_key: Optional[ResponseCacheKey]
+    ) -> Optional[List[float]]:
+        """
+        The query's embedding, computed once per request for both the
+        near-duplicate lookup and the store; None if caching is off.
+        """
+        if cache_key is None:
+            return None
+        try:
+            return get_embedding(query)
+        except Exception as e:
+            logger.warning(f"Response cache embedding failed: {str(e)}")
+            return None
+
+    def get_cached_response(
+        self,
+        query: str,
+        cache_key: Optional[ResponseCacheKey],
+        query_embedding: Optional[List[float]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """A cached response_data dict for the query, or None on a miss."""
+        if cache_key is None:
+            return None
+        try:
+            cached = get_cached_response(query, cache_key, query_embedding)
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed: {str(e)}")
+            return None
+        return cached.response_data if cached else None
+
+    def cache_response(
+        self,
+        query: str,
+        cache_key: Optional[ResponseCacheKey],
+        response_data: Dict[str, Any],
+        query_embedding: Optional[List[float]] = None,
+    ):
+        """Cache a generated answer; no-context answers and errors are skipped."""
+        if (
+            cache_key is None
+            or response_data.get("error")
+            or response_data.get("cached")
+            or not response_data.get("response")
+            or not response_data["sources"].sources
+        ):
+            return
+        try:
+            cache_response(query, cache_key, self.model, response_data, query_embedding)
+        except Exception as e:
+            logger.warning(f"Failed to cache response: {str(e)}")
+
     def create_chat_session(self, user, title: Optional[str] = None) -> ChatSession:
         """
         Create a new chat session
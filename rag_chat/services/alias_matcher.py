@@ -0,0 +1,251 @@
+"""
+In-process exact matcher for entity names and aliases.
+
+Every Alias.name and entity name is compiled into an Aho-Corasick automaton
+held in memory by each web/Celery worker, so names that appear verbatim in a
+query are found in a single pass over the text without touching the database.
+
+Changes to aliases or entity names bump a version counter in the shared
+cache; each process compares its automaton's version against it (at most
+every ALIAS_MATCHER_VERSION_CHECK_INTERVAL seconds) and rebuilds when it
+has moved.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+
+from nucleus.models import Alias, Entity
+
+logger = logging.getLogger(__name__)
+
+ALIAS_MATCHER_VERSION_KEY = "alias_matcher:version"
+
+# (content_type_id, object_id, original name)
+Owner = Tuple[int, int, str]
+
+
+@dataclass
+class AliasMatch:
+    content_type_id: int
+    object_id: int
+    matched_name: str
+    start: int
+    end: int
+
+
+def normalize_for_matching(text: str) -> str:
+    """
+    Casefold, turn punctuation into spaces and collapse whitespace. The
+    result is padded with a space on each side so that matching padded
+    patterns only ever hits whole words.
+    """
+    words = re.sub(r"[\W_]+", " ", text.casefold()).split()
+    return f" {' '.join(words)} " if words else ""
+
+
+class AliasAutomaton:
+    """Aho-Corasick automaton over normalized names."""
+
+    def __init__(
+        self, patterns: Dict[str, List[Owner]], version: Tuple[int, int] = (0, 0)
+    ):
+        self.version = version
+        self.owners: Dict[str, List[Owner]] = {}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+
+        for name, owners in patterns.items():
+            key = normalize_for_matching(name)
+            if not key:
+                continue
+            self.owners.setdefault(key, []).extend(owners)
+
+        for key in self.owners:
+            self._add(key)
+        self._link()
+
+    def __len__(self):
+        return len(self.owners)
+
+    def _add(self, key: str):
+        state = 0
+        for char in key:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append(key)
+
+    def _link(self):
+        """Breadth-first pass computing failure links and merged outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._out[next_state] = (
+                    self._out[next_state] + self._out[self._fail[next_state]]
+                )
+
+    def find(self, text: str, min_length: int = 1) -> List[AliasMatch]:
+        """
+        Every occurrence of every known name in `text`. Offsets refer to the
+        normalized text; one match is returned per owning entity.
+        """
+        normalized = normalize_for_matching(text)
+        goto, fail, out = self._goto, self._fail, self._out
+
+        matches: List[AliasMatch] = []
+        state = 0
+        for i, char in enumerate(normalized):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for key in out[state]:
+                # Keys are padded with spaces; report the inner span
+                if len(key) - 2 < min_length:
+                    continue
+                end = i
+                start = end - len(key) + 2
+                for content_type_id, object_id, name in self.owners[key]:
+                    matches.append(
+                        AliasMatch(content_type_id, object_id, name, start, end)
+                    )
+        return matches
+
+
+def _load_patterns() -> Dict[str, List[Owner]]:
+    """Every owned alias plus every entity's own name."""
+    patterns: Dict[str, List[Owner]] = {}
+
+    for name, content_type_id, object_id in Alias.objects.filter(
+        entity_content_type__isnull=False
+    ).values_list("name", "entity_content_type_id", "entity_object_id"):
+        patterns.setdefault(name, []).append((content_type_id, object_id, name))
+
+    for model in apps.get_models():
+        if not issubclass(model, Entity):
+            continue
+        content_type_id = ContentType.objects.get_for_model(model).pk
+        for pk, name in model.objects.values_list("pk", "name"):
+            patterns.setdefault(name, []).append((content_type_id, pk, name))
+
+    return patterns
+
+
+# --- Process-wide automaton and version tracking ---
+
+_matcher: Optional[AliasAutomaton] = None
+_matcher_lock = threading.Lock()
+_checked_at = 0.0
+_local_version = 0
+
+
+def _shared_cache():
+    if not settings.ALIAS_MATCHER_CACHE_ALIAS:
+        return None
+    try:
+        return caches[settings.ALIAS_MATCHER_CACHE_ALIAS]
+    except InvalidCacheBackendError:
+        return None
+
+
+def _shared_version() -> Optional[int]:
+    """The shared version counter, or None if the shared cache is unavailable."""
+    shared = _shared_cache()
+    if shared is None:
+        return None
+    try:
+        return shared.get(ALIAS_MATCHER_VERSION_KEY, 0)
+    except Exception as e:
+        logger.warning(f"Alias matcher version check failed: {str(e)}")
+        return None
+
+
+def bump_alias_matcher_version():
+    """
+    Mark every process's automaton stale. Called (on commit) whenever an
+    alias or entity name changes.
+    """
+    global _local_version, _checked_at
+    with _matcher_lock:
+        _local_version += 1
+        _checked_at = 0.0
+
+    shared = _shared_cache()
+    if shared is None:
+        return
+    try:
+        try:
+            shared.incr(ALIAS_MATCHER_VERSION_KEY)
+        except ValueError:
+            # Missing key; start the counter (add() loses gracefully to a racer)
+            if not shared.add(ALIAS_MATCHER_VERSION_KEY, 1, timeout=None):
+                shared.incr(ALIAS_MATCHER_VERSION_KEY)
+    except Exception as e:
+        logger.warning(f"Failed to bump alias matcher version: {str(e)}")
+
+
+def get_alias_matcher() -> AliasAutomaton:
+    """
+    The process's automaton, rebuilt if a change has been signalled locally
+    or the shared version has moved since it was built.
+    """
+    global _matcher, _checked_at
+
+    now = time.monotonic()
+    matcher = _matcher
+    if (
+        matcher is not None
+        and now - _checked_at < settings.ALIAS_MATCHER_VERSION_CHECK_INTERVAL
+    ):
+        return matcher
+
+    with _matcher_lock:
+        shared_version = _shared_version()
+        if shared_version is None:
+            # Shared cache unreachable: only local changes can be seen
+            shared_version = _matcher.version[0] if _matcher is not None else 0
+        version = (shared_version, _local_version)
+        if _matcher is None or _matcher.version != version:
+            started = time.perf_counter()
+            _matcher = AliasAutomaton(_load_patterns(), version=version)
+            logger.info(
+                f"Built alias matcher with {len(_matcher)} names "
+                f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+            )
+        _checked_at = now
+        return _matcher
+
+
+def find_exact_entity_mentions(text: str, min_length: int = 1) -> List[AliasMatch]:
+    """Entity names and aliases that appear verbatim (modulo case/punctuation)."""
+    return get_alias_matcher().find(text, min_length=min_length)
+
+
+def reset_alias_matcher():
+    """Drop this process's automaton so the next lookup rebuilds it."""
+    global _matcher, _checked_at
+    with _matcher_lock:
+        _matcher = None
+        _checked_at = 0.0
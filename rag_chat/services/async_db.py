@@ -0,0 +1,115 @@
+"""
+Native async execution of ORM-built queries, for the async RAG pipeline.
+
+Django's async ORM methods (aget, async for, ...) run each query through
+sync_to_async on the request's single thread-sensitive executor, so queries
+awaited together with asyncio.gather still run one after another. The
+pipeline's heavy searches (vector, trigram, full-text) instead compile their
+queryset to SQL and run it on a psycopg AsyncConnectionPool, so they overlap.
+
+Connections use the same parameters as Django's "default" database and a
+client-side-binding cursor, so compiled SQL behaves exactly as it does through
+the ORM. Like Django's, they are in autocommit mode, so a connection goes back
+to the pool idle instead of mid-transaction. Only plain columns (ids, scores, text) should be fetched this way;
+model instances are then loaded through the ORM.
+
+A pool is bound to the event loop that opened it. Under ASGI there is one
+loop per process, so its pool lives as long as the process. Under WSGI every
+async view runs on a fresh loop, so the view closes that loop's pool before
+the loop ends (see close_async_pool); otherwise each request would leak a pool
+and its connections.
+"""
+
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Sequence
+from weakref import WeakKeyDictionary
+
+from django.conf import settings
+from django.db import connections
+from psycopg import AsyncClientCursor, AsyncConnection
+from psycopg_pool import AsyncConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# Open pools, and the locks guarding their creation, by event loop
+_pools: "WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncConnectionPool]" = (
+    WeakKeyDictionary()
+)
+_pool_locks: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+    WeakKeyDictionary()
+)
+_registry_lock = threading.Lock()
+
+
+def _connection_kwargs() -> dict:
+    params = connections["default"].get_connection_params()
+    params["cursor_factory"] = AsyncClientCursor
+    params["autocommit"] = True
+    return params
+
+
+async def get_async_pool() -> AsyncConnectionPool:
+    """The running event loop's pool, opened on first use."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is not None:
+        return pool
+
+    with _registry_lock:
+        lock = _pool_locks.setdefault(loop, asyncio.Lock())
+
+    async with lock:
+        pool = _pools.get(loop)
+        if pool is None:
+            pool = AsyncConnectionPool(
+                kwargs=_connection_kwargs(),
+                min_size=settings.RAG_ASYNC_DB_POOL_MIN_SIZE,
+                max_size=settings.RAG_ASYNC_DB_POOL_MAX_SIZE,
+                open=False,
+            )
+            await pool.open()
+            with _registry_lock:
+                _pools[loop] = pool
+            logger.info(
+                f"Opened async DB pool ({settings.RAG_ASYNC_DB_POOL_MAX_SIZE} max)"
+            )
+    return pool
+
+
+@asynccontextmanager
+async def async_connection() -> AsyncIterator[AsyncConnection]:
+    """Borrow a connection from the pool."""
+    pool = await get_async_pool()
+    async with pool.connection() as conn:
+        yield conn
+
+
+async def afetch(
+    sql: str,
+    params: Sequence[Any] | dict | None = None,
+    local_settings: Sequence[tuple[str, str]] = (),
+) -> list[tuple]:
+    """
+    Run a query on a pooled connection and return all rows. local_settings
+    are (name, value) pairs SET LOCAL in a transaction around just this query.
+    """
+    async with async_connection() as conn, conn.cursor() as cursor:
+        if not local_settings:
+            await cursor.execute(sql, params)
+            return await cursor.fetchall()
+        async with conn.transaction():
+            for name, value in local_settings:
+                await cursor.execute("SELECT set_config(%s, %s, true)", [name, value])
+            await cursor.execute(sql, params)
+            return await cursor.fetchall()
+
+
+async def close_async_pool():
+    """Close the running event loop's pool, if it has one."""
+    with _registry_lock:
+        pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
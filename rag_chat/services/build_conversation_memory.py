@@ -12,7 +12,9 @@ from ..utils import count_tokens
 logger = logging.getLogger(__name__)
 
 # Initialize OpenAI client
-openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+openai_client = OpenAI(
+    api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL
+)
 
 
 def _divide_messages(
@@ -0,0 +1,112 @@
+"""
+Process-wide, bounded thread pool for the RAG pipeline's parallel searches.
+
+A fresh ThreadPoolExecutor per call meant fresh threads per request, each
+opening its own database connection that was never closed. Here a fixed set
+of worker threads (RAG_FANOUT_MAX_WORKERS) is shared by every request, so
+the number of connections they hold is bounded. Workers run Django's
+close_old_connections around each task, as the request cycle does, which
+returns the connection to the pool (see DATABASE_POOL_ENABLED) or, without
+pooling, keeps it until it is broken or older than CONN_MAX_AGE.
+
+Tasks are only handed to the pool while it has a free worker; the rest run
+in the calling thread. Under load the pipeline therefore degrades to
+sequential execution instead of queueing behind (or oversubscribing)
+Postgres, and nested fan-outs can never deadlock waiting on each other.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+_in_flight = 0
+_peak_in_flight = 0
+_submitted = 0
+_ran_inline = 0
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.RAG_FANOUT_MAX_WORKERS,
+            thread_name_prefix="rag-fanout",
+        )
+    return _executor
+
+
+def _run_in_worker(fn: Callable[[], Any]) -> Any:
+    global _in_flight
+    close_old_connections()
+    try:
+        return fn()
+    finally:
+        close_old_connections()
+        with _lock:
+            _in_flight -= 1
+
+
+def fan_out(*fns: Callable[[], Any]) -> List[Any]:
+    """
+    Call each of fns concurrently where capacity allows and return their
+    results in order. The first runs in the calling thread, as does any
+    call the pool has no free worker for. Exceptions propagate.
+    """
+    global _in_flight, _peak_in_flight, _submitted, _ran_inline
+
+    futures: List[Optional[Future]] = [None] * len(fns)
+    with _lock:
+        executor = _get_executor()
+        free = max(settings.RAG_FANOUT_MAX_WORKERS - _in_flight, 0)
+        to_submit = min(len(fns) - 1, free)
+        for i in range(1, to_submit + 1):
+            futures[i] = executor.submit(_run_in_worker, fns[i])
+        _in_flight += to_submit
+        _peak_in_flight = max(_peak_in_flight, _in_flight)
+        _submitted += to_submit
+        _ran_inline += len(fns) - 1 - to_submit
+
+    if to_submit < len(fns) - 1:
+        logger.warning(
+            f"RAG fan-out saturated ({_in_flight} in flight); running "
+            f"{len(fns) - 1 - to_submit} of {len(fns)} calls sequentially"
+        )
+
+    # Run the inline calls before waiting, so the workers overlap with them
+    inline = {
+        i: fn() for i, (fn, future) in enumerate(zip(fns, futures)) if future is None
+    }
+    return [
+        inline[i] if future is None else future.result()
+        for i, future in enumerate(futures)
+    ]
+
+
+def get_fanout_stats() -> Dict[str, int]:
+    """Queue depth and totals since the process started."""
+    with _lock:
+        return {
+            "max_workers": settings.RAG_FANOUT_MAX_WORKERS,
+            "in_flight": _in_flight,
+            "peak_in_flight": _peak_in_flight,
+            "submitted": _submitted,
+            "ran_inline": _ran_inline,
+        }
+
+
+def shutdown_fanout():
+    """Stop the pool (e.g. in tests); the next fan_out starts a new one."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
@@ -1,11 +1,12 @@
 import re
 
-import nltk
 from django.contrib.postgres.search import SearchQuery, SearchRank
 from django.db.models import F, QuerySet
 
 from nucleus.models import GameLog, Entity
 
+from ..key_terms import entity_key_terms
+
 
 def game_log_simple_fts(query_str, limit=10):
     # Consider changing config to 'english' if this doesn't work well
@@ -20,40 +21,12 @@ def game_log_simple_fts(query_str, limit=10):
     )
 
 
-STOPWORDS = set(nltk.corpus.stopwords.words("english"))
-
-
-def key_terms(description: str, max_terms: int = 5) -> list[str]:
-    """
-    Extract salient nouns/adjectives from a description.
-    """
-    if not description:
-        return []
-
-    tokens = nltk.word_tokenize(description)
-    tagged = nltk.pos_tag(tokens)
-
-    candidates = [
-        word.lower()
-        for word, tag in tagged
-        if (tag.startswith("NN") or tag.startswith("JJ"))
-    ]
-
-    filtered = [w for w in candidates if w not in STOPWORDS and w.isalpha()]
-
-    # Deduplicate while preserving order
-    seen = set()
-    unique = [w for w in filtered if not (w in seen or seen.add(w))]
-
-    return unique[:max_terms]
-
-
 def fts_terms(entities: list[Entity]) -> tuple[list[str], list[str]]:
     """
     Build the FTS term list for a user query and matched entities.
 
     Args:
-        entities: list of matched entity objects (with .name, .aliases, .type, .description)
+        entities: list of matched entity objects (with .name, .aliases, .key_terms)
 
     Returns:
         list[str] for OR-based full-text search
@@ -72,7 +45,7 @@ def fts_terms(entities: list[Entity]) -> tuple[list[str], list[str]]:
                 names_and_aliases.append(alias.name)
 
         # Key terms from description
-        for term in key_terms(entity.description, max_terms=5):
+        for term in entity_key_terms(entity, max_terms=5):
             if term not in description_keywords:
                 description_keywords.append(term)
 
@@ -108,7 +81,7 @@ def weighted_fts_search_logs(
 
     Args:
         query: the original user query string
-        entities: list of matched entity objects (with .name, .aliases, .type, .description)
+        entities: list of matched entity objects (with .name, .aliases, .key_terms)
 
     Returns:
         QuerySet of GameLog entries
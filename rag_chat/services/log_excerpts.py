@@ -0,0 +1,105 @@
+"""
+Excerpts of long GameLogs for the chat context, built from their chunks.
+
+In the "chunks" context mode (settings.RAG_LOG_CONTEXT_MODE) a retrieved log
+longer than RAG_LOG_FULL_TEXT_MAX_TOKENS is represented by the chunks that
+matched the query plus RAG_LOG_CHUNK_NEIGHBOURS chunks either side. Windows
+that overlap or touch are merged, and the words consecutive chunks share
+(chunk_document overlaps them) are written once.
+
+Matched chunk indexes travel on the retrieved GameLog instances as
+`matched_chunk_indexes`, set when log results are fused.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+
+from nucleus.models import GameLog
+
+from ..models import ContentChunk
+
+# Longest run of shared words looked for between consecutive chunks; well
+# above the words in chunk_document's default CHUNK_OVERLAP_TOKENS
+MAX_CHUNK_OVERLAP_WORDS = 200
+
+EXCERPT_SEPARATOR = "\n[...]\n"
+
+
+def chunk_windows(
+    matched_indexes: Iterable[int], neighbours: int
+) -> List[Tuple[int, int]]:
+    """
+    Pure. Inclusive (first, last) chunk index ranges covering each match and
+    `neighbours` chunks either side, with overlapping or adjacent ranges merged.
+    """
+    windows: List[Tuple[int, int]] = []
+    for index in sorted(set(matched_indexes)):
+        first, last = max(0, index - neighbours), index + neighbours
+        if windows and first <= windows[-1][1] + 1:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], last))
+        else:
+            windows.append((first, last))
+    return windows
+
+
+def join_overlapping_chunks(texts: List[str]) -> str:
+    """
+    Pure. Join consecutive chunks, dropping the leading words of each that
+    repeat the end of the one before.
+    """
+    words: List[str] = []
+    for text in texts:
+        chunk_words = text.split()
+        longest = min(len(words), len(chunk_words), MAX_CHUNK_OVERLAP_WORDS)
+        overlap = next(
+            (n for n in range(longest, 0, -1) if words[-n:] == chunk_words[:n]), 0
+        )
+        words.extend(chunk_words[overlap:])
+    return " ".join(words)
+
+
+def build_log_excerpts(
+    matched_indexes_by_log: Dict[int, Iterable[int]], neighbours: int
+) -> Dict[int, str]:
+    """
+    Excerpt text for each log id, from one query over the chunks in its
+    windows. Logs with no stored chunks are left out.
+    """
+    windows_by_log = {
+        log_id: chunk_windows(indexes, neighbours)
+        for log_id, indexes in matched_indexes_by_log.items()
+    }
+    if not windows_by_log:
+        return {}
+
+    condition = Q()
+    for log_id, windows in windows_by_log.items():
+        for first, last in windows:
+            condition |= Q(object_id=log_id, chunk_index__range=(first, last))
+
+    texts: Dict[int, Dict[int, str]] = defaultdict(dict)
+    for log_id, chunk_index, chunk_text in ContentChunk.objects.filter(
+        condition, content_type=ContentType.objects.get_for_model(GameLog)
+    ).values_list("object_id", "chunk_index", "chunk_text"):
+        texts[log_id][chunk_index] = chunk_text
+
+    excerpts = {}
+    for log_id, windows in windows_by_log.items():
+        chunks = texts.get(log_id)
+        if not chunks:
+            continue
+        excerpts[log_id] = EXCERPT_SEPARATOR.join(
+            join_overlapping_chunks(
+                [chunks[i] for i in range(first, last + 1) if i in chunks]
+            )
+            for first, last in windows
+            if any(i in chunks for i in range(first, last + 1))
+        )
+    return excerpts
+
+
+def format_log_excerpt(log: GameLog, excerpt: str) -> str:
+    return f"Log {log.session_number} (Excerpts) — {log.title}\n{excerpt}"
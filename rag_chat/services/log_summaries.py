@@ -0,0 +1,114 @@
+"""
+Digest of every GameLog's summary, as included in each chat request's context.
+
+The digest only changes when a log does, so it is built once (reading just the
+columns it needs) and cached in the shared cache along with its token count.
+It is keyed by a version counter that GameLog saves and deletes bump via
+rag_chat.signals, so a digest built from rows read before a change is stored
+under the old version and never served.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+
+from nucleus.models import GameLog
+
+from ..utils import count_tokens
+
+logger = logging.getLogger(__name__)
+
+LOG_SUMMARIES_VERSION_KEY = "log_summaries_digest:version"
+LOG_SUMMARIES_CACHE_KEY = "log_summaries_digest:{version}"
+
+# Fields that appear in the digest; saves that touch none of them keep it valid
+LOG_SUMMARY_FIELDS = ("session_number", "title", "summary")
+
+
+@dataclass
+class LogSummariesDigest:
+    text: str
+    token_count: int
+
+
+def build_log_summaries_text() -> str:
+    """Concatenate every log's summary, in session order."""
+    logs = GameLog.objects.only(*LOG_SUMMARY_FIELDS).order_by("session_number", "pk")
+    return "\n".join(
+        f"Log {log.session_number} — {log.title}:\n{log.summary}" for log in logs
+    )
+
+
+def _shared_cache():
+    if not settings.LOG_SUMMARIES_CACHE_ALIAS:
+        return None
+    try:
+        return caches[settings.LOG_SUMMARIES_CACHE_ALIAS]
+    except InvalidCacheBackendError:
+        return None
+
+
+def get_log_summaries_digest(
+    section_title: str, model: str = "gpt-4o-mini"
+) -> LogSummariesDigest:
+    """
+    The summaries digest, formatted as a context section under `section_title`,
+    with its token count for `model`. Served from the shared cache when
+    possible; falls back to building it from the database.
+    """
+    shared = _shared_cache()
+    cached = None
+    if shared is not None:
+        try:
+            version = shared.get(LOG_SUMMARIES_VERSION_KEY)
+            if version is None:
+                # Seed from the clock so a lost counter never revisits old versions
+                shared.add(
+                    LOG_SUMMARIES_VERSION_KEY, int(time.time() * 1000), timeout=None
+                )
+                version = shared.get(LOG_SUMMARIES_VERSION_KEY)
+            cache_key = LOG_SUMMARIES_CACHE_KEY.format(version=version)
+            cached = shared.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Log summaries cache unavailable: {str(e)}")
+            shared = None
+
+    if cached is None:
+        cached = {"text": build_log_summaries_text(), "token_counts": {}}
+
+    token_key = f"{model}\n{section_title}"
+    section = f"=== {section_title} ===\n{cached['text']}\n\n"
+    if token_key not in cached["token_counts"]:
+        cached["token_counts"][token_key] = count_tokens(section, model=model)
+        if shared is not None:
+            try:
+                shared.set(
+                    cache_key,
+                    cached,
+                    timeout=settings.LOG_SUMMARIES_CACHE_TTL,
+                )
+            except Exception as e:
+                logger.warning(f"Failed to cache log summaries: {str(e)}")
+
+    return LogSummariesDigest(
+        text=section, token_count=cached["token_counts"][token_key]
+    )
+
+
+def invalidate_log_summaries_digest():
+    """Move to a new digest version; the next request rebuilds it."""
+    shared = _shared_cache()
+    if shared is None:
+        return
+    try:
+        try:
+            shared.incr(LOG_SUMMARIES_VERSION_KEY)
+        except ValueError:
+            # Missing key; the next request seeds a fresh version
+            pass
+    except Exception as e:
+        logger.warning(f"Failed to invalidate log summaries cache: {str(e)}")
@@ -0,0 +1,96 @@
+"""
+Debounced reindexing of edited content, driven by rag_chat.signals.
+
+Every committed edit to an indexed object (a save, or a change to its aliases,
+logs or places) moves the object's due time to RAG_REINDEX_QUIET_SECONDS from
+now. The pending set lives in the shared cache as one due-time key per object.
+The first edit also schedules a single reindex_content task for that time.
+When the task runs, it reschedules itself while edits keep arriving, and only
+reprocesses once the object has been quiet. So a lock/edit/release cycle costs
+one process_content call, which only embeds the chunks that changed.
+
+Without the shared cache, every edit schedules its own delayed reindex.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+
+logger = logging.getLogger(__name__)
+
+REINDEX_DUE_KEY = "reindex:due:{content_type}:{object_id}"
+REINDEX_SCHEDULED_KEY = "reindex:scheduled:{content_type}:{object_id}"
+
+# How long pending entries outlive their due time. If a scheduled task is
+# lost, the entry expires and the next edit schedules a new one.
+REINDEX_PENDING_GRACE_SECONDS = 10 * 60
+
+
+def _shared_cache():
+    if not settings.RAG_REINDEX_CACHE_ALIAS:
+        return None
+    try:
+        return caches[settings.RAG_REINDEX_CACHE_ALIAS]
+    except InvalidCacheBackendError:
+        return None
+
+
+def _keys(content_type: str, object_id) -> tuple[str, str]:
+    names = {"content_type": content_type, "object_id": object_id}
+    return REINDEX_DUE_KEY.format(**names), REINDEX_SCHEDULED_KEY.format(**names)
+
+
+def _pending_timeout() -> int:
+    return settings.RAG_REINDEX_QUIET_SECONDS + REINDEX_PENDING_GRACE_SECONDS
+
+
+def request_reindex(content_type: str, object_id):
+    """
+    Record an edit, and schedule a reindex unless one is already pending.
+    Call after the edit has committed.
+    """
+    from ..tasks import reindex_content
+
+    quiet = settings.RAG_REINDEX_QUIET_SECONDS
+    shared = _shared_cache()
+    if shared is not None:
+        due_key, scheduled_key = _keys(content_type, object_id)
+        try:
+            shared.set(due_key, time.time() + quiet, timeout=_pending_timeout())
+            if not shared.add(scheduled_key, True, timeout=_pending_timeout()):
+                return  # The pending task will see the new due time
+        except Exception as e:
+            logger.warning(f"Reindex queue unavailable: {str(e)}")
+
+    try:
+        reindex_content.apply_async(args=(content_type, object_id), countdown=quiet)
+    except Exception as e:
+        logger.error(
+            f"Failed to queue reindex for {content_type} {object_id}: {str(e)}"
+        )
+
+
+def claim_reindex(content_type: str, object_id) -> float:
+    """
+    Seconds until the object has been quiet for RAG_REINDEX_QUIET_SECONDS, or
+    0 if it has, in which case its pending entry is cleared so that the next
+    edit schedules a new reindex.
+    """
+    shared = _shared_cache()
+    if shared is None:
+        return 0.0
+
+    due_key, scheduled_key = _keys(content_type, object_id)
+    try:
+        due = shared.get(due_key)
+        now = time.time()
+        if due is not None and due > now:
+            shared.touch(scheduled_key, timeout=_pending_timeout())
+            return due - now
+        shared.delete_many([due_key, scheduled_key])
+    except Exception as e:
+        logger.warning(f"Reindex queue unavailable: {str(e)}")
+    return 0.0
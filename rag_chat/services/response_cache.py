@@ -0,0 +1,218 @@
+"""
+Cache of chat answers, stored in QueryCache, so repeated questions skip
+retrieval and generation entirely.
+
+Only questions asked without conversation history are cached: history can
+change what a question means. Each entry is scoped to everything else that
+shapes the answer (model, system prompt, similarity threshold and the corpus
+version), so a content change makes every earlier answer unreachable. Lookups
+try the normalized question first, then the nearest cached question in the
+same scope by embedding, if it clears RESPONSE_CACHE_SIMILARITY_THRESHOLD.
+"""
+
+import hashlib
+import logging
+import re
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+from django.db.models import F, Q
+from django.utils import timezone
+from pgvector.django import CosineDistance
+
+from ..embeddings import create_query_hash, get_embedding, normalize_embedding_text
+from ..models import QueryCache
+from ..source_models import bulk_resolve_sources, create_sources
+
+logger = logging.getLogger(__name__)
+
+CORPUS_VERSION_KEY = "rag_corpus:version"
+
+
+@dataclass
+class ResponseCacheKey:
+    scope: str
+    corpus_version: int
+
+
+@dataclass
+class CachedResponse:
+    query_cache_id: int
+    response_data: Dict[str, Any]
+    similarity: float
+
+
+def normalize_query(query: str) -> str:
+    """Casefold, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"[\s?!.]+$", "", normalize_embedding_text(query))
+
+
+def _shared_cache():
+    if not settings.RESPONSE_CACHE_ALIAS:
+        return None
+    try:
+        return caches[settings.RESPONSE_CACHE_ALIAS]
+    except InvalidCacheBackendError:
+        return None
+
+
+def get_corpus_version() -> Optional[int]:
+    """
+    The current corpus version, or None if the shared cache is unavailable
+    (in which case answers are neither served from nor written to the cache,
+    since there is no way to know they are current).
+    """
+    shared = _shared_cache()
+    if shared is None:
+        return None
+    try:
+        version = shared.get(CORPUS_VERSION_KEY)
+        if version is None:
+            # Seed from the clock so a lost counter never revisits old versions
+            shared.add(CORPUS_VERSION_KEY, int(time.time() * 1000), timeout=None)
+            version = shared.get(CORPUS_VERSION_KEY)
+        return version
+    except Exception as e:
+        logger.warning(f"Corpus version unavailable: {str(e)}")
+        return None
+
+
+def bump_corpus_version():
+    """
+    Mark every cached answer stale. Called (on commit) whenever content that
+    answers are built from changes.
+    """
+    shared = _shared_cache()
+    if shared is None:
+        return
+    try:
+        try:
+            shared.incr(CORPUS_VERSION_KEY)
+        except ValueError:
+            # Missing key; the next lookup seeds a fresh version
+            pass
+    except Exception as e:
+        logger.warning(f"Failed to bump corpus version: {str(e)}")
+
+
+def response_cache_key(
+    model: str, system_prompt: str, similarity_threshold: float
+) -> Optional[ResponseCacheKey]:
+    """The scope answers are cached under, or None if caching is unavailable."""
+    if not settings.RESPONSE_CACHE_TTL:
+        return None
+    corpus_version = get_corpus_version()
+    if corpus_version is None:
+        return None
+    content = f"{model}\n{similarity_threshold}\n{corpus_version}\n{system_prompt}"
+    return ResponseCacheKey(
+        scope=hashlib.sha256(content.encode()).hexdigest(),
+        corpus_version=corpus_version,
+    )
+
+
+def get_cached_response(
+    query: str,
+    key: ResponseCacheKey,
+    query_embedding: Optional[List[float]] = None,
+) -> Optional[CachedResponse]:
+    """
+    A live cached answer to `query` in the key's scope, exact or
+    near-duplicate. Counts the hit and the tokens it saved. Pass the query's
+    embedding if the caller already has it.
+    """
+    now = timezone.now()
+    live = QueryCache.objects.filter(scope_hash=key.scope, expires_at__gt=now)
+
+    query_hash = create_query_hash(normalize_query(query), {"scope": key.scope})
+    entry = live.filter(query_hash=query_hash).first()
+    similarity = 1.0
+
+    if entry is None and settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD < 1:
+        entry = (
+            live.exclude(query_embedding=None)
+            .annotate(
+                distance=CosineDistance(
+                    "query_embedding", query_embedding or get_embedding(query)
+                )
+            )
+            .filter(distance__lte=1 - settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD)
+            .order_by("distance")
+            .first()
+        )
+        if entry is not None:
+            similarity = 1 - entry.distance
+
+    if entry is None:
+        return None
+
+    tokens_used = entry.response_data.get("tokens_used") or 0
+    QueryCache.objects.filter(pk=entry.pk).update(
+        hit_count=F("hit_count") + 1, tokens_saved=F("tokens_saved") + tokens_used
+    )
+
+    sources = create_sources(bulk_resolve_sources([entry.response_data["sources"]]))
+    logger.info(
+        f"Response cache hit for query: {query[:50]}... "
+        f"(matched: {entry.query_text[:50]}..., similarity: {similarity:.3f})"
+    )
+    return CachedResponse(
+        query_cache_id=entry.pk,
+        response_data={
+            "response": entry.response_data["response"],
+            "sources": sources,
+            "tokens_used": 0,
+            "similarity_threshold": entry.response_data.get("similarity_threshold"),
+            "used_session_context": False,
+            "cached": True,
+        },
+        similarity=similarity,
+    )
+
+
+def cache_response(
+    query: str,
+    key: ResponseCacheKey,
+    model: str,
+    response_data: Dict[str, Any],
+    query_embedding: Optional[List[float]] = None,
+) -> QueryCache:
+    """
+    Store a generated answer for RESPONSE_CACHE_TTL seconds. Pass the query's
+    embedding if the caller already has it.
+    """
+    query_hash = create_query_hash(normalize_query(query), {"scope": key.scope})
+    entry, _ = QueryCache.objects.update_or_create(
+        query_hash=query_hash,
+        defaults={
+            "query_text": query,
+            "response_data": {
+                "response": response_data["response"],
+                "sources": response_data["sources"].to_json(),
+                "tokens_used": response_data.get("tokens_used") or 0,
+                "similarity_threshold": response_data.get("similarity_threshold"),
+            },
+            "model": model,
+            "corpus_version": key.corpus_version,
+            "scope_hash": key.scope,
+            "query_embedding": query_embedding or get_embedding(query),
+            "expires_at": timezone.now()
+            + timedelta(seconds=settings.RESPONSE_CACHE_TTL),
+        },
+    )
+    return entry
+
+
+def evict_stale_responses() -> int:
+    """Delete expired entries and those from older corpus versions."""
+    stale = Q(expires_at__lte=timezone.now())
+    corpus_version = get_corpus_version()
+    if corpus_version is not None:
+        stale |= Q(corpus_version__lt=corpus_version)
+    deleted, _ = QueryCache.objects.filter(stale).delete()
+    return deleted
@@ -1,15 +1,22 @@
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 from dataclasses import dataclass
+from functools import lru_cache
 
+from asgiref.sync import sync_to_async
+from django.contrib.contenttypes.models import ContentType
 from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connection, transaction
 
 from association.models import Association
 from character.models import Character
 from item.models import Artifact, Item
-from nucleus.models import Alias
+from nucleus.models import Alias, resolve_alias_entities
 from place.models import Place
 from race.models import Race
 
+from ..content_processors import get_processor
+from .alias_matcher import find_exact_entity_mentions, normalize_for_matching
+from .async_db import async_connection
 from .entity_extractor import entity_extractor
 
 
@@ -23,6 +30,225 @@ class SearchResult:
     similarity: float
 
 
+# Default value of pg_trgm.similarity_threshold, which the % operator uses
+PG_TRGM_DEFAULT_THRESHOLD = 0.3
+
+ENTITY_MODELS: list[type[Association | Character | Item | Artifact | Place | Race]] = [
+    Character,
+    Place,
+    Item,
+    Artifact,
+    Association,
+    Race,
+]
+ENTITY_MODELS_BY_TYPE = {model.__name__: model for model in ENTITY_MODELS}
+
+
+@lru_cache(maxsize=1)
+def _trigram_search_sql() -> str:
+    """
+    One statement for all candidates: unnest the candidate array, take the
+    top-k aliases per candidate with a LATERAL subquery (the % operator lets
+    Postgres use alias_name_trgm_idx), and keep each entity's best match.
+    Aliases carry their owning entity, so no joins are needed.
+    """
+    return f"""
+        WITH matches AS (
+            SELECT DISTINCT ON (m.entity_content_type_id, m.entity_object_id)
+                m.entity_content_type_id,
+                m.entity_object_id,
+                m.alias_name,
+                m.similarity
+            FROM unnest(%(candidates)s::text[]) AS c(candidate)
+            CROSS JOIN LATERAL (
+                SELECT
+                    a.entity_content_type_id,
+                    a.entity_object_id,
+                    a.name AS alias_name,
+                    similarity(a.name, c.candidate) AS similarity
+                FROM {Alias._meta.db_table} a
+                WHERE a.name %% c.candidate
+                    AND similarity(a.name, c.candidate) > %(threshold)s
+                    AND char_length(a.name) >= %(min_alias_length)s
+                    AND a.entity_content_type_id IS NOT NULL
+                ORDER BY similarity DESC
+                LIMIT %(per_candidate)s
+            ) m
+            ORDER BY m.entity_content_type_id, m.entity_object_id, m.similarity DESC
+        )
+        SELECT entity_content_type_id, entity_object_id, alias_name, similarity
+        FROM matches
+        ORDER BY similarity DESC
+        LIMIT %(max_results)s
+    """
+
+
+def _resolve_entities(
+    rows: list[tuple[str, int, str, float]],
+) -> dict[tuple[str, int], Association | Character | Item | Artifact | Place | Race]:
+    """Fetch matched entities with one query per entity type."""
+    ids_by_type: dict[str, list[int]] = defaultdict(list)
+    for entity_type, entity_id, _, _ in rows:
+        ids_by_type[entity_type].append(entity_id)
+
+    entities = {}
+    for entity_type, ids in ids_by_type.items():
+        model = ENTITY_MODELS_BY_TYPE[entity_type]
+        queryset = get_processor(model.__name__.lower()).optimize_queryset(
+            model.objects.filter(pk__in=ids)
+        )
+        for entity in queryset:
+            entities[(entity_type, entity.pk)] = entity
+    return entities
+
+
+def _fuzzy_params(
+    candidates: list[str],
+    similarity_threshold: float,
+    max_results: int,
+    max_aliases_per_ngram: int,
+    min_alias_length: int,
+) -> dict:
+    return {
+        "candidates": list(candidates),
+        "threshold": similarity_threshold,
+        "min_alias_length": min_alias_length,
+        "per_candidate": max_aliases_per_ngram,
+        "max_results": max_results,
+    }
+
+
+def _with_entity_types(
+    raw_rows: list[tuple[int, int, str, float]],
+) -> list[tuple[str, int, str, float]]:
+    """Swap each row's content type id for the entity type name."""
+    return [
+        (
+            ContentType.objects.get_for_id(content_type_id).model_class().__name__,
+            entity_id,
+            alias_name,
+            similarity,
+        )
+        for content_type_id, entity_id, alias_name, similarity in raw_rows
+    ]
+
+
+def _fuzzy_matches(
+    candidates: list[str],
+    similarity_threshold: float,
+    max_results: int,
+    max_aliases_per_ngram: int,
+    min_alias_length: int,
+) -> list[tuple[str, int, str, float]]:
+    """Trigram-match every candidate in one statement."""
+    params = _fuzzy_params(
+        candidates,
+        similarity_threshold,
+        max_results,
+        max_aliases_per_ngram,
+        min_alias_length,
+    )
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if similarity_threshold < PG_TRGM_DEFAULT_THRESHOLD:
+            # Loosen the % operator so it doesn't cut off matches we want
+            cursor.execute(
+                "SELECT set_config('pg_trgm.similarity_threshold', %s, true)",
+                [str(similarity_threshold)],
+            )
+        cursor.execute(_trigram_search_sql(), params)
+        raw_rows = cursor.fetchall()
+
+    return _with_entity_types(raw_rows)
+
+
+async def _afuzzy_matches(
+    candidates: list[str],
+    similarity_threshold: float,
+    max_results: int,
+    max_aliases_per_ngram: int,
+    min_alias_length: int,
+) -> list[tuple[int, int, str, float]]:
+    """_fuzzy_matches on the async pool. Rows keep their content type ids."""
+    params = _fuzzy_params(
+        candidates,
+        similarity_threshold,
+        max_results,
+        max_aliases_per_ngram,
+        min_alias_length,
+    )
+
+    async with async_connection() as conn, conn.transaction():
+        async with conn.cursor() as cursor:
+            if similarity_threshold < PG_TRGM_DEFAULT_THRESHOLD:
+                await cursor.execute(
+                    "SELECT set_config('pg_trgm.similarity_threshold', %s, true)",
+                    [str(similarity_threshold)],
+                )
+            await cursor.execute(_trigram_search_sql(), params)
+            return await cursor.fetchall()
+
+
+def _exact_matches(
+    query_text: str, min_alias_length: int
+) -> tuple[list[tuple[str, int, str, float]], list[str]]:
+    """
+    Rows for names that appear verbatim in the query, plus the normalized
+    names that matched (used to drop n-grams already accounted for).
+    """
+    rows = []
+    seen = set()
+    matched_names = []
+    for match in find_exact_entity_mentions(query_text, min_length=min_alias_length):
+        matched_names.append(normalize_for_matching(match.matched_name))
+        entity_type = (
+            ContentType.objects.get_for_id(match.content_type_id).model_class().__name__
+        )
+        if (entity_type, match.object_id) in seen:
+            continue
+        seen.add((entity_type, match.object_id))
+        rows.append((entity_type, match.object_id, match.matched_name, 1.0))
+    return rows, matched_names
+
+
+def _leftover_candidates(candidates: list[str], matched_names: list[str]) -> list[str]:
+    """Candidates that neither contain nor sit inside an exactly matched name."""
+    leftover = []
+    for candidate in candidates:
+        normalized = normalize_for_matching(candidate)
+        if not any(name in normalized or normalized in name for name in matched_names):
+            leftover.append(candidate)
+    return leftover
+
+
+def _merge_rows(exact_rows: list, fuzzy_rows: list) -> list:
+    """Exact rows first, then fuzzy rows for entities not already matched."""
+    exact = {(entity_type, entity_id) for entity_type, entity_id, _, _ in exact_rows}
+    return exact_rows + [row for row in fuzzy_rows if (row[0], row[1]) not in exact]
+
+
+def _search_results(rows: list[tuple[str, int, str, float]]) -> list[SearchResult]:
+    entities = _resolve_entities(rows)
+
+    results: list[SearchResult] = []
+    for entity_type, entity_id, alias_name, similarity in rows:
+        entity = entities.get((entity_type, entity_id))
+        if entity is None:
+            continue
+        results.append(
+            SearchResult(
+                entity_id=entity_id,
+                entity_type=entity_type,
+                entity=entity,
+                entity_name=entity.name,
+                matched_name=alias_name,
+                similarity=similarity,
+            )
+        )
+
+    return results
+
+
 def trigram_entity_search(
     query_text: str,
     similarity_threshold: float = 0.3,
@@ -32,7 +258,98 @@ def trigram_entity_search(
     min_alias_length: int = 4,
 ) -> list[SearchResult]:
     """
-    Find entities mentioned in a query using NER + trigram similarity.
+    Find entities mentioned in a query. Names that appear verbatim are found
+    by the in-process alias matcher; the remaining n-gram candidates go
+    through trigram similarity, all matched in a single SQL statement.
+
+    Args:
+        query_text: The user's query (can be long)
+        similarity_threshold: Minimum similarity score (0.0-1.0)
+        max_results: Maximum number of entities to return
+        max_ngram: Longest candidate phrase, in words
+        max_aliases_per_ngram: Top-k aliases considered per candidate
+        min_alias_length: Ignore aliases shorter than this
+
+    Returns:
+        List of SearchResult, best match first, one per entity
+    """
+    if not query_text.strip():
+        return []
+
+    candidates = entity_extractor.extract_candidates(query_text, max_ngram=max_ngram)
+    if not candidates:
+        return []
+
+    rows, matched_names = _exact_matches(query_text, min_alias_length)
+    candidates = _leftover_candidates(candidates, matched_names)
+    if candidates and len(rows) < max_results:
+        fuzzy_rows = _fuzzy_matches(
+            candidates,
+            similarity_threshold,
+            max_results,
+            max_aliases_per_ngram,
+            min_alias_length,
+        )
+        rows = _merge_rows(rows, fuzzy_rows)
+    rows = rows[:max_results]
+
+    return _search_results(rows)
+
+
+async def atrigram_entity_search(
+    query_text: str,
+    similarity_threshold: float = 0.3,
+    max_results: int = 20,
+    max_ngram: int = 5,
+    max_aliases_per_ngram: int = 2,
+    min_alias_length: int = 4,
+) -> list[SearchResult]:
+    """
+    Async trigram_entity_search. The trigram SQL runs on the async pool; the
+    exact pass and entity loading (both ORM-backed) run via sync_to_async.
+    """
+    if not query_text.strip():
+        return []
+
+    candidates = entity_extractor.extract_candidates(query_text, max_ngram=max_ngram)
+    if not candidates:
+        return []
+
+    rows, matched_names = await sync_to_async(_exact_matches)(
+        query_text, min_alias_length
+    )
+    candidates = _leftover_candidates(candidates, matched_names)
+    raw_fuzzy_rows = []
+    if candidates and len(rows) < max_results:
+        raw_fuzzy_rows = await _afuzzy_matches(
+            candidates,
+            similarity_threshold,
+            max_results,
+            max_aliases_per_ngram,
+            min_alias_length,
+        )
+
+    def _finish():
+        merged = _merge_rows(rows, _with_entity_types(raw_fuzzy_rows))
+        return _search_results(merged[:max_results])
+
+    return await sync_to_async(_finish)()
+
+
+def trigram_entity_search_per_candidate(
+    query_text: str,
+    similarity_threshold: float = 0.3,
+    max_results: int = 20,
+    max_ngram: int = 5,
+    max_aliases_per_ngram: int = 2,
+    min_alias_length: int = 4,
+) -> list[SearchResult]:
+    """
+    Find entities mentioned in a query using NER + trigram similarity, issuing
+    one query per candidate n-gram.
+
+    Superseded by trigram_entity_search; kept as the baseline for the
+    benchmark_trigram_search command.
 
     Args:
         query_text: The user's query (can be long)
@@ -116,8 +433,9 @@ def search_entities_simple(
 
     results: list[SearchResult] = []
 
-    for alias in aliases:
-        entity = alias.entity
+    for alias, entity in zip(aliases, resolve_alias_entities(list(aliases))):
+        if entity is None:
+            continue
         results.append(
             SearchResult(
                 entity_id=entity.pk,
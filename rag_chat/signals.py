@@ -0,0 +1,184 @@
+"""
+Signals keeping rag_chat's derived data (alias matcher, log summaries digest,
+entity key terms, response cache corpus version, content chunks) in step with
+the models it is derived from.
+"""
+
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from nucleus.models import Alias, Entity, GameLog
+
+from .content_processors import CONTENT_PROCESSORS
+from .key_terms import key_terms_are_current
+from .services.alias_matcher import bump_alias_matcher_version
+from .services.log_summaries import (
+    LOG_SUMMARY_FIELDS,
+    invalidate_log_summaries_digest,
+)
+from .services.reindex_queue import request_reindex
+from .services.response_cache import bump_corpus_version
+
+logger = logging.getLogger(__name__)
+
+
+# Fields that neither indexed text nor answers depend on; saves that only
+# change these (lock()/release_lock(), key terms) invalidate nothing
+UNINDEXED_FIELDS = frozenset(
+    {"lock_user", "lock_time", "updated", "key_terms", "key_terms_digest"}
+)
+
+
+def _alias_names_changed(**kwargs):
+    transaction.on_commit(bump_alias_matcher_version)
+    transaction.on_commit(bump_corpus_version)
+
+
+@receiver(post_save, sender=Alias, dispatch_uid="alias_matcher_alias_saved")
+@receiver(post_delete, sender=Alias, dispatch_uid="alias_matcher_alias_deleted")
+def alias_changed(sender, instance, **kwargs):
+    _alias_names_changed()
+    # Alias names are part of their entity's indexed text
+    if instance.entity_content_type_id and instance.entity_object_id:
+        model = ContentType.objects.get_for_id(
+            instance.entity_content_type_id
+        ).model_class()
+        if model is not None:
+            _reindex_on_commit(model, instance.entity_object_id)
+
+
+def _reindex_on_commit(model, object_id):
+    """Queue a debounced reindex of an indexed object once the edit commits."""
+    content_type = model.__name__.lower()
+    if not settings.RAG_AUTO_REINDEX or content_type not in CONTENT_PROCESSORS:
+        return
+    transaction.on_commit(lambda: request_reindex(content_type, object_id))
+
+
+def _name_changed(instance, created, update_fields) -> bool:
+    """Whether this save gave the entity a new name (see Entity.changed_fields)."""
+    if created:
+        return True
+    # Saves limited to other fields (update_fields) can't have renamed it
+    if update_fields is not None and "name" not in update_fields:
+        return False
+    changed = instance.changed_fields()
+    return changed is None or "name" in changed
+
+
+def _indexed_fields_changed(instance, created, update_fields) -> bool:
+    """Whether this save changed anything outside UNINDEXED_FIELDS."""
+    if created:
+        return True
+    changed = instance.changed_fields()
+    if changed is None:
+        if update_fields is None:
+            return True
+        changed = set(update_fields)
+    elif update_fields is not None:
+        changed &= set(update_fields)
+    return bool(changed - UNINDEXED_FIELDS)
+
+
+def entity_saved(sender, instance, created, update_fields=None, **kwargs):
+    if not _indexed_fields_changed(instance, created, update_fields):
+        return
+
+    if _name_changed(instance, created, update_fields):
+        _alias_names_changed()
+    else:
+        transaction.on_commit(bump_corpus_version)
+
+    if not key_terms_are_current(instance):
+        label, pk = sender._meta.label_lower, instance.pk
+        transaction.on_commit(lambda: _queue_key_terms(label, pk))
+
+    _reindex_on_commit(sender, instance.pk)
+
+
+def _queue_key_terms(model_label, object_id):
+    from .tasks import compute_entity_key_terms
+
+    try:
+        compute_entity_key_terms.delay(model_label, object_id)
+    except Exception as e:
+        logger.error(
+            f"Failed to queue key terms for {model_label} {object_id}: {str(e)}"
+        )
+
+
+def entity_aliases_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        _alias_names_changed()
+
+
+def indexed_relation_changed(sender, instance, action, model, pk_set, **kwargs):
+    """Reindex both sides of a changed relation that appears in indexed content."""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    _reindex_on_commit(type(instance), instance.pk)
+    for pk in pk_set or ():
+        _reindex_on_commit(model, pk)
+
+
+@receiver(post_save, sender=GameLog, dispatch_uid="log_summaries_gamelog_saved")
+def gamelog_saved(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) - UNINDEXED_FIELDS:
+        return  # e.g. lock()/release_lock()
+
+    if (
+        created
+        or update_fields is None
+        or any(field in update_fields for field in LOG_SUMMARY_FIELDS)
+    ):
+        transaction.on_commit(invalidate_log_summaries_digest)
+    transaction.on_commit(bump_corpus_version)
+    _reindex_on_commit(sender, instance.pk)
+
+
+@receiver(post_delete, sender=GameLog, dispatch_uid="log_summaries_gamelog_deleted")
+def gamelog_deleted(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_log_summaries_digest)
+    transaction.on_commit(bump_corpus_version)
+
+
+def connect_entity_signals():
+    """
+    Connect alias matcher invalidation and reindexing for every concrete
+    Entity subclass.
+    """
+    for model in apps.get_models():
+        if not issubclass(model, Entity):
+            continue
+        label = model._meta.label_lower
+        post_save.connect(
+            entity_saved, sender=model, dispatch_uid=f"alias_matcher_saved_{label}"
+        )
+        post_delete.connect(
+            _alias_names_changed,
+            sender=model,
+            dispatch_uid=f"alias_matcher_deleted_{label}",
+        )
+        m2m_changed.connect(
+            entity_aliases_changed,
+            sender=model.aliases.through,
+            dispatch_uid=f"alias_matcher_aliases_{label}",
+        )
+        for relation in (model.aliases, model.logs):
+            m2m_changed.connect(
+                indexed_relation_changed,
+                sender=relation.through,
+                dispatch_uid=f"reindex_{relation.field.name}_{label}",
+            )
+
+    m2m_changed.connect(
+        indexed_relation_changed,
+        sender=GameLog.places_set_in.through,
+        dispatch_uid="reindex_places_set_in_gamelog",
+    )
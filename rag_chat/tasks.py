@@ -1,16 +1,28 @@
 # rag_chat/tasks.py
 import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from celery import shared_task
+from celery import chain, group, shared_task
 from django.apps import apps
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
 
 from .content_processors import CONTENT_PROCESSORS, get_processor
 
 # from .models import ContentChunk, GameLogChunk
-from .embeddings import get_embedding
-from .models import ContentChunk
+from .embeddings import chunk_content_hash, get_embeddings
+from .key_terms import STORED_KEY_TERMS, description_digest, extract_key_terms
+from .models import ContentChunk, EmbeddingJob
+from .services.reindex_queue import claim_reindex
+from .services.response_cache import bump_corpus_version, evict_stale_responses
+from .utils import count_tokens
+from .vector_search import content_group_for, shorten_embedding
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +37,8 @@ def process_content(
     Args:
         content_type: Type of content (gamelog, character, place, etc.)
         object_id: ID of the object to process
-        force_reprocess: If True, delete existing chunks and reprocess
+        force_reprocess: If True, reprocess an object that already has chunks,
+            re-embedding only the chunks whose text changed
     """
     try:
         # Get the appropriate model and processor
@@ -61,12 +74,6 @@ def process_content(
                 "message": "Already processed",
             }
 
-        # If forcing reprocess, delete existing chunks
-        if force_reprocess:
-            deleted_count = existing_chunks.count()
-            existing_chunks.delete()
-            logger.info(f"Deleted {deleted_count} existing chunks for reprocessing")
-
         # Process the content
         try:
             chunk_data = processor.process_content(obj)
@@ -89,39 +96,74 @@ def process_content(
                 "message": f"Content processing failed: {str(e)}",
             }
 
-        # Create chunks with embeddings
-        created_chunks = []
-        total_chunks = len(chunk_data)
-
-        for i, (chunk_text, metadata) in enumerate(chunk_data):
-            try:
-                # Get embedding
-                embedding = get_embedding(chunk_text)
+        # Only chunks whose content hash changed are embedded; the rest keep
+        # their stored vectors, and chunks no longer produced are deleted
+        hashes = [
+            chunk_content_hash(chunk_text, processor.version)
+            for chunk_text, _ in chunk_data
+        ]
+        reused, stale = match_existing_chunks(
+            list(existing_chunks.only("id", "content_hash", "chunk_index", "metadata")),
+            hashes,
+        )
+        new_indexes = [i for i in range(len(chunk_data)) if i not in reused]
+
+        # Embed the new chunks in as few API requests as possible
+        new_texts = [chunk_data[i][0] for i in new_indexes]
+        embeddings = get_embeddings(new_texts)
+        tokens_embedded = sum(
+            count_tokens(text, model=settings.OPENAI_EMBEDDINGS_MODEL)
+            for text in new_texts
+        )
 
-                # Create the chunk record
-                with transaction.atomic():
-                    chunk_obj = ContentChunk.objects.create(
+        # Apply the diff in a single transaction, so a failure never leaves
+        # the object half-indexed
+        with transaction.atomic():
+            if stale:
+                ContentChunk.objects.filter(pk__in=[c.pk for c in stale]).delete()
+                logger.info(f"Deleted {len(stale)} stale chunks")
+
+            moved = [chunk for i, chunk in reused.items() if chunk.chunk_index != i]
+            if moved:
+                # Park moved chunks on unused negative indexes first, so no
+                # two rows share an index partway through (unique_together)
+                for chunk in moved:
+                    chunk.chunk_index = -chunk.pk
+                ContentChunk.objects.bulk_update(moved, ["chunk_index"])
+
+            updated = []
+            for i, chunk in reused.items():
+                metadata = chunk_data[i][1]
+                if chunk.chunk_index != i or chunk.metadata != metadata:
+                    chunk.chunk_index = i
+                    chunk.metadata = metadata
+                    updated.append(chunk)
+            ContentChunk.objects.bulk_update(updated, ["chunk_index", "metadata"])
+
+            chunk_objs = ContentChunk.objects.bulk_create(
+                [
+                    ContentChunk(
                         content_type=content_type_obj,
+                        content_group=content_group_for(content_type_obj.model),
                         object_id=object_id,
-                        chunk_text=chunk_text,
+                        chunk_text=chunk_data[i][0],
                         chunk_index=i,
+                        content_hash=hashes[i],
                         embedding=embedding,
-                        metadata=metadata,
+                        embedding_short=shorten_embedding(embedding),
+                        metadata=chunk_data[i][1],
                     )
-                    created_chunks.append(chunk_obj.id)
-
-                logger.info(
-                    f"Created chunk {i+1}/{total_chunks} for {content_type} {object_id}"
-                )
-
-            except Exception as e:
-                logger.error(
-                    f"Failed to create chunk {i} for {content_type} {object_id}: {str(e)}"
-                )
-                continue
+                    for i, embedding in zip(new_indexes, embeddings)
+                ]
+            )
+        created_chunks = [chunk_obj.id for chunk_obj in chunk_objs]
+        if created_chunks or stale or updated:
+            bump_corpus_version()
 
         logger.info(
-            f"Successfully processed {content_type} {object_id}: {len(created_chunks)} chunks created"
+            f"Successfully processed {content_type} {object_id}: "
+            f"{len(created_chunks)} chunks embedded, {len(reused)} kept, "
+            f"{len(stale)} deleted"
         )
 
         return {
@@ -129,6 +171,9 @@ def process_content(
             "content_type": content_type,
             "object_id": object_id,
             "chunks_created": len(created_chunks),
+            "chunks_reused": len(reused),
+            "chunks_deleted": len(stale),
+            "tokens_embedded": tokens_embedded,
             "chunk_ids": created_chunks,
             "title": getattr(obj, "name", getattr(obj, "title", str(obj))),
         }
@@ -153,80 +198,98 @@ def process_content(
         }
 
 
+@shared_task
+def reindex_content(content_type: str, object_id: str):
+    """
+    Reprocess an edited object once it has gone RAG_REINDEX_QUIET_SECONDS
+    without further edits (see services.reindex_queue).
+    """
+    wait = claim_reindex(content_type, object_id)
+    if wait > 0:
+        reindex_content.apply_async(args=(content_type, object_id), countdown=wait)
+        return {
+            "status": "deferred",
+            "content_type": content_type,
+            "object_id": object_id,
+            "seconds": wait,
+        }
+
+    task = process_content.delay(content_type, str(object_id), True)
+    return {
+        "status": "queued",
+        "content_type": content_type,
+        "object_id": object_id,
+        "task_id": task.id,
+    }
+
+
 @shared_task
 def process_all_content(
-    content_types: list = None, force_reprocess: bool = False, limit: int = None
+    content_types: list = None,
+    force_reprocess: bool = False,
+    limit: int = None,
+    batch_size: int = None,
+    concurrency: int = None,
 ):
     """
-    Process all content of specified types
+    Process all content of specified types, tracked by an EmbeddingJob
+
+    Objects are split into batches of `batch_size`, which run as
+    `concurrency` parallel chains of process_content_batch tasks.
 
     Args:
         content_types: List of content types to process (None = all except custom)
         force_reprocess: If True, reprocess even already processed content
         limit: Optional limit on number of objects to process per type
+        batch_size: Objects per task (default settings.RAG_EMBED_BATCH_SIZE)
+        concurrency: Batches in flight at once (default settings.RAG_EMBED_CONCURRENCY)
     """
-    if content_types is None:
-        content_types = [
-            "gamelog",
-            "character",
-            "place",
-            "item",
-            "artifact",
-            "race",
-            "association",
-        ]
+    content_types = content_types or DEFAULT_CONTENT_TYPES
+    batch_size = batch_size or settings.RAG_EMBED_BATCH_SIZE
+    concurrency = concurrency or settings.RAG_EMBED_CONCURRENCY
 
     logger.info(f"Starting batch processing of content types: {content_types}")
 
-    total_tasks = 0
-    task_results = []
-
-    for content_type in content_types:
-        try:
-            # Get objects to process
-            objects = get_content_objects(content_type, force_reprocess, limit)
-
-            if not objects:
-                logger.info(f"No {content_type} objects found to process")
-                continue
-
-            logger.info(f"Found {len(objects)} {content_type} objects to process")
-
-            # Queue tasks for each object
-            for obj in objects:
-                try:
-                    object_id = str(obj.id)
-                    task = process_content.delay(
-                        content_type, object_id, force_reprocess
-                    )
-                    task_results.append(
-                        {
-                            "content_type": content_type,
-                            "object_id": object_id,
-                            "task_id": task.id,
-                            "title": getattr(
-                                obj, "name", getattr(obj, "title", str(obj))
-                            ),
-                        }
-                    )
-                    total_tasks += 1
-
-                except Exception as e:
-                    logger.error(
-                        f"Failed to queue task for {content_type} {obj.id}: {str(e)}"
-                    )
+    items = get_content_items(content_types, force_reprocess, limit)
+    job = start_embedding_job(content_types, force_reprocess, len(items))
+    lanes = batch_lanes(items, batch_size, concurrency)
+    if lanes:
+        group(
+            chain(
+                process_content_batch.si(job.pk, batch, force_reprocess)
+                for batch in lane
+            )
+            for lane in lanes
+        ).apply_async()
 
-        except Exception as e:
-            logger.error(f"Failed to process content type {content_type}: {str(e)}")
+    logger.info(
+        f"Embedding job {job.pk}: {len(items)} objects in "
+        f"{sum(len(lane) for lane in lanes)} batches, {len(lanes)} at a time"
+    )
 
     return {
         "status": "queued",
+        "job_id": job.pk,
         "content_types": content_types,
-        "total_tasks": total_tasks,
-        "task_results": task_results,
+        "total_objects": len(items),
+        "batches": sum(len(lane) for lane in lanes),
+        "concurrency": len(lanes),
     }
 
 
+@shared_task
+def process_content_batch(job_id: int, items: list, force_reprocess: bool = False):
+    """
+    Process (content_type, object_id) pairs in order, recording each result
+    on the EmbeddingJob
+    """
+    for content_type, object_id in items:
+        record_job_result(
+            job_id, _process_job_item(content_type, object_id, force_reprocess)
+        )
+    return {"status": "success", "job_id": job_id, "objects": len(items)}
+
+
 @shared_task
 def cleanup_orphaned_chunks():
     """
@@ -295,6 +358,173 @@ def cleanup_orphaned_chunks():
 
 # Helper functions
 
+DEFAULT_CONTENT_TYPES = [
+    "gamelog",
+    "character",
+    "place",
+    "item",
+    "artifact",
+    "race",
+    "association",
+]
+
+
+def get_content_items(
+    content_types: List[str], force_reprocess: bool = False, limit: int = None
+) -> List[Tuple[str, str]]:
+    """(content_type, object_id) pairs to process, in get_content_objects order"""
+    items = []
+    for content_type in content_types:
+        objects = get_content_objects(content_type, force_reprocess, limit)
+        logger.info(f"Found {len(objects)} {content_type} objects to process")
+        items.extend((content_type, str(obj.id)) for obj in objects)
+    return items
+
+
+def batch_lanes(
+    items: List[Any], batch_size: int, concurrency: int
+) -> List[List[List[Any]]]:
+    """
+    Pure. Split items into batches of batch_size, dealt round-robin into at
+    most `concurrency` lanes that each run their batches one after another.
+    """
+    batches = [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
+    return [
+        batches[lane::concurrency] for lane in range(min(concurrency, len(batches)))
+    ]
+
+
+def start_embedding_job(
+    content_types: List[str], force_reprocess: bool, total: int
+) -> EmbeddingJob:
+    job = EmbeddingJob.objects.create(
+        content_types=content_types, force_reprocess=force_reprocess, total=total
+    )
+    if not total:
+        _finish_job_if_done(job.pk)
+        job.refresh_from_db()
+    return job
+
+
+def record_job_result(job_id: int, result: Dict[str, Any]):
+    """Add one process_content result to its EmbeddingJob's counts."""
+    failed = result.get("status") == "error"
+    EmbeddingJob.objects.filter(pk=job_id).update(
+        done=F("done") + (0 if failed else 1),
+        failed=F("failed") + (1 if failed else 0),
+        chunks=F("chunks") + result.get("chunks_created", 0),
+        tokens=F("tokens") + result.get("tokens_embedded", 0),
+    )
+    _finish_job_if_done(job_id)
+
+
+def _finish_job_if_done(job_id: int):
+    # Whichever object finishes last closes the job
+    EmbeddingJob.objects.filter(
+        pk=job_id, finished_at=None, total__lte=F("done") + F("failed")
+    ).update(status="completed", finished_at=timezone.now())
+
+
+def _process_job_item(
+    content_type: str, object_id: str, force_reprocess: bool
+) -> Dict[str, Any]:
+    """
+    process_content, retried with exponential backoff. Called directly, the
+    task's own retry re-raises instead of retrying, and a rate limit that
+    outlasts the OpenAI client's retries would otherwise fail the object.
+    """
+    max_retries = process_content.max_retries
+    for attempt in range(max_retries + 1):
+        try:
+            return process_content(content_type, object_id, force_reprocess)
+        except Exception as e:
+            if attempt < max_retries:
+                delay = settings.RAG_EMBED_RETRY_DELAY * 2**attempt
+                logger.info(
+                    f"Retrying {content_type} {object_id} in {delay}s "
+                    f"(attempt {attempt + 1}): {str(e)}"
+                )
+                time.sleep(delay)
+                continue
+            logger.error(f"Failed to process {content_type} {object_id}: {str(e)}")
+            return {
+                "status": "error",
+                "content_type": content_type,
+                "object_id": object_id,
+                "message": str(e),
+            }
+
+
+def run_embedding_job(
+    job_id: int,
+    items: List[Tuple[str, str]],
+    force_reprocess: bool = False,
+    workers: int = 1,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+):
+    """
+    Process items in this process, with `workers` threads, recording each
+    result on the EmbeddingJob and passing it to on_result (in this thread).
+    """
+
+    def process(item):
+        result = _process_job_item(*item, force_reprocess)
+        record_job_result(job_id, result)
+        return result
+
+    def process_in_worker(item):
+        try:
+            return process(item)
+        finally:
+            # Each worker thread has its own connection; hand it back
+            connection.close()
+
+    if workers <= 1:
+        for item in items:
+            result = process(item)
+            if on_result:
+                on_result(result)
+        return
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="embedding-job"
+    ) as executor:
+        futures = [executor.submit(process_in_worker, item) for item in items]
+        for future in as_completed(futures):
+            if on_result:
+                on_result(future.result())
+
+
+def match_existing_chunks(
+    existing_chunks: List[ContentChunk], hashes: List[str]
+) -> Tuple[Dict[int, ContentChunk], List[ContentChunk]]:
+    """
+    Pure. Pair each new chunk (by index into `hashes`) with a stored chunk of
+    the same content hash, preferring one already at that index. Returns the
+    pairs and the stored chunks left unmatched. Chunks stored before content
+    hashes existed never match.
+    """
+    available: Dict[str, List[ContentChunk]] = defaultdict(list)
+    for chunk in sorted(existing_chunks, key=lambda c: c.chunk_index):
+        if chunk.content_hash:
+            available[chunk.content_hash].append(chunk)
+
+    reused: Dict[int, ContentChunk] = {}
+    for i, content_hash in enumerate(hashes):
+        in_place = next(
+            (c for c in available[content_hash] if c.chunk_index == i), None
+        )
+        if in_place is not None:
+            available[content_hash].remove(in_place)
+            reused[i] = in_place
+    for i, content_hash in enumerate(hashes):
+        if i not in reused and available[content_hash]:
+            reused[i] = available[content_hash].pop(0)
+
+    stale = [chunk for chunks in available.values() for chunk in chunks]
+    stale += [chunk for chunk in existing_chunks if not chunk.content_hash]
+    return reused, stale
+
 
 def get_content_object(content_type: str, object_id: str):
     """Get a content object by type and ID"""
@@ -395,3 +625,36 @@ def get_valid_object_ids(content_type: str):
         return model.objects.values_list("id", flat=True)
     except Exception:
         return []
+
+
+@shared_task
+def compute_entity_key_terms(model_label: str, object_id: int):
+    """
+    Extract and store key terms for an entity's current description.
+
+    Args:
+        model_label: The entity's model label, e.g. "character.character"
+        object_id: ID of the entity
+    """
+    model = apps.get_model(model_label)
+    entity = model.objects.filter(pk=object_id).only("id", "description").first()
+    if entity is None:
+        return {"status": "error", "message": f"{model_label} {object_id} not found"}
+
+    terms = extract_key_terms(entity.description, max_terms=STORED_KEY_TERMS)
+    # update() rather than save(): nothing else changed, and no signals should fire
+    model.objects.filter(pk=object_id).update(
+        key_terms=terms, key_terms_digest=description_digest(entity.description)
+    )
+    return {"status": "success", "model": model_label, "key_terms": terms}
+
+
+@shared_task
+def evict_response_cache():
+    """
+    Delete cached chat responses that have expired or were generated from an
+    older corpus version. Scheduled hourly via CELERY_BEAT_SCHEDULE.
+    """
+    deleted = evict_stale_responses()
+    logger.info(f"Evicted {deleted} cached responses")
+    return {"status": "success", "deleted": deleted}
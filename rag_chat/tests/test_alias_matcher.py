@@ -0,0 +1,162 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from character.models import Character
+
+from ..services import alias_matcher
+from ..services.alias_matcher import (
+    AliasAutomaton,
+    bump_alias_matcher_version,
+    get_alias_matcher,
+    normalize_for_matching,
+    reset_alias_matcher,
+)
+
+BRUNO = (1, 10, "Bruno")
+BODE = (1, 11, "Bode Augur")
+HIELO = (2, 20, "Hielo")
+
+
+def _automaton(**extra):
+    patterns = {"Bruno": [BRUNO], "Bode Augur": [BODE], "Hielo": [HIELO]}
+    patterns.update(extra)
+    return AliasAutomaton(patterns)
+
+
+class FakeSharedCache:
+    """Dict-backed stand-in for the Redis cache."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key, default=None):
+        return self.store.get(key, default)
+
+    def add(self, key, value, timeout=None):
+        if key in self.store:
+            return False
+        self.store[key] = value
+        return True
+
+    def incr(self, key):
+        if key not in self.store:
+            raise ValueError(key)
+        self.store[key] += 1
+        return self.store[key]
+
+
+# ---------------------------------------------------------------------------
+# Automaton
+# ---------------------------------------------------------------------------
+
+
+class AliasAutomatonTests(TestCase):
+    def test_normalization_ignores_case_and_punctuation(self):
+        self.assertEqual(normalize_for_matching("  Bode-Augur's?"), " bode augur s ")
+        self.assertEqual(normalize_for_matching("?!"), "")
+
+    def test_finds_every_name_in_one_pass(self):
+        matches = _automaton().find("Did BRUNO meet bode augur on Hielo?")
+        self.assertEqual(
+            [(m.object_id, m.matched_name) for m in matches],
+            [(10, "Bruno"), (11, "Bode Augur"), (20, "Hielo")],
+        )
+
+    def test_spans_point_into_normalized_text(self):
+        text = "Where is Bode Augur?"
+        (match,) = _automaton().find(text)
+        self.assertEqual(
+            normalize_for_matching(text)[match.start : match.end], "bode augur"
+        )
+
+    def test_only_whole_words_match(self):
+        self.assertEqual(_automaton().find("Brunos and Hieloan"), [])
+
+    def test_overlapping_names_all_match(self):
+        automaton = _automaton(Bode=[(1, 12, "Bode")])
+        matches = automaton.find("bode augur")
+        self.assertEqual({m.object_id for m in matches}, {11, 12})
+
+    def test_min_length_skips_short_names(self):
+        automaton = _automaton(Bo=[(1, 13, "Bo")])
+        self.assertEqual(
+            [m.object_id for m in automaton.find("bo and bruno", min_length=4)], [10]
+        )
+
+
+# ---------------------------------------------------------------------------
+# Version tracking — patterns and shared cache mocked
+# ---------------------------------------------------------------------------
+
+
+@override_settings(ALIAS_MATCHER_VERSION_CHECK_INTERVAL=0)
+class AliasMatcherVersionTests(TestCase):
+    def setUp(self):
+        reset_alias_matcher()
+        self.shared = FakeSharedCache()
+        self.patterns = {"Bruno": [BRUNO]}
+        for target, kwargs in (
+            ("_shared_cache", {"return_value": self.shared}),
+            ("_load_patterns", {"side_effect": lambda: dict(self.patterns)}),
+        ):
+            patcher = patch.object(alias_matcher, target, **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(reset_alias_matcher)
+
+    def test_reuses_automaton_while_version_is_unchanged(self):
+        self.assertIs(get_alias_matcher(), get_alias_matcher())
+        self.assertEqual(alias_matcher._load_patterns.call_count, 1)
+
+    def test_rebuilds_when_another_process_bumps_the_version(self):
+        get_alias_matcher()
+        self.patterns["Hielo"] = [HIELO]
+        self.shared.store[alias_matcher.ALIAS_MATCHER_VERSION_KEY] = 7
+
+        self.assertEqual(len(get_alias_matcher().find("hielo")), 1)
+
+    def test_local_bump_rebuilds_and_increments_shared_counter(self):
+        get_alias_matcher()
+        self.patterns["Hielo"] = [HIELO]
+        bump_alias_matcher_version()
+        bump_alias_matcher_version()
+
+        self.assertEqual(len(get_alias_matcher().find("hielo")), 1)
+        self.assertEqual(self.shared.store[alias_matcher.ALIAS_MATCHER_VERSION_KEY], 2)
+
+    @override_settings(ALIAS_MATCHER_VERSION_CHECK_INTERVAL=60)
+    def test_version_check_is_throttled(self):
+        matcher = get_alias_matcher()
+        self.shared.store[alias_matcher.ALIAS_MATCHER_VERSION_KEY] = 7
+
+        self.assertIs(get_alias_matcher(), matcher)
+
+
+@patch("rag_chat.signals.request_reindex")
+@patch("rag_chat.signals._queue_key_terms")
+@patch("rag_chat.signals.bump_alias_matcher_version")
+class EntityRenameSignalTests(TestCase):
+    def test_only_a_new_name_bumps_the_version(self, bump, *_):
+        Character.objects.create(name="Bruno")
+        character = Character.objects.get(name="Bruno")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            character.description = "A dwarf of few words."
+            character.save()
+        bump.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            character.name = "Bruno the Bold"
+            character.save()
+        bump.assert_called_once()
+
+        # The saved name is the new baseline
+        with self.captureOnCommitCallbacks(execute=True):
+            character.save()
+        bump.assert_called_once()
+
+    def test_created_entity_bumps_the_version(self, bump, *_):
+        with self.captureOnCommitCallbacks(execute=True):
+            Character.objects.create(name="Bruno")
+        bump.assert_called_once()
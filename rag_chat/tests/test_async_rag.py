@@ -0,0 +1,162 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from psycopg.pq import TransactionStatus
+
+from ..services import AsyncRAGService as async_rag_module
+from ..services import async_db
+from ..services.AsyncRAGService import AsyncRAGService
+from ..views import chat_stream_view_async
+
+
+class AsyncRetrievalTests(TestCase):
+    def setUp(self):
+        self.service = AsyncRAGService(model="test-model")
+
+    def test_searches_run_concurrently(self):
+        """Trigram and semantic entity searches overlap rather than queue."""
+        running = 0
+        peak = 0
+
+        async def slow_search(*args, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return []
+
+        with patch.object(
+            async_rag_module, "atrigram_entity_search", side_effect=slow_search
+        ), patch.object(
+            self.service, "asemantic_search", side_effect=slow_search
+        ), patch.object(
+            self.service, "_aweighted_fts_search_logs", side_effect=slow_search
+        ), patch.object(
+            self.service,
+            "build_enriched_text_for_semantic_search",
+            return_value="query",
+        ):
+            logs, entities = asyncio.run(
+                self.service._aget_logs_and_entities_for_query("Who is Izar?")
+            )
+
+        self.assertEqual((logs, entities), ([], []))
+        self.assertEqual(peak, 2)
+
+    def test_enhanced_query_uses_async_client(self):
+        completion = MagicMock()
+        completion.choices[0].message.content = " Izar the wizard "
+
+        with patch.object(
+            async_rag_module, "atrigram_entity_search", AsyncMock(return_value=[])
+        ), patch.object(
+            self.service, "asemantic_search", AsyncMock(return_value=[])
+        ), patch.object(
+            async_rag_module.async_openai_client.chat.completions,
+            "create",
+            AsyncMock(return_value=completion),
+        ) as mock_create:
+            enhanced = asyncio.run(
+                self.service._aget_enhanced_query(
+                    "Who is he?",
+                    conversation_messages="",
+                    session=None,
+                    similarity_threshold=None,
+                )
+            )
+
+        self.assertEqual(enhanced, "Izar the wizard")
+        mock_create.assert_awaited_once()
+
+
+@patch("rag_chat.services.async_db._connection_kwargs", return_value={})
+@patch("rag_chat.services.async_db.AsyncConnectionPool")
+class AsyncPoolTests(SimpleTestCase):
+    def test_each_event_loop_gets_its_own_pool(self, pool_class, _):
+        pool_class.side_effect = lambda **kwargs: MagicMock(
+            open=AsyncMock(), close=AsyncMock()
+        )
+
+        async def use_and_close():
+            pool = await async_db.get_async_pool()
+            self.assertIs(await async_db.get_async_pool(), pool)
+            await async_db.close_async_pool()
+            return pool
+
+        first = asyncio.run(use_and_close())
+        second = asyncio.run(use_and_close())
+
+        self.assertIsNot(first, second)
+        first.close.assert_awaited_once()
+        second.close.assert_awaited_once()
+        self.assertEqual(len(async_db._pools), 0)
+
+
+@override_settings(RAG_ASYNC_DB_POOL_MIN_SIZE=1, RAG_ASYNC_DB_POOL_MAX_SIZE=1)
+class AfetchTests(TransactionTestCase):
+    def run_on_pool(self, coroutine_function):
+        """Run the coroutine, recording each borrowed connection's state on return."""
+        statuses = []
+        borrow = async_db.async_connection
+
+        @asynccontextmanager
+        async def recording_connection():
+            async with borrow() as conn:
+                yield conn
+                statuses.append(conn.info.transaction_status)
+
+        async def run():
+            try:
+                return await coroutine_function()
+            finally:
+                await async_db.close_async_pool()
+
+        with patch.object(async_db, "async_connection", recording_connection):
+            return asyncio.run(run()), statuses
+
+    def test_connection_is_idle_after_afetch(self):
+        rows, statuses = self.run_on_pool(lambda: async_db.afetch("SELECT 1"))
+
+        self.assertEqual(rows, [(1,)])
+        self.assertEqual(statuses, [TransactionStatus.IDLE])
+
+    def test_local_settings_last_only_for_their_query(self):
+        async def fetch_timeouts():
+            setting = "SELECT current_setting('statement_timeout')"
+            before = await async_db.afetch(setting)
+            during = await async_db.afetch(
+                setting, local_settings=[("statement_timeout", "1234")]
+            )
+            after = await async_db.afetch(setting)
+            return before, during, after
+
+        (before, during, after), statuses = self.run_on_pool(fetch_timeouts)
+
+        self.assertEqual(during, [("1234ms",)])
+        self.assertEqual(after, before)
+        self.assertEqual(statuses, [TransactionStatus.IDLE] * 3)
+
+
+class AsyncChatStreamViewTests(TestCase):
+    def test_permission_denied_for_anonymous_user(self):
+        request = RequestFactory().post(
+            "/api/chat/stream/async/",
+            data=json.dumps({"session_id": 1, "message": "Hi"}),
+            content_type="application/json",
+        )
+        request.user = AnonymousUser()
+
+        response = asyncio.run(chat_stream_view_async(request))
+
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,64 @@
+import json
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from ..benchmarking import (
+    RecordedOpenAI,
+    percentile,
+    synthetic_completion,
+    synthetic_embedding,
+)
+
+
+class SyntheticResponseTests(SimpleTestCase):
+    def test_embeddings_are_deterministic_unit_vectors(self):
+        embedding = synthetic_embedding("Izar found the Codex")
+        self.assertEqual(embedding, synthetic_embedding("izar found  the codex"))
+        self.assertAlmostEqual(sum(v * v for v in embedding), 1.0)
+
+    def test_shared_words_are_more_similar(self):
+        def similarity(a, b):
+            return sum(x * y for x, y in zip(a, b))
+
+        query = synthetic_embedding("Izar on Hielo")
+        self.assertGreater(
+            similarity(query, synthetic_embedding("Izar walked across Hielo")),
+            similarity(query, synthetic_embedding("The market bells rang")),
+        )
+
+    def test_completion_echoes_the_question(self):
+        messages = [
+            {"role": "system", "content": "Rewrite the query."},
+            {"role": "user", "content": "History...\n\nQuestion: Who is Izar?"},
+        ]
+        self.assertEqual(synthetic_completion(messages), "Who is Izar?")
+
+    def test_percentile_is_nearest_rank(self):
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2)
+        self.assertEqual(percentile(list(range(1, 101)), 95), 95)
+
+
+class RecordedOpenAITests(SimpleTestCase):
+    def test_records_misses_and_replays_them(self):
+        live = SimpleNamespace(
+            embeddings=SimpleNamespace(
+                create=lambda model, input: SimpleNamespace(
+                    data=[SimpleNamespace(index=0, embedding=[0.5, -0.25])]
+                )
+            )
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "recordings.json"
+            recorder = RecordedOpenAI(path, live=live)
+            recorder.embeddings.create(model="m", input=["hello"])
+            recorder.save()
+
+            replay = RecordedOpenAI(path)
+            response = replay.embeddings.create(model="m", input=["hello"])
+
+            self.assertEqual(response.data[0].embedding, [0.5, -0.25])
+            self.assertEqual(dict(replay.stats), {"replayed": 1})
+            self.assertEqual(len(json.loads(path.read_text())), 1)
@@ -0,0 +1,60 @@
+from django.test import SimpleTestCase
+
+from ..embeddings import chunk_document, clean_text, iter_chunks
+from ..services.log_excerpts import join_overlapping_chunks
+
+
+def session_text(sentences=600):
+    return " ".join(
+        f"In scene {n} the party questioned the harbourmaster about the ship."
+        for n in range(sentences)
+    )
+
+
+class IterChunksTests(SimpleTestCase):
+    def test_offsets_point_back_into_the_source(self):
+        text = session_text() + " Dorinda paid 12 gold — and Bruno sighed. Fin."
+        chunks = list(iter_chunks(text, chunk_tokens=200, overlap_tokens=30))
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertEqual(text[chunk.start : chunk.end], chunk.text)
+            self.assertLessEqual(chunk.token_count, 200)
+        self.assertEqual(chunks[0].start, 0)
+        self.assertEqual(chunks[-1].end, len(text))
+
+    def test_chunks_end_on_sentences(self):
+        chunks = list(iter_chunks(session_text(), chunk_tokens=200, overlap_tokens=30))
+
+        for chunk in chunks:
+            self.assertTrue(chunk.text.endswith("ship."), chunk.text[-40:])
+
+    def test_consecutive_chunks_overlap_by_whole_words(self):
+        text = session_text()
+        chunks = list(iter_chunks(text, chunk_tokens=200, overlap_tokens=30))
+
+        for before, after in zip(chunks, chunks[1:]):
+            self.assertLess(after.start, before.end)
+            self.assertTrue(text[after.start - 1].isspace())
+        self.assertEqual(join_overlapping_chunks([c.text for c in chunks]), text)
+
+    def test_text_without_sentences_is_cut_between_words(self):
+        text = " ".join(f"word{n}" for n in range(3000))
+        chunks = list(iter_chunks(text, chunk_tokens=100, overlap_tokens=10))
+
+        for chunk in chunks:
+            self.assertTrue(chunk.text.startswith("word"))
+            self.assertRegex(chunk.text, r"word\d+$")
+        self.assertEqual(join_overlapping_chunks([c.text for c in chunks]), text)
+
+    def test_short_and_empty_text(self):
+        self.assertEqual(chunk_document("  Izar  on\nHielo. "), ["Izar on Hielo."])
+        self.assertEqual(chunk_document("   "), [])
+        self.assertEqual(list(iter_chunks("")), [])
+
+    def test_chunk_document_cleans_text(self):
+        text = "Line one.\n\n" + session_text(300)
+        chunks = chunk_document(text, chunk_tokens=200, overlap_tokens=30)
+
+        self.assertTrue(chunks[0].startswith("Line one. In scene 0"))
+        self.assertEqual(join_overlapping_chunks(chunks), clean_text(text))
@@ -0,0 +1,112 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from character.models import Character
+
+from ..models import ContentChunk
+from ..tasks import (
+    _process_job_item,
+    batch_lanes,
+    get_content_items,
+    run_embedding_job,
+    start_embedding_job,
+)
+
+EMBEDDING = [1.0] + [0.0] * 1535
+
+
+class BatchLanesTests(SimpleTestCase):
+    def test_batches_are_dealt_across_lanes(self):
+        self.assertEqual(
+            batch_lanes(list(range(10)), batch_size=3, concurrency=2),
+            [[[0, 1, 2], [6, 7, 8]], [[3, 4, 5], [9]]],
+        )
+
+    def test_no_more_lanes_than_batches(self):
+        self.assertEqual(batch_lanes([1, 2], batch_size=5, concurrency=4), [[[1, 2]]])
+        self.assertEqual(batch_lanes([], batch_size=5, concurrency=4), [])
+
+
+@patch(
+    "rag_chat.tasks.get_embeddings",
+    side_effect=lambda texts: [EMBEDDING for _ in texts],
+)
+class EmbeddingJobTests(TestCase):
+    def setUp(self):
+        for name in ("Izar", "Bruno", "Dorinda"):
+            Character.objects.create(name=name, description=f"{name} of the Branch.")
+
+    def test_job_records_progress(self, _):
+        items = get_content_items(["character"])
+        items.append(("character", "999999"))
+        job = start_embedding_job(["character"], False, len(items))
+        results = []
+
+        run_embedding_job(job.pk, items, on_result=results.append)
+
+        job.refresh_from_db()
+        self.assertEqual(len(results), 4)
+        self.assertEqual((job.done, job.failed, job.chunks), (3, 1, 3))
+        self.assertGreater(job.tokens, 0)
+        self.assertEqual(job.status, "completed")
+        self.assertIsNotNone(job.finished_at)
+
+    def test_empty_job_completes_immediately(self, _):
+        job = start_embedding_job(["character"], False, 0)
+        self.assertEqual(job.status, "completed")
+
+
+@patch("rag_chat.tasks.time.sleep")
+@patch("rag_chat.tasks.process_content")
+class ProcessJobItemTests(SimpleTestCase):
+    @override_settings(RAG_EMBED_RETRY_DELAY=10)
+    def test_transient_errors_are_retried_with_backoff(self, process, sleep):
+        process.max_retries = 3
+        process.side_effect = [
+            Exception("429 Too Many Requests"),
+            Exception("429 Too Many Requests"),
+            {"status": "success", "chunks_created": 1},
+        ]
+
+        result = _process_job_item("character", "1", False)
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual([c.args for c in sleep.call_args_list], [(10,), (20,)])
+
+    def test_gives_up_after_max_retries(self, process, sleep):
+        process.max_retries = 3
+        process.side_effect = Exception("429 Too Many Requests")
+
+        result = _process_job_item("character", "1", False)
+
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(process.call_count, 4)
+        self.assertEqual(sleep.call_count, 3)
+
+
+@override_settings(RAG_AUTO_REINDEX=False)
+@patch("rag_chat.signals._queue_key_terms")
+@patch(
+    "rag_chat.tasks.get_embeddings",
+    side_effect=lambda texts: [EMBEDDING for _ in texts],
+)
+class ParallelEmbeddingJobTests(TransactionTestCase):
+    """Worker threads use their own connections, so the data must be committed."""
+
+    def test_parallel_workers_process_every_item(self, *_):
+        for n in range(6):
+            Character.objects.create(
+                name=f"Character {n}", description="Of the Branch."
+            )
+        items = get_content_items(["character"])
+        job = start_embedding_job(["character"], False, len(items))
+        results = []
+
+        run_embedding_job(job.pk, items, workers=3, on_result=results.append)
+
+        job.refresh_from_db()
+        self.assertEqual(len(results), 6)
+        self.assertEqual((job.done, job.failed, job.chunks), (6, 0, 6))
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(ContentChunk.objects.count(), 6)
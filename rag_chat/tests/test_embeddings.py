@@ -0,0 +1,197 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from .. import embeddings
+from ..embeddings import (
+    clear_embedding_cache,
+    embedding_cache_key,
+    get_embedding,
+    get_embedding_cache_stats,
+)
+
+
+def _embedding_response(*vectors):
+    response = MagicMock()
+    response.data = [
+        MagicMock(index=i, embedding=list(v)) for i, v in enumerate(vectors)
+    ]
+    return response
+
+
+class FakeSharedCache:
+    """Dict-backed stand-in for the Redis cache."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, timeout=None):
+        self.store[key] = value
+
+
+# ---------------------------------------------------------------------------
+# Cache keys
+# ---------------------------------------------------------------------------
+
+
+class EmbeddingCacheKeyTests(TestCase):
+    def test_whitespace_and_case_are_normalized(self):
+        self.assertEqual(
+            embedding_cache_key("Who is  Bruno?\n", model="m"),
+            embedding_cache_key("who is bruno?", model="m"),
+        )
+
+    def test_model_is_part_of_the_key(self):
+        self.assertNotEqual(
+            embedding_cache_key("who is bruno?", model="a"),
+            embedding_cache_key("who is bruno?", model="b"),
+        )
+
+
+# ---------------------------------------------------------------------------
+# get_embedding — OpenAI client and shared cache mocked
+# ---------------------------------------------------------------------------
+
+
+class GetEmbeddingCacheTests(TestCase):
+    def setUp(self):
+        clear_embedding_cache()
+        self.shared = FakeSharedCache()
+        patcher = patch.object(embeddings, "_shared_cache", return_value=self.shared)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(clear_embedding_cache)
+
+    @patch.object(embeddings, "openai_client")
+    def test_repeated_query_hits_memory(self, mock_client):
+        mock_client.embeddings.create.return_value = _embedding_response([0.5, 0.25])
+
+        first = get_embedding("Where is Hielo?")
+        second = get_embedding("where is  hielo?")
+
+        self.assertEqual(first, [0.5, 0.25])
+        self.assertEqual(second, first)
+        mock_client.embeddings.create.assert_called_once()
+        stats = get_embedding_cache_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["memory_hits"], 1)
+
+    @patch.object(embeddings, "openai_client")
+    def test_shared_tier_survives_process_restart(self, mock_client):
+        mock_client.embeddings.create.return_value = _embedding_response([1.0, -1.0])
+        get_embedding("Who is Bode Augur?")
+
+        # Simulate a fresh worker: in-process tier is empty, Redis is not.
+        embeddings._memory_cache.clear()
+        result = get_embedding("Who is Bode Augur?")
+
+        self.assertEqual(result, [1.0, -1.0])
+        mock_client.embeddings.create.assert_called_once()
+        self.assertEqual(get_embedding_cache_stats()["shared_hits"], 1)
+
+    @patch.object(embeddings, "openai_client")
+    def test_shared_cache_errors_fall_back_to_api(self, mock_client):
+        mock_client.embeddings.create.return_value = _embedding_response([0.0, 1.0])
+        self.shared.get = MagicMock(side_effect=ConnectionError("redis down"))
+
+        self.assertEqual(get_embedding("The Vardum"), [0.0, 1.0])
+        self.assertEqual(get_embedding_cache_stats()["shared_errors"], 1)
+
+
+# ---------------------------------------------------------------------------
+# Batched embeddings
+# ---------------------------------------------------------------------------
+
+
+def _word_count(text, model=None):
+    return len(text.split())
+
+
+@patch.object(embeddings, "count_tokens", side_effect=_word_count)
+class BatchForEmbeddingTests(TestCase):
+    def test_respects_max_inputs(self, _):
+        batches = embeddings._batch_for_embedding(
+            ["a", "b", "c", "d", "e"], max_inputs=2, max_tokens=100
+        )
+        self.assertEqual(batches, [[0, 1], [2, 3], [4]])
+
+    def test_respects_max_tokens(self, _):
+        batches = embeddings._batch_for_embedding(
+            ["one two", "three four five", "six"], max_inputs=10, max_tokens=5
+        )
+        self.assertEqual(batches, [[0, 1], [2]])
+
+    def test_oversized_text_gets_its_own_batch(self, _):
+        batches = embeddings._batch_for_embedding(
+            ["a", "b c d e f g", "h"], max_inputs=10, max_tokens=3
+        )
+        self.assertEqual(batches, [[0], [1], [2]])
+
+
+@patch.object(embeddings, "count_tokens", side_effect=_word_count)
+class GetEmbeddingsTests(TestCase):
+    def setUp(self):
+        clear_embedding_cache()
+        patcher = patch.object(embeddings, "_shared_cache", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(clear_embedding_cache)
+
+    @patch.object(embeddings, "openai_client")
+    def test_packs_misses_into_batched_requests(self, mock_client, _):
+        def create(model, input):
+            response = MagicMock()
+            response.data = [
+                MagicMock(index=i, embedding=[float(len(text))])
+                for i, text in enumerate(input)
+            ]
+            return response
+
+        mock_client.embeddings.create.side_effect = create
+
+        result = embeddings.get_embeddings(
+            ["a", "bb", "ccc", "dddd", "eeeee"], max_inputs_per_request=2
+        )
+
+        self.assertEqual(result, [[1.0], [2.0], [3.0], [4.0], [5.0]])
+        self.assertEqual(mock_client.embeddings.create.call_count, 3)
+
+    @patch.object(embeddings, "openai_client")
+    def test_cached_and_duplicate_texts_are_not_resent(self, mock_client, _):
+        mock_client.embeddings.create.return_value = MagicMock(
+            data=[MagicMock(index=0, embedding=[1.0])]
+        )
+        get_embedding("Izar")
+        mock_client.embeddings.create.return_value = MagicMock(
+            data=[MagicMock(index=0, embedding=[2.0])]
+        )
+
+        result = embeddings.get_embeddings(["Izar", "Darnit", "darnit "], cache=True)
+
+        self.assertEqual(result, [[1.0], [2.0], [2.0]])
+        last_call = mock_client.embeddings.create.call_args
+        self.assertEqual(last_call.kwargs["input"], ["Darnit"])
+
+    @patch.object(embeddings, "openai_client")
+    def test_uncached_embeddings_skip_the_cache(self, mock_client, _):
+        def create(model, input):
+            response = MagicMock()
+            response.data = [
+                MagicMock(index=i, embedding=[float(len(text))])
+                for i, text in enumerate(input)
+            ]
+            return response
+
+        mock_client.embeddings.create.side_effect = create
+        get_embedding("Izar")
+
+        result = embeddings.get_embeddings(["Izar", "Darnit", "darnit "])
+
+        self.assertEqual(result, [[4.0], [6.0], [6.0]])
+        last_call = mock_client.embeddings.create.call_args
+        self.assertEqual(last_call.kwargs["input"], ["Izar", "Darnit"])
+        stats = embeddings.get_embedding_cache_stats()
+        self.assertEqual((stats["memory_entries"], stats["misses"]), (1, 1))
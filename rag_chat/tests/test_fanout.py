@@ -0,0 +1,50 @@
+import threading
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from ..services import fanout
+from ..services.fanout import fan_out, get_fanout_stats, shutdown_fanout
+
+
+@override_settings(RAG_FANOUT_MAX_WORKERS=2)
+class FanOutTests(SimpleTestCase):
+    def setUp(self):
+        shutdown_fanout()
+        self.addCleanup(shutdown_fanout)
+
+    def test_results_keep_call_order(self):
+        self.assertEqual(fan_out(lambda: 1, lambda: 2, lambda: 3), [1, 2, 3])
+
+    def test_first_call_runs_in_calling_thread(self):
+        caller = threading.get_ident()
+
+        first, second = fan_out(threading.get_ident, threading.get_ident)
+
+        self.assertEqual(first, caller)
+        self.assertNotEqual(second, caller)
+
+    def test_saturated_pool_runs_calls_inline(self):
+        caller = threading.get_ident()
+        ran_inline = get_fanout_stats()["ran_inline"]
+
+        with patch.object(fanout, "_in_flight", 2):
+            results = fan_out(threading.get_ident, threading.get_ident)
+
+        self.assertEqual(results, [caller, caller])
+        self.assertEqual(get_fanout_stats()["ran_inline"], ran_inline + 1)
+
+    def test_workers_close_old_connections(self):
+        with patch.object(fanout, "close_old_connections") as mock_close:
+            fan_out(lambda: None, lambda: None)
+
+        self.assertEqual(mock_close.call_count, 2)
+        self.assertEqual(get_fanout_stats()["in_flight"], 0)
+
+    def test_exceptions_propagate(self):
+        def fail():
+            raise RuntimeError("search failed")
+
+        with self.assertRaises(RuntimeError):
+            fan_out(lambda: None, fail)
+        self.assertEqual(get_fanout_stats()["in_flight"], 0)
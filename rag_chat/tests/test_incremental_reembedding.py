@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase
+
+from nucleus.models import GameLog
+
+from ..models import ContentChunk
+from ..tasks import match_existing_chunks, process_content
+
+EMBEDDING = [1.0] + [0.0] * 1535
+
+
+def stored(pk, chunk_index, content_hash):
+    return SimpleNamespace(pk=pk, chunk_index=chunk_index, content_hash=content_hash)
+
+
+class MatchExistingChunksTests(SimpleTestCase):
+    def test_unchanged_chunks_are_reused_in_place(self):
+        a, b = stored(1, 0, "a"), stored(2, 1, "b")
+        reused, stale = match_existing_chunks([a, b], ["a", "b"])
+        self.assertEqual(reused, {0: a, 1: b})
+        self.assertEqual(stale, [])
+
+    def test_inserted_chunk_shifts_the_rest(self):
+        a, b = stored(1, 0, "a"), stored(2, 1, "b")
+        reused, stale = match_existing_chunks([a, b], ["new", "a", "b"])
+        self.assertEqual(reused, {1: a, 2: b})
+        self.assertEqual(stale, [])
+
+    def test_vanished_and_unhashed_chunks_are_stale(self):
+        a, b, legacy = stored(1, 0, "a"), stored(2, 1, "b"), stored(3, 2, "")
+        reused, stale = match_existing_chunks([a, b, legacy], ["a"])
+        self.assertEqual(reused, {0: a})
+        self.assertCountEqual(stale, [b, legacy])
+
+    def test_duplicate_texts_match_once_each(self):
+        first, second = stored(1, 0, "x"), stored(2, 1, "x")
+        reused, stale = match_existing_chunks([first, second], ["x", "y", "x"])
+        self.assertEqual(reused, {0: first, 2: second})
+        self.assertEqual(stale, [])
+
+
+def session_text(last_sentence="The session ended at the inn."):
+    sentences = [f"Sentence {n} describes what the party did next." for n in range(400)]
+    return " ".join(sentences + [last_sentence])
+
+
+class IncrementalReprocessTests(TestCase):
+    def setUp(self):
+        # bulk_create: GameLog.save() would fetch the log from Google Drive
+        (self.log,) = GameLog.objects.bulk_create(
+            [
+                GameLog(
+                    url="incremental-log", title="Session 1", full_text=session_text()
+                )
+            ]
+        )
+        self.embedded = []
+
+        def get_embeddings(texts):
+            self.embedded.extend(texts)
+            return [EMBEDDING for _ in texts]
+
+        patcher = patch("rag_chat.tasks.get_embeddings", get_embeddings)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def chunks(self):
+        return list(
+            ContentChunk.objects.filter(object_id=self.log.pk).order_by("chunk_index")
+        )
+
+    def test_reprocessing_unchanged_content_embeds_nothing(self):
+        process_content("gamelog", self.log.pk)
+        before = self.chunks()
+        self.assertGreater(len(before), 1)
+        self.assertEqual(len(self.embedded), len(before))
+
+        self.embedded.clear()
+        result = process_content("gamelog", self.log.pk, force_reprocess=True)
+
+        self.assertEqual(self.embedded, [])
+        self.assertEqual(result["chunks_reused"], len(before))
+        self.assertEqual([c.pk for c in self.chunks()], [c.pk for c in before])
+
+    def test_edit_reembeds_only_changed_chunks(self):
+        process_content("gamelog", self.log.pk)
+        before = self.chunks()
+
+        GameLog.objects.filter(pk=self.log.pk).update(
+            full_text=session_text("The session ended on the ship.")
+        )
+        self.embedded.clear()
+        result = process_content("gamelog", self.log.pk, force_reprocess=True)
+
+        after = self.chunks()
+        self.assertEqual(len(self.embedded), 1)
+        self.assertIn("ended on the ship", self.embedded[0])
+        self.assertEqual(result["chunks_deleted"], 1)
+        self.assertEqual([c.pk for c in after[:-1]], [c.pk for c in before[:-1]])
+        self.assertEqual([c.chunk_index for c in after], list(range(len(after))))
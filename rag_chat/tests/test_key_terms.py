@@ -0,0 +1,40 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from character.models import Character
+
+from ..key_terms import description_digest, entity_key_terms, key_terms_are_current
+from ..services.game_log_full_text_search import fts_terms
+
+
+def _character(**kwargs):
+    character = Character(name="Bruno", **kwargs)
+    aliases = MagicMock()
+    aliases.all.return_value = []
+    return character, patch.object(Character, "aliases", aliases)
+
+
+class StoredKeyTermsTests(TestCase):
+    def test_digest_tracks_the_description(self):
+        character = Character(
+            description="A dwarf smith",
+            key_terms_digest=description_digest("A dwarf smith"),
+        )
+        self.assertTrue(key_terms_are_current(character))
+
+        character.description = "A dwarf smith and cleric"
+        self.assertFalse(key_terms_are_current(character))
+
+    def test_entity_key_terms_reads_stored_terms(self):
+        character = Character(key_terms=["dwarf", "smith", "cleric"])
+        self.assertEqual(entity_key_terms(character, max_terms=2), ["dwarf", "smith"])
+        self.assertEqual(entity_key_terms(Character()), [])
+
+    @patch.dict("sys.modules", {"nltk": None})
+    def test_fts_terms_needs_no_nltk(self):
+        character, aliases = _character(
+            description="A dwarf smith", key_terms=["dwarf", "smith"]
+        )
+        with aliases:
+            self.assertEqual(fts_terms([character]), (["Bruno"], ["dwarf", "smith"]))
@@ -0,0 +1,56 @@
+from django.contrib.contenttypes.models import ContentType
+from django.test import SimpleTestCase, TestCase
+
+from nucleus.models import GameLog
+
+from ..models import ContentChunk
+from ..services.log_excerpts import (
+    EXCERPT_SEPARATOR,
+    build_log_excerpts,
+    chunk_windows,
+    join_overlapping_chunks,
+)
+
+EMBEDDING = [1.0] + [0.0] * 1535
+
+
+class ChunkWindowTests(SimpleTestCase):
+    def test_windows_cover_neighbours(self):
+        self.assertEqual(chunk_windows([5], neighbours=1), [(4, 6)])
+        self.assertEqual(chunk_windows([0], neighbours=2), [(0, 2)])
+
+    def test_overlapping_and_adjacent_windows_merge(self):
+        self.assertEqual(chunk_windows([2, 4, 9], neighbours=1), [(1, 5), (8, 10)])
+        self.assertEqual(chunk_windows([2, 5], neighbours=1), [(1, 6)])
+
+    def test_shared_words_are_written_once(self):
+        self.assertEqual(
+            join_overlapping_chunks(["a b c d", "c d e f", "g h"]),
+            "a b c d e f g h",
+        )
+
+
+class BuildLogExcerptsTests(TestCase):
+    def setUp(self):
+        self.log = GameLog.objects.create(title="Test Session", url="test-session")
+        content_type = ContentType.objects.get_for_model(GameLog)
+        for i, text in enumerate(
+            ["one two", "two three", "three four", "four five", "five six"]
+        ):
+            ContentChunk.objects.create(
+                content_type=content_type,
+                object_id=self.log.pk,
+                chunk_text=text,
+                chunk_index=i,
+                embedding=EMBEDDING,
+            )
+
+    def test_excerpts_join_windows_in_one_query(self):
+        with self.assertNumQueries(1):
+            excerpts = build_log_excerpts({self.log.pk: [0, 4]}, neighbours=0)
+
+        self.assertEqual(excerpts, {self.log.pk: f"one two{EXCERPT_SEPARATOR}five six"})
+
+    def test_neighbouring_chunks_are_included(self):
+        excerpts = build_log_excerpts({self.log.pk: [1]}, neighbours=1)
+        self.assertEqual(excerpts, {self.log.pk: "one two three four"})
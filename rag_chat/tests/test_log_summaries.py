@@ -0,0 +1,101 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from ..services import log_summaries
+from ..services.log_summaries import (
+    get_log_summaries_digest,
+    invalidate_log_summaries_digest,
+)
+
+TITLE = "Narrative Summaries of All Logs"
+
+
+class FakeSharedCache:
+    """Dict-backed stand-in for the Redis cache."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, timeout=None):
+        self.store[key] = value
+
+    def add(self, key, value, timeout=None):
+        return self.store.setdefault(key, value) == value
+
+    def incr(self, key):
+        if key not in self.store:
+            raise ValueError(key)
+        self.store[key] += 1
+        return self.store[key]
+
+
+def _word_count(text, model=None):
+    return len(text.split())
+
+
+@patch.object(log_summaries, "count_tokens", side_effect=_word_count)
+@patch.object(
+    log_summaries,
+    "build_log_summaries_text",
+    return_value="Log 1 — Arrival:\nThe party lands on Hielo.",
+)
+class LogSummariesDigestTests(TestCase):
+    def setUp(self):
+        self.shared = FakeSharedCache()
+        patcher = patch.object(log_summaries, "_shared_cache", return_value=self.shared)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_digest_is_a_formatted_section_with_its_token_count(self, *_):
+        digest = get_log_summaries_digest(TITLE)
+
+        self.assertEqual(
+            digest.text,
+            f"=== {TITLE} ===\nLog 1 — Arrival:\nThe party lands on Hielo.\n\n",
+        )
+        self.assertEqual(digest.token_count, _word_count(digest.text))
+
+    def test_built_once_until_invalidated(self, mock_build, mock_count):
+        get_log_summaries_digest(TITLE)
+        get_log_summaries_digest(TITLE)
+        self.assertEqual(mock_build.call_count, 1)
+        self.assertEqual(mock_count.call_count, 1)
+
+        invalidate_log_summaries_digest()
+        get_log_summaries_digest(TITLE)
+        self.assertEqual(mock_build.call_count, 2)
+
+    def test_digest_built_across_an_invalidation_is_not_served(self, mock_build, _):
+        # A log changes (and commits) while the digest is being built
+        def build_then_change():
+            invalidate_log_summaries_digest()
+            return "Log 1 — Arrival:\nThe party lands on Hielo."
+
+        mock_build.side_effect = build_then_change
+        get_log_summaries_digest(TITLE)
+
+        mock_build.side_effect = None
+        mock_build.return_value = "Log 1 — Arrival:\nThe party sails for Hielo."
+        digest = get_log_summaries_digest(TITLE)
+
+        self.assertIn("sails for Hielo", digest.text)
+
+    def test_token_counts_are_cached_per_model(self, mock_build, mock_count):
+        get_log_summaries_digest(TITLE, model="a")
+        get_log_summaries_digest(TITLE, model="b")
+        get_log_summaries_digest(TITLE, model="a")
+
+        self.assertEqual(mock_build.call_count, 1)
+        self.assertEqual(mock_count.call_count, 2)
+
+    def test_shared_cache_errors_fall_back_to_building(self, mock_build, _):
+        self.shared.get = MagicMock(side_effect=ConnectionError("redis down"))
+
+        digest = get_log_summaries_digest(TITLE)
+
+        self.assertIn("The party lands on Hielo.", digest.text)
+        mock_build.assert_called_once()
@@ -0,0 +1,99 @@
+import io
+import random
+
+from django.test import SimpleTestCase
+from openai import OpenAI, RateLimitError
+
+from ..benchmarking import synthetic_embedding
+from ..openai_standin import (
+    LATENCY_LOGNORMAL,
+    StandInConfig,
+    running_standin,
+    sample_latency,
+    synthetic_transcript,
+)
+
+
+def client_for(server) -> OpenAI:
+    return OpenAI(api_key="standin", base_url=server.base_url, max_retries=0)
+
+
+class StandInServerTests(SimpleTestCase):
+    def test_embeddings_match_synthetic_embeddings(self):
+        with running_standin() as server:
+            response = client_for(server).embeddings.create(
+                model="text-embedding-3-small", input=["Izar on Hielo", "Bruno"]
+            )
+            short = client_for(server).embeddings.create(
+                model="text-embedding-3-small", input="Izar on Hielo", dimensions=256
+            )
+
+        self.assertEqual([d.index for d in response.data], [0, 1])
+        for actual, expected in zip(
+            response.data[0].embedding, synthetic_embedding("Izar on Hielo")
+        ):
+            self.assertAlmostEqual(actual, expected, places=6)
+        self.assertEqual(len(short.data[0].embedding), 256)
+        self.assertGreater(response.usage.total_tokens, 0)
+
+    def test_chat_completion(self):
+        with running_standin() as server:
+            response = client_for(server).chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": "Question: Who is Bruno?"}],
+            )
+
+        self.assertEqual(response.choices[0].message.content, "Who is Bruno?")
+        self.assertEqual(
+            response.usage.total_tokens,
+            response.usage.prompt_tokens + response.usage.completion_tokens,
+        )
+
+    def test_streamed_chat_completion_ends_with_usage(self):
+        config = StandInConfig(completion_words=20)
+        with running_standin(config) as server:
+            chunks = list(
+                client_for(server).chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[{"role": "user", "content": "Who is Bruno?"}],
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+            )
+
+        text = "".join(c.choices[0].delta.content or "" for c in chunks if c.choices)
+        self.assertEqual(len(text.split()), 20)
+        self.assertTrue(text.startswith("Who is Bruno?"))
+        self.assertEqual(chunks[-1].choices, [])
+        self.assertGreater(chunks[-1].usage.completion_tokens, 0)
+
+    def test_verbose_transcription(self):
+        audio = b"\x00" * 40000
+        with running_standin() as server:
+            response = client_for(server).audio.transcriptions.create(
+                model="whisper-1",
+                file=("session.mp3", io.BytesIO(audio)),
+                response_format="verbose_json",
+                prompt="Izar and Bruno on Hielo",
+            )
+
+        text, segments = synthetic_transcript(audio, "Izar and Bruno on Hielo")
+        self.assertEqual(response.text, text)
+        self.assertEqual(len(response.segments), len(segments))
+
+    def test_injected_rate_limit(self):
+        with running_standin(StandInConfig(rate_limit_rate=1.0)) as server:
+            with self.assertRaises(RateLimitError):
+                client_for(server).embeddings.create(
+                    model="text-embedding-3-small", input="Bruno"
+                )
+            self.assertEqual(server.stats["429"], 1)
+
+
+class SampleLatencyTests(SimpleTestCase):
+    def test_lognormal_has_configured_mean(self):
+        config = StandInConfig(latency=LATENCY_LOGNORMAL, latency_ms=200, jitter_ms=100)
+        rng = random.Random(0)
+        samples = [sample_latency(config, rng) for _ in range(20000)]
+        self.assertAlmostEqual(sum(samples) / len(samples), 0.2, places=2)
+        self.assertTrue(all(s > 0 for s in samples))
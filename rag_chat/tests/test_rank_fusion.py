@@ -0,0 +1,67 @@
+import random
+
+from django.test import SimpleTestCase
+
+from character.models import Character
+from item.models import Artifact, Item
+
+from ..services.normalize_and_hybrid_rank_fuse import (
+    ScoreSetElement,
+    fuse_scores,
+    hybrid_rank_fuse,
+    remove_results_more_than_stddev_below_mean,
+    z_score_normalize,
+)
+
+
+def reference_fuse(*sets_with_weights, drop_below_stddev=True):
+    fused = hybrid_rank_fuse(
+        *(
+            (z_score_normalize(elements), weight)
+            for elements, weight in sets_with_weights
+        )
+    )
+    if drop_below_stddev:
+        return remove_results_more_than_stddev_below_mean(fused)
+    return fused
+
+
+class FuseScoresParityTests(SimpleTestCase):
+    """fuse_scores ranks exactly as the pure-Python pipeline it replaces."""
+
+    def _assert_parity(self, *sets_with_weights, **kwargs):
+        expected = reference_fuse(*sets_with_weights, **kwargs)
+        actual = fuse_scores(*sets_with_weights, **kwargs)
+
+        self.assertEqual(
+            [r.data.global_id() for r in actual],
+            [r.data.global_id() for r in expected],
+        )
+        for a, e in zip(actual, expected):
+            self.assertAlmostEqual(a.score, e.score)
+
+    def test_random_overlapping_sets(self):
+        rng = random.Random(7)
+        characters = [Character(id=i + 1) for i in range(500)]
+        for drop in (True, False):
+            semantic = [ScoreSetElement(c, rng.random()) for c in characters[:300]]
+            trigram = [ScoreSetElement(c, rng.random()) for c in characters[200:]]
+            rng.shuffle(trigram)
+            self._assert_parity((semantic, 0.6), (trigram, 0.1), drop_below_stddev=drop)
+
+    def test_single_and_empty_sets(self):
+        self._assert_parity(([ScoreSetElement(Character(id=1), 0.5)], 0.6), ([], 0.3))
+        self._assert_parity(
+            ([ScoreSetElement(Character(id=1), 0.5)], 0.6),
+            ([], 0.3),
+            drop_below_stddev=False,
+        )
+        self.assertEqual(fuse_scores(([], 0.6), ([], 0.3)), [])
+
+    def test_same_pk_different_models_stay_distinct(self):
+        item, artifact = Item(id=1), Artifact(id=1)
+        results = fuse_scores(
+            ([ScoreSetElement(item, 1.0), ScoreSetElement(artifact, 0.0)], 1.0),
+            drop_below_stddev=False,
+        )
+        self.assertEqual([r.data for r in results], [item, artifact])
@@ -0,0 +1,72 @@
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from character.models import Character
+from nucleus.models import Alias
+
+from ..services.reindex_queue import claim_reindex, request_reindex
+
+
+@override_settings(RAG_REINDEX_CACHE_ALIAS="default", RAG_REINDEX_QUIET_SECONDS=30)
+@patch("rag_chat.tasks.reindex_content.apply_async")
+class ReindexQueueTests(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+
+    def test_burst_of_edits_schedules_one_task(self, apply_async):
+        for _ in range(5):
+            request_reindex("character", 1)
+        request_reindex("character", 2)
+
+        self.assertEqual(apply_async.call_count, 2)
+        apply_async.assert_any_call(args=("character", 1), countdown=30)
+
+    def test_claim_waits_for_quiet_period(self, apply_async):
+        with patch("rag_chat.services.reindex_queue.time.time", return_value=1000):
+            request_reindex("character", 1)
+        with patch("rag_chat.services.reindex_queue.time.time", return_value=1020):
+            request_reindex("character", 1)
+
+        with patch("rag_chat.services.reindex_queue.time.time", return_value=1030):
+            self.assertEqual(claim_reindex("character", 1), 20)
+        with patch("rag_chat.services.reindex_queue.time.time", return_value=1050):
+            self.assertEqual(claim_reindex("character", 1), 0)
+
+            # Claimed: the next edit schedules a new task
+            request_reindex("character", 1)
+        self.assertEqual(apply_async.call_count, 2)
+
+    @override_settings(RAG_REINDEX_CACHE_ALIAS="")
+    def test_without_shared_cache_every_edit_schedules(self, apply_async):
+        request_reindex("character", 1)
+        request_reindex("character", 1)
+
+        self.assertEqual(apply_async.call_count, 2)
+        self.assertEqual(claim_reindex("character", 1), 0)
+
+
+@patch("rag_chat.signals._queue_key_terms")
+@patch("rag_chat.signals.request_reindex")
+class ReindexSignalTests(TestCase):
+    def test_entity_save_requests_reindex_on_commit(self, request_reindex, _):
+        with self.captureOnCommitCallbacks(execute=True):
+            character = Character.objects.create(name="Izar")
+            request_reindex.assert_not_called()
+
+        request_reindex.assert_called_once_with("character", character.pk)
+
+    def test_alias_changes_reindex_the_entity(self, request_reindex, _):
+        character = Character.objects.create(name="Izar")
+        with self.captureOnCommitCallbacks(execute=True):
+            character.aliases.add(Alias.objects.create(name="The Scholar"))
+
+        request_reindex.assert_any_call("character", character.pk)
+
+    @override_settings(RAG_AUTO_REINDEX=False)
+    def test_disabled(self, request_reindex, _):
+        with self.captureOnCommitCallbacks(execute=True):
+            Character.objects.create(name="Izar")
+
+        request_reindex.assert_not_called()
@@ -0,0 +1,234 @@
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from character.models import Character
+from nucleus.models import GameLog, User
+
+from ..models import QueryCache
+from ..services import RAGService as rag_service_module
+from ..services import response_cache
+from ..services.RAGService import RAGService
+from ..services.response_cache import (
+    ResponseCacheKey,
+    bump_corpus_version,
+    cache_response,
+    evict_stale_responses,
+    get_cached_response,
+    get_corpus_version,
+    normalize_query,
+)
+from ..source_models import create_sources
+
+EMBEDDING = [1.0] + [0.0] * 1535
+NEAR_EMBEDDING = [0.99, 0.1] + [0.0] * 1534
+FAR_EMBEDDING = [0.0, 1.0] + [0.0] * 1534
+
+KEY = ResponseCacheKey(scope="scope", corpus_version=1)
+
+
+class FakeSharedCache:
+    """Dict-backed stand-in for the Redis cache."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def add(self, key, value, timeout=None):
+        return self.store.setdefault(key, value) == value
+
+    def incr(self, key):
+        if key not in self.store:
+            raise ValueError(f"Key '{key}' not found")
+        self.store[key] += 1
+        return self.store[key]
+
+
+class CorpusVersionTests(TestCase):
+    def setUp(self):
+        self.shared = FakeSharedCache()
+        patcher = patch.object(
+            response_cache, "_shared_cache", return_value=self.shared
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_version_is_seeded_then_bumped(self):
+        version = get_corpus_version()
+        self.assertIsNotNone(version)
+        self.assertEqual(get_corpus_version(), version)
+
+        bump_corpus_version()
+
+        self.assertEqual(get_corpus_version(), version + 1)
+
+    def test_no_shared_cache_means_no_version(self):
+        with patch.object(response_cache, "_shared_cache", return_value=None):
+            self.assertIsNone(get_corpus_version())
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  Who is  IZAR?? "), "who is izar")
+
+
+@patch.object(response_cache, "get_embedding", return_value=EMBEDDING)
+@override_settings(RESPONSE_CACHE_TTL=3600, RESPONSE_CACHE_SIMILARITY_THRESHOLD=0.97)
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        self.izar = Character.objects.create(name="Izar", description="A wizard")
+        self.response_data = {
+            "response": "Izar is a wizard.",
+            "sources": create_sources([self.izar]),
+            "tokens_used": 120,
+            "similarity_threshold": 0.1,
+        }
+
+    def test_exact_hit_counts_hit_and_tokens_saved(self, _):
+        cache_response("Who is Izar?", KEY, "test-model", self.response_data)
+
+        cached = get_cached_response("who is izar", KEY)
+
+        self.assertEqual(cached.response_data["response"], "Izar is a wizard.")
+        self.assertEqual(cached.response_data["sources"].sources, [self.izar])
+        self.assertEqual(cached.response_data["tokens_used"], 0)
+        entry = QueryCache.objects.get()
+        self.assertEqual((entry.hit_count, entry.tokens_saved), (1, 120))
+
+    def test_near_duplicate_hit_above_threshold_only(self, mock_embedding):
+        cache_response("Who is Izar?", KEY, "test-model", self.response_data)
+
+        mock_embedding.return_value = NEAR_EMBEDDING
+        self.assertIsNotNone(get_cached_response("Tell me about Izar", KEY))
+
+        mock_embedding.return_value = FAR_EMBEDDING
+        self.assertIsNone(get_cached_response("Where is Hielo?", KEY))
+
+    def test_passed_embedding_is_not_recomputed(self, mock_embedding):
+        cache_response(
+            "Who is Izar?",
+            KEY,
+            "test-model",
+            self.response_data,
+            query_embedding=EMBEDDING,
+        )
+        cached = get_cached_response(
+            "Tell me about Izar", KEY, query_embedding=NEAR_EMBEDDING
+        )
+
+        self.assertIsNotNone(cached)
+        mock_embedding.assert_not_called()
+
+    def test_other_scopes_and_expired_entries_miss(self, _):
+        entry = cache_response("Who is Izar?", KEY, "test-model", self.response_data)
+
+        other = ResponseCacheKey(scope="other", corpus_version=2)
+        self.assertIsNone(get_cached_response("Who is Izar?", other))
+
+        QueryCache.objects.filter(pk=entry.pk).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertIsNone(get_cached_response("Who is Izar?", KEY))
+
+    def test_eviction_removes_expired_and_stale_versions(self, _):
+        cache_response("Who is Izar?", KEY, "test-model", self.response_data)
+        current = ResponseCacheKey(scope="current", corpus_version=2)
+        cache_response("Who is Izar?", current, "test-model", self.response_data)
+
+        with patch.object(response_cache, "get_corpus_version", return_value=2):
+            self.assertEqual(evict_stale_responses(), 1)
+
+        self.assertEqual(QueryCache.objects.get().corpus_version, 2)
+
+
+class RAGServiceResponseCacheTests(TestCase):
+    def test_hit_skips_retrieval_and_generation(self):
+        service = RAGService(model="test-model")
+        cached = {"response": "Izar is a wizard.", "cached": True}
+
+        with patch.object(
+            service, "response_cache_key", return_value=KEY
+        ), patch.object(
+            rag_service_module, "get_embedding", return_value=EMBEDDING
+        ), patch.object(
+            service, "get_cached_response", return_value=cached
+        ), patch.object(
+            service, "prepare_context"
+        ) as mock_prepare:
+            self.assertEqual(service.generate_response("Who is Izar?"), cached)
+
+        mock_prepare.assert_not_called()
+
+    def test_lookup_and_store_share_one_query_embedding(self):
+        service = RAGService(model="test-model")
+        prepared = MagicMock(similarity_threshold=0.1, used_session_context=False)
+        completion = MagicMock()
+        completion.choices[0].message.content = "Izar is a wizard."
+
+        with patch.object(
+            service, "response_cache_key", return_value=KEY
+        ), patch.object(
+            rag_service_module, "get_embedding", return_value=EMBEDDING
+        ) as mock_embedding, patch.object(
+            service, "get_cached_response", return_value=None
+        ) as mock_lookup, patch.object(
+            service, "prepare_context", return_value=prepared
+        ), patch.object(
+            service, "_response_messages", return_value=[]
+        ), patch.object(
+            rag_service_module.openai_client.chat.completions,
+            "create",
+            return_value=completion,
+        ), patch.object(
+            service, "cache_response"
+        ) as mock_store:
+            service.generate_response("Who is Izar?")
+
+        mock_embedding.assert_called_once_with("Who is Izar?")
+        self.assertIs(mock_lookup.call_args.args[2], EMBEDDING)
+        self.assertIs(mock_store.call_args.args[3], EMBEDDING)
+
+    def test_no_context_answers_are_not_cached(self):
+        service = RAGService(model="test-model")
+
+        with patch.object(response_cache, "cache_response") as mock_cache:
+            service.cache_response(
+                "Who is Nobody?",
+                KEY,
+                {"response": "No idea.", "sources": create_sources([])},
+            )
+
+        mock_cache.assert_not_called()
+
+
+@patch("rag_chat.signals.request_reindex")
+@patch("rag_chat.signals._queue_key_terms")
+@patch("rag_chat.signals.bump_corpus_version")
+class CorpusVersionSignalTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="dm")
+
+    def test_lock_cycle_keeps_cached_answers(self, bump, *_):
+        Character.objects.create(name="Bruno")
+        character = Character.objects.get(name="Bruno")
+        # bulk_create: GameLog.save() would fetch the log from Google Drive
+        (log,) = GameLog.objects.bulk_create([GameLog(url="lock-log", title="S1")])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            character.lock(self.user)
+            character.save()  # unchanged
+            character.release_lock(self.user)
+            log.lock(self.user)
+            log.release_lock(self.user)
+        bump.assert_not_called()
+
+    def test_content_edit_bumps_version(self, bump, *_):
+        Character.objects.create(name="Bruno")
+        character = Character.objects.get(name="Bruno")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            character.description = "A dwarf of few words."
+            character.save()
+        bump.assert_called_once()
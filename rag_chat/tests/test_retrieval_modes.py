@@ -0,0 +1,130 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from ..services.normalize_and_hybrid_rank_fuse import ScoreSetElement
+from ..services.RAGService import PipelineTimer, RAGService
+
+
+class FakeEntity:
+    def __init__(self, name):
+        self.name = name
+
+    def global_id(self):
+        return self.name
+
+
+class FakeLog(FakeEntity):
+    def __init__(self, pk):
+        super().__init__(f"log {pk}")
+        self.pk = pk
+        self.matched_chunk_indexes = []
+
+
+IZAR = FakeEntity("izar")
+HIELO = FakeEntity("hielo")
+DARNIT = FakeEntity("darnit")
+
+SPECULATIVE = ([], [ScoreSetElement(IZAR, 1.0), ScoreSetElement(HIELO, 0.5)])
+REWRITTEN = ([], [ScoreSetElement(DARNIT, 1.0), ScoreSetElement(IZAR, 0.5)])
+
+
+class RetrievalModeTests(TestCase):
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            RAGService(retrieval_mode="eventually")
+
+    @override_settings(RAG_RETRIEVAL_MODE="skip_rewrite")
+    def test_mode_defaults_to_setting(self):
+        self.assertEqual(RAGService().retrieval_mode, "skip_rewrite")
+
+    def test_merge_weights_rewritten_results_above_speculative(self):
+        service = RAGService(retrieval_mode="speculative")
+
+        _, entities = service._merge_retrievals(SPECULATIVE, REWRITTEN)
+
+        self.assertEqual([r.data for r in entities], [DARNIT, IZAR, HIELO])
+
+
+@patch.object(RAGService, "_get_enhanced_query", return_value="Who is Izar?")
+class SpeculativeRetrieveTests(TestCase):
+    def setUp(self):
+        self.service = RAGService(retrieval_mode="speculative")
+        self.timer = PipelineTimer()
+
+    def _speculative_retrieve(self):
+        return self.service._speculative_retrieve(
+            "Who is he?",
+            conversation_messages="",
+            session=None,
+            similarity_threshold=None,
+            timer=self.timer,
+        )
+
+    def test_no_new_entities_searches_only_logs_again(self, _):
+        with patch.object(
+            self.service, "_retrieve", return_value=SPECULATIVE
+        ) as mock_retrieve, patch.object(
+            self.service, "_rewrite_adds_entities", return_value=False
+        ), patch.object(
+            self.service, "_retrieve_entities"
+        ) as mock_entities, patch.object(
+            self.service, "_retrieve_logs", return_value=[]
+        ) as mock_logs:
+            _, entities = self._speculative_retrieve()
+
+        mock_retrieve.assert_called_once()
+        self.assertEqual(mock_retrieve.call_args.kwargs["label"], "spec")
+        mock_entities.assert_not_called()
+        self.assertEqual(mock_logs.call_args.args[:2], ("Who is Izar?", [IZAR, HIELO]))
+        self.assertEqual([r.data for r in entities], [IZAR, HIELO])
+        self.assertEqual(
+            [name for name, _ in self.timer.savings], ["speculative: saved"]
+        )
+
+    def test_rewrite_without_new_entities_still_reranks_logs(self, _):
+        first, second = FakeLog(1), FakeLog(2)
+        speculative = (
+            [ScoreSetElement(first, 1.0), ScoreSetElement(second, 0.5)],
+            SPECULATIVE[1],
+        )
+        with patch.object(
+            self.service, "_retrieve", return_value=speculative
+        ), patch.object(
+            self.service, "_rewrite_adds_entities", return_value=False
+        ), patch.object(
+            self.service,
+            "_retrieve_logs",
+            return_value=[ScoreSetElement(second, 1.0), ScoreSetElement(first, 0.0)],
+        ):
+            logs, _ = self._speculative_retrieve()
+
+        self.assertEqual([r.data for r in logs], [second, first])
+
+    def test_new_entities_trigger_delta_retrieval_on_rewrite(self, _):
+        with patch.object(
+            self.service, "_retrieve", return_value=SPECULATIVE
+        ), patch.object(
+            self.service, "_rewrite_adds_entities", return_value=True
+        ), patch.object(
+            self.service, "_retrieve_entities", return_value=REWRITTEN[1]
+        ) as mock_entities, patch.object(
+            self.service, "_retrieve_logs", return_value=[]
+        ) as mock_logs:
+            _, entities = self._speculative_retrieve()
+
+        self.assertEqual(mock_entities.call_args.args[0], "Who is Izar?")
+        self.assertEqual({r.data for r in entities}, {IZAR, HIELO, DARNIT})
+        # The log search is weighted by the entities of both passes
+        self.assertEqual(mock_logs.call_args.args[1], [DARNIT, IZAR, HIELO])
+        self.assertIn("delta_retrieval", [name for name, _ in self.timer.steps])
+
+    def test_skip_rewrite_never_calls_the_llm(self, mock_enhance):
+        service = RAGService(retrieval_mode="skip_rewrite")
+
+        with patch.object(service, "_retrieve", return_value=([], [])), patch.object(
+            PipelineTimer, "summary"
+        ):
+            self.assertIsNone(service.prepare_context("Who is Izar?"))
+
+        mock_enhance.assert_not_called()
@@ -0,0 +1,69 @@
+from unittest.mock import patch
+
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+
+from character.models import Character
+from nucleus.models import Alias
+
+from ..models import ContentChunk
+from ..services.RAGService import RAGService
+
+EMBEDDING = [1.0] + [0.0] * 1535
+
+
+@patch("rag_chat.services.RAGService.get_embedding", return_value=EMBEDDING)
+class SemanticSearchQueryCountTests(TestCase):
+    """semantic_search resolves source objects in bulk, not per chunk."""
+
+    def setUp(self):
+        self.content_type = ContentType.objects.get_for_model(Character)
+
+    def _make_characters(self, count):
+        for i in range(count):
+            character = Character.objects.create(
+                name=f"Character {i}", description="A traveller"
+            )
+            character.aliases.add(Alias.objects.create(name=f"Alias {i}"))
+            ContentChunk.objects.create(
+                content_type=self.content_type,
+                object_id=character.pk,
+                chunk_text=f"Character Name: Character {i}",
+                embedding=EMBEDDING,
+            )
+
+    def _search_and_format(self, limit):
+        results = RAGService().semantic_search(
+            "who travels?", limit=limit, content_types=["character"]
+        )
+        # Touch what format_for_llm and the GraphQL resolver touch
+        for result in results:
+            obj = result.content_object
+            [a.name for a in obj.aliases.all()]
+            [a.name for a in obj.associations.all()]
+            obj.race
+            str(result.chunk)
+        return results
+
+    def test_query_count_is_constant_in_limit(self, _):
+        self._make_characters(6)
+
+        # savepoint, hnsw.ef_search, chunks, release, characters (+race),
+        # aliases, associations
+        with self.assertNumQueries(7):
+            small = self._search_and_format(limit=2)
+        with self.assertNumQueries(7):
+            large = self._search_and_format(limit=6)
+
+        self.assertEqual(len(small), 2)
+        self.assertEqual(len(large), 6)
+
+    def test_chunks_for_deleted_objects_are_skipped(self, _):
+        self._make_characters(2)
+        Character.objects.first().delete()
+
+        results = RAGService().semantic_search(
+            "who travels?", limit=5, content_types=["character"]
+        )
+
+        self.assertEqual(len(results), 1)
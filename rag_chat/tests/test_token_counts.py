@@ -0,0 +1,67 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from nucleus.models import GameLog
+
+from .. import utils
+from ..utils import stored_token_count, stored_token_counts
+
+
+class FakeEncoding:
+    """Word-splitting stand-in for a tiktoken encoding."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def encode(self, text):
+        return text.split()
+
+
+ENCODINGS = {"cheap-model": FakeEncoding("small"), "best-model": FakeEncoding("large")}
+
+
+@override_settings(
+    OPENAI_CHEAP_CHAT_MODEL="cheap-model", OPENAI_BEST_CHAT_MODEL="best-model"
+)
+@patch.object(utils, "_get_encoding", side_effect=ENCODINGS.__getitem__)
+class StoredTokenCountsTests(TestCase):
+    def test_counts_every_tracked_encoding(self, _):
+        counts = stored_token_counts("The party lands on Hielo.")
+
+        self.assertEqual(counts["small"], 5)
+        self.assertEqual(counts["large"], 5)
+
+    def test_unchanged_text_is_not_recounted(self, _):
+        previous = stored_token_counts("Bruno fights the void spiders.")
+
+        with patch.object(utils, "count_tokens") as mock_count:
+            self.assertEqual(
+                stored_token_counts("Bruno fights the void spiders.", previous),
+                previous,
+            )
+        mock_count.assert_not_called()
+
+    def test_changed_text_is_recounted(self, _):
+        previous = stored_token_counts("Bruno")
+        counts = stored_token_counts("Bruno fights the void spiders.", previous)
+
+        self.assertNotEqual(counts["sha1"], previous["sha1"])
+        self.assertEqual(counts["small"], 5)
+
+    def test_lookup_falls_back_to_live_count(self, _):
+        self.assertEqual(stored_token_count({"small": 99}, "", "cheap-model"), 99)
+        self.assertEqual(stored_token_count({}, "Izar and Darnit", "cheap-model"), 3)
+
+
+@override_settings(OPENAI_CHEAP_CHAT_MODEL="cheap-model", OPENAI_BEST_CHAT_MODEL=None)
+@patch.object(utils, "_get_encoding", side_effect=ENCODINGS.__getitem__)
+class GameLogTokenCountTests(TestCase):
+    def test_refresh_counts_full_text_and_summary(self, _):
+        log = GameLog(full_text="The party lands on Hielo.", summary="Arrival.")
+        log.refresh_token_counts()
+
+        with patch.object(utils, "count_tokens") as mock_count:
+            self.assertEqual(log.token_count("full_text", "cheap-model"), 5)
+            self.assertEqual(log.token_count("summary", "cheap-model"), 1)
+        mock_count.assert_not_called()
@@ -0,0 +1,272 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.management import call_command
+from django.test import TestCase
+
+from character.models import Character
+from nucleus.models import Alias, resolve_alias_entities
+from place.models import Place
+
+from ..services import trigram_entity_search as search_module
+from ..services.alias_matcher import AliasAutomaton
+from ..services.trigram_entity_search import (
+    _fuzzy_matches,
+    _leftover_candidates,
+    _merge_rows,
+    _trigram_search_sql,
+    trigram_entity_search,
+)
+
+
+class TrigramSearchSqlTests(TestCase):
+    def test_all_candidates_go_in_one_statement(self):
+        sql = _trigram_search_sql()
+        self.assertIn("unnest(%(candidates)s::text[])", sql)
+        self.assertIn("CROSS JOIN LATERAL", sql)
+        # The % operator is what lets Postgres use alias_name_trgm_idx
+        self.assertIn("a.name %% c.candidate", sql)
+
+    def test_reads_entity_straight_from_alias(self):
+        sql = _trigram_search_sql()
+        self.assertIn("a.entity_content_type_id", sql)
+        self.assertNotIn("JOIN", sql.replace("CROSS JOIN LATERAL", ""))
+
+
+def similarity(alias_name, candidate):
+    return (
+        Alias.objects.filter(name=alias_name)
+        .annotate(score=TrigramSimilarity("name", candidate))
+        .values_list("score", flat=True)
+        .get()
+    )
+
+
+class TrigramSearchQueryTests(TestCase):
+    """The single statement, run against seeded aliases."""
+
+    def setUp(self):
+        self.bode = Character.objects.create(name="Bode Augur")
+        self.hielo = Place.objects.create(name="Hielo")
+        self.bode.aliases.add(
+            Alias.objects.create(name="Bode Augur"),
+            Alias.objects.create(name="The Augur"),
+        )
+        self.hielo.aliases.add(Alias.objects.create(name="Hielo Glacier"))
+        # No owner, so never a match
+        Alias.objects.create(name="Hielo Glacier Pass")
+
+    def test_each_entity_keeps_its_best_match(self):
+        rows = _fuzzy_matches(
+            ["Bode", "Bode Augr", "Hielo Glacer"],
+            similarity_threshold=0.3,
+            max_results=20,
+            max_aliases_per_ngram=2,
+            min_alias_length=4,
+        )
+
+        expected = sorted(
+            [
+                (
+                    "Character",
+                    self.bode.pk,
+                    "Bode Augur",
+                    similarity("Bode Augur", "Bode Augr"),
+                ),
+                (
+                    "Place",
+                    self.hielo.pk,
+                    "Hielo Glacier",
+                    similarity("Hielo Glacier", "Hielo Glacer"),
+                ),
+            ],
+            key=lambda row: row[3],
+            reverse=True,
+        )
+        self.assertEqual([row[:3] for row in rows], [row[:3] for row in expected])
+        for row, expected_row in zip(rows, expected):
+            self.assertAlmostEqual(row[3], expected_row[3], places=5)
+
+    def test_threshold_and_alias_length_filter_matches(self):
+        rows = _fuzzy_matches(
+            ["Bode Augr", "Hielo Glacer"],
+            similarity_threshold=0.3,
+            max_results=20,
+            max_aliases_per_ngram=2,
+            min_alias_length=11,
+        )
+        self.assertEqual([row[:2] for row in rows], [("Place", self.hielo.pk)])
+
+        rows = _fuzzy_matches(
+            ["Bode Augr", "Hielo Glacer"],
+            similarity_threshold=0.65,
+            max_results=20,
+            max_aliases_per_ngram=2,
+            min_alias_length=4,
+        )
+        self.assertEqual([row[:2] for row in rows], [("Place", self.hielo.pk)])
+
+    def test_leftover_candidates_are_matched_after_exact_hits(self):
+        character_type = ContentType.objects.get_for_model(Character).pk
+        matcher = AliasAutomaton(
+            {"Bode Augur": [(character_type, self.bode.pk, "Bode Augur")]}
+        )
+
+        with patch(
+            "rag_chat.services.alias_matcher.get_alias_matcher",
+            return_value=matcher,
+        ):
+            results = trigram_entity_search("Did Bode Augur reach Hielo Glacer")
+
+        self.assertEqual(
+            [(r.entity, r.matched_name) for r in results],
+            [(self.bode, "Bode Augur"), (self.hielo, "Hielo Glacier")],
+        )
+        self.assertEqual(results[0].similarity, 1.0)
+        self.assertAlmostEqual(
+            results[1].similarity,
+            similarity("Hielo Glacier", "Hielo Glacer"),
+            places=5,
+        )
+
+
+class TrigramEntitySearchTests(TestCase):
+    @patch.object(search_module, "connection")
+    def test_no_candidates_means_no_query(self, mock_connection):
+        self.assertEqual(trigram_entity_search("   "), [])
+        self.assertEqual(trigram_entity_search("a"), [])
+        mock_connection.cursor.assert_not_called()
+
+    def test_leftover_candidates_drop_matched_names(self):
+        self.assertEqual(
+            _leftover_candidates(
+                ["Bode", "Bode Augur", "to Bode Augur about", "Izar"],
+                [" bode augur "],
+            ),
+            ["Izar"],
+        )
+
+
+class MergeRowsTests(TestCase):
+    def test_exact_rows_win_over_fuzzy_duplicates(self):
+        exact = [("character", 1, "Izar", 1.0)]
+        fuzzy = [("character", 1, "Izzar", 0.6), ("place", 2, "Hielo", 0.5)]
+
+        self.assertEqual(
+            _merge_rows(exact, fuzzy),
+            [("character", 1, "Izar", 1.0), ("place", 2, "Hielo", 0.5)],
+        )
+
+
+class AliasEntitySyncTests(TestCase):
+    """Alias owner columns follow the entities' aliases M2M."""
+
+    def test_add_remove_and_delete_keep_owner_in_sync(self):
+        character = Character.objects.create(name="Bruno")
+        place = Place.objects.create(name="Hielo")
+        alias = Alias.objects.create(name="Bruno the Bold")
+
+        character.aliases.add(alias)
+        alias.refresh_from_db()
+        self.assertEqual(alias.entity_object_id, character.pk)
+        self.assertEqual(
+            resolve_alias_entities([alias, Alias.objects.create(name="x")]),
+            [character, None],
+        )
+
+        character.aliases.remove(alias)
+        alias.refresh_from_db()
+        self.assertIsNone(alias.entity_content_type_id)
+
+        alias.base_places.add(place)
+        alias.refresh_from_db()
+        self.assertEqual(
+            alias.entity_content_type, ContentType.objects.get_for_model(Place)
+        )
+
+        place.delete()
+        alias.refresh_from_db()
+        self.assertIsNone(alias.entity_object_id)
+
+    def owner(self, alias):
+        alias.refresh_from_db()
+        if alias.entity_content_type_id is None:
+            return None
+        return (alias.entity_content_type.model_class(), alias.entity_object_id)
+
+    def test_shared_alias_follows_the_backfill_rule(self):
+        place = Place.objects.create(name="Hielo")
+        character = Character.objects.create(name="Bruno")
+        alias = Alias.objects.create(name="Bruno of Hielo")
+
+        place.aliases.add(alias)
+        self.assertEqual(self.owner(alias), (Place, place.pk))
+        # Characters come before places, whichever was linked last
+        alias.base_characters.add(character)
+        self.assertEqual(self.owner(alias), (Character, character.pk))
+
+        # Removing one link hands the alias to the remaining entity
+        character.aliases.remove(alias)
+        self.assertEqual(self.owner(alias), (Place, place.pk))
+
+        character.aliases.add(alias)
+        character.aliases.clear()
+        self.assertEqual(self.owner(alias), (Place, place.pk))
+
+        character.aliases.add(alias)
+        character.delete()
+        self.assertEqual(self.owner(alias), (Place, place.pk))
+
+        alias.base_places.clear()
+        self.assertIsNone(self.owner(alias))
+
+    def test_backfill_keeps_first_link_of_shared_alias(self):
+        place = Place.objects.create(name="Hielo")
+        first = Character.objects.create(name="Bruno")
+        second = Character.objects.create(name="Bruno Again")
+        alias = Alias.objects.create(name="Bruno the Bold")
+        first.aliases.add(alias)
+        second.aliases.add(alias)
+        place.aliases.add(alias)
+
+        call_command("backfill_alias_entities", stdout=StringIO())
+
+        alias.refresh_from_db()
+        self.assertEqual(
+            (alias.entity_content_type.model_class(), alias.entity_object_id),
+            (Character, first.pk),
+        )
+
+
+class ExactFirstPassTests(TestCase):
+    """Verbatim names skip the trigram SQL entirely."""
+
+    def setUp(self):
+        self.matcher = AliasAutomaton(
+            {
+                "Bode Augur": [
+                    (ContentType.objects.get_for_model(Character).pk, 1, "Bode Augur")
+                ]
+            }
+        )
+
+    @patch.object(search_module, "_resolve_entities")
+    @patch.object(search_module, "connection")
+    def test_exact_hits_without_leftovers_issue_no_sql(
+        self, mock_connection, mock_resolve
+    ):
+        character = Character(pk=1, name="Bode Augur")
+        mock_resolve.return_value = {("Character", 1): character}
+
+        with patch(
+            "rag_chat.services.alias_matcher.get_alias_matcher",
+            return_value=self.matcher,
+        ):
+            results = trigram_entity_search("Bode Augur")
+
+        mock_connection.cursor.assert_not_called()
+        self.assertEqual(
+            [(r.entity, r.similarity) for r in results], [(character, 1.0)]
+        )
@@ -0,0 +1,149 @@
+from io import StringIO
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+
+from character.models import Character
+
+from ..models import ContentChunk
+from ..services.RAGService import RAGService
+from ..vector_search import as_bits, coarse_distance, shorten_embedding
+
+EMBEDDING = [1.0] + [0.0] * 1535
+
+
+class QuantizedDistanceTests(SimpleTestCase):
+    def test_as_bits_matches_binary_quantize(self):
+        self.assertEqual(as_bits([0.5, -0.1, 0.0, 2.0]), "1001")
+
+    def test_shorten_embedding_truncates_and_renormalizes(self):
+        short = shorten_embedding([3.0, 4.0, 12.0], dimensions=2)
+        self.assertEqual(short, [0.6, 0.8])
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            coarse_distance(EMBEDDING, "full")
+
+
+class QuantizedSemanticSearchTests(TestCase):
+    """Quantized modes rerank their candidates by exact similarity."""
+
+    def setUp(self):
+        content_type = ContentType.objects.get_for_model(Character)
+        for i, embedding in enumerate(
+            [EMBEDDING, [0.6, 0.8] + [0.0] * 1534, [0.0, 1.0] + [0.0] * 1534]
+        ):
+            ContentChunk.objects.create(
+                content_type=content_type,
+                object_id=i + 1,
+                chunk_text=f"chunk {i}",
+                embedding=embedding,
+            )
+
+    def _ranked(self, mode):
+        queryset = RAGService()._semantic_search_queryset(
+            EMBEDDING, similarity_threshold=0.5, vector_search=mode
+        )
+        return [(c.chunk_text, round(c.similarity, 3)) for c in queryset]
+
+    @override_settings(RAG_VECTOR_RERANK_CANDIDATES=10)
+    def test_quantized_modes_match_full_precision(self):
+        full = self._ranked("full")
+        self.assertEqual(full, [("chunk 0", 1.0), ("chunk 1", 0.6)])
+        self.assertEqual(self._ranked("halfvec"), full)
+        self.assertEqual(self._ranked("binary"), full)
+        self.assertEqual(self._ranked("short"), full)
+
+
+class ContentGroupTests(TestCase):
+    """Searches restricted to one group filter on its partial index's predicate."""
+
+    def test_save_fills_content_group(self):
+        chunk = ContentChunk.objects.create(
+            content_type=ContentType.objects.get_for_model(Character),
+            object_id=1,
+            chunk_text="chunk",
+            embedding=EMBEDDING,
+        )
+        self.assertEqual(chunk.content_group, "entity")
+
+    def test_single_group_search_filters_on_content_group(self):
+        service = RAGService()
+        entity_sql = str(
+            service._semantic_search_queryset(
+                EMBEDDING, 0.1, content_types=["character", "place"]
+            ).query
+        )
+        mixed_sql = str(
+            service._semantic_search_queryset(
+                EMBEDDING, 0.1, content_types=["character", "gamelog"]
+            ).query
+        )
+        self.assertIn('"content_group" = entity', entity_sql)
+        self.assertNotIn('"content_group"', mixed_sql)
+
+
+def chunk_index_names():
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, ContentChunk._meta.db_table
+        )
+    return {name for name in constraints if name.endswith("_hnsw_idx")}
+
+
+class SyncVectorIndexesTests(TransactionTestCase):
+    """Only the configured mode's HNSW indexes are kept."""
+
+    FULL = {
+        "embedding_hnsw_idx",
+        "embedding_entity_hnsw_idx",
+        "embedding_gamelog_hnsw_idx",
+    }
+
+    def sync(self, *args):
+        call_command("sync_vector_indexes", *args, stdout=StringIO())
+
+    @override_settings(RAG_VECTOR_SEARCH="full")
+    def test_default_mode_drops_the_coarse_indexes(self):
+        self.sync()
+        names = chunk_index_names()
+        self.assertTrue(self.FULL <= names)
+        self.assertNotIn("embedding_halfvec_hnsw_idx", names)
+        self.assertNotIn("embedding_bit_hnsw_idx", names)
+        self.assertNotIn("embedding_short_hnsw_idx", names)
+
+    def test_short_mode_builds_its_index(self):
+        self.addCleanup(self.sync, "--mode", "full")
+
+        self.sync("--mode", "short")
+        names = chunk_index_names()
+        self.assertIn("embedding_short_hnsw_idx", names)
+        self.assertFalse(self.FULL & names)
+
+    def test_halfvec_replaces_the_full_indexes(self):
+        self.addCleanup(self.sync, "--mode", "full")
+
+        self.sync("--mode", "halfvec")
+        names = chunk_index_names()
+        self.assertIn("embedding_halfvec_hnsw_idx", names)
+        self.assertFalse(self.FULL & names)
+
+        self.sync("--mode", "full")
+        names = chunk_index_names()
+        self.assertTrue(self.FULL <= names)
+        self.assertNotIn("embedding_halfvec_hnsw_idx", names)
+
+    def test_keep_leaves_other_modes_indexes(self):
+        self.addCleanup(self.sync, "--mode", "full")
+
+        self.sync("--mode", "binary", "--keep")
+        names = chunk_index_names()
+        self.assertIn("embedding_bit_hnsw_idx", names)
+        self.assertTrue(self.FULL <= names)
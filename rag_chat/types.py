@@ -305,16 +305,8 @@ class RAGQuery:
             content_types=content_types,
         )
 
-        # Convert results to ContentChunk objects for GraphQL
-        chunks = []
-        for result in results:
-            try:
-                chunk = models.ContentChunk.objects.get(id=result.chunk_id)
-                chunks.append(chunk)
-            except models.ContentChunk.DoesNotExist:
-                continue
-
-        return chunks
+        # The search already returns the chunk rows; no need to re-fetch them
+        return [result.chunk for result in results if result.chunk is not None]
 
 
 @strawberry.type
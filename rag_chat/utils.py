@@ -1,4 +1,10 @@
+import hashlib
+import re
+from itertools import accumulate
+from typing import Optional
+
 import tiktoken
+from django.conf import settings
 
 _encoding_cache: dict[str, tiktoken.Encoding] = {}
 
@@ -20,3 +26,58 @@ def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
     except Exception:
         # Fallback: assume 1 token per 4 characters
         return len(text) // 4
+
+
+def token_offsets(text: str, model: str = "gpt-4o-mini") -> list[int]:
+    """Character offset in `text` at which each of its tokens starts."""
+    try:
+        encoding = _get_encoding(model)
+        tokens = encoding.encode(text, disallowed_special=())
+        if text.isascii():
+            # One byte per character: offsets are running token byte lengths
+            lengths = map(len, encoding.decode_tokens_bytes(tokens))
+            return list(accumulate(lengths, initial=0))[:-1]
+        _, offsets = encoding.decode_with_offsets(tokens)
+        return offsets
+    except Exception:
+        # Fallback: assume 1 token per 4 characters, not crossing word starts
+        return [match.start() for match in re.finditer(r"\s*\S{1,4}", text)]
+
+
+def encoding_name(model: str) -> str:
+    """Name of the tiktoken encoding used for the given model."""
+    try:
+        return _get_encoding(model).name
+    except Exception:
+        return "cl100k_base"
+
+
+def token_count_models() -> list[str]:
+    """Models whose encodings get persisted token counts (see GameLog.token_counts)."""
+    models = [settings.OPENAI_CHEAP_CHAT_MODEL, settings.OPENAI_BEST_CHAT_MODEL]
+    return [model for model in models if model] or ["gpt-4o-mini"]
+
+
+def stored_token_counts(text: str, previous: Optional[dict] = None) -> dict:
+    """
+    Token counts of `text` for every tracked encoding, keyed by encoding name,
+    plus a digest of the text they were computed from. Counts in `previous`
+    are reused when the text is unchanged.
+    """
+    digest = hashlib.sha1(text.encode()).hexdigest()
+    counts = dict(previous) if previous and previous.get("sha1") == digest else {}
+    counts["sha1"] = digest
+    for model in token_count_models():
+        name = encoding_name(model)
+        if name not in counts:
+            counts[name] = count_tokens(text, model=model)
+    return counts
+
+
+def stored_token_count(counts: Optional[dict], text: str, model: str) -> int:
+    """Look up a persisted token count, counting live if it is missing."""
+    if counts:
+        count = counts.get(encoding_name(model))
+        if count is not None:
+            return count
+    return count_tokens(text, model=model)
@@ -0,0 +1,239 @@
+"""
+Quantized and reduced-dimension vector search over ContentChunk.embedding.
+
+The float32 column stays the source of truth. It can be searched through
+its full-precision HNSW index or one of three coarse indexes:
+
+  - halfvec: embedding::halfvec(1536), half the size of the full index
+  - binary:  binary_quantize(embedding)::bit(1536), 1/32 of the size
+  - short:   the embedding_short column, the first 256 dimensions of the
+             embedding renormalized, 1/6 of the size
+
+settings.RAG_VECTOR_SEARCH picks the one semantic search walks. The coarse
+modes fetch RAG_VECTOR_RERANK_CANDIDATES nearest chunks by the coarse
+distance, then rerank those by exact cosine similarity, so scores (and the
+similarity threshold) mean the same in every mode.
+
+The full-precision index is also partial per content group (entities, game
+logs). Searches restricted to one group filter on ContentChunk.content_group
+with a literal, so the planner can pick that group's index.
+
+Each mode's indexes are listed in VECTOR_INDEXES and are not part of the
+migration state. Run `manage.py sync_vector_indexes` after migrating and
+after each switch. It builds the configured mode's indexes, then drops the
+other modes' indexes, e.g. replacing the full-precision indexes with the
+halfvec one.
+"""
+
+import math
+from typing import List, Optional, Tuple
+
+from django.contrib.postgres.indexes import OpClass
+from django.db.models import Func, Q
+from django.db.models.functions import Cast
+from pgvector.django import (
+    BitField,
+    CosineDistance,
+    HalfVector,
+    HalfVectorField,
+    HammingDistance,
+    HnswIndex,
+)
+
+EMBEDDING_DIMENSIONS = 1536
+SHORT_EMBEDDING_DIMENSIONS = 256
+
+VECTOR_SEARCH_FULL = "full"
+VECTOR_SEARCH_HALFVEC = "halfvec"
+VECTOR_SEARCH_BINARY = "binary"
+VECTOR_SEARCH_SHORT = "short"
+VECTOR_SEARCH_MODES = (
+    VECTOR_SEARCH_FULL,
+    VECTOR_SEARCH_HALFVEC,
+    VECTOR_SEARCH_BINARY,
+    VECTOR_SEARCH_SHORT,
+)
+
+
+class BinaryQuantize(Func):
+    """pgvector's binary_quantize(): one bit per dimension, set if positive."""
+
+    function = "binary_quantize"
+    output_field = BitField(length=EMBEDDING_DIMENSIONS)
+
+
+def halfvec_expression(field: str = "embedding") -> Cast:
+    return Cast(field, HalfVectorField(dimensions=EMBEDDING_DIMENSIONS))
+
+
+def binary_expression(field: str = "embedding") -> Cast:
+    return Cast(BinaryQuantize(field), BitField(length=EMBEDDING_DIMENSIONS))
+
+
+def as_bits(embedding: List[float]) -> str:
+    """The query-side equivalent of binary_quantize(), as a bit string."""
+    return "".join("1" if value > 0 else "0" for value in embedding)
+
+
+def shorten_embedding(
+    embedding: List[float], dimensions: int = SHORT_EMBEDDING_DIMENSIONS
+) -> List[float]:
+    """
+    Truncate a text-embedding-3 vector and renormalize it to unit length.
+    These models are trained so that this equals requesting `dimensions`
+    from the API, so one call serves both columns.
+    """
+    prefix = [float(value) for value in embedding[:dimensions]]
+    norm = math.sqrt(sum(value * value for value in prefix))
+    if not norm:
+        return prefix
+    return [value / norm for value in prefix]
+
+
+def coarse_distance(query_embedding: List[float], vector_search: str) -> Func:
+    """
+    Distance from query_embedding in the given coarse mode, written to
+    match the expression its HNSW index was built on.
+    """
+    if vector_search == VECTOR_SEARCH_HALFVEC:
+        return CosineDistance(halfvec_expression(), HalfVector(query_embedding))
+    if vector_search == VECTOR_SEARCH_BINARY:
+        return HammingDistance(binary_expression(), as_bits(query_embedding))
+    if vector_search == VECTOR_SEARCH_SHORT:
+        return CosineDistance("embedding_short", shorten_embedding(query_embedding))
+    raise ValueError(
+        f"Unknown coarse vector search '{vector_search}'; expected one of "
+        f"{', '.join(VECTOR_SEARCH_MODES[1:])}"
+    )
+
+
+# Content groups. Entity and game log chunks each have their own partial HNSW
+# index, so a search restricted to one group never walks the other's vectors.
+CONTENT_GROUP_ENTITY = "entity"
+CONTENT_GROUP_GAMELOG = "gamelog"
+CONTENT_GROUP_CHOICES = [
+    (CONTENT_GROUP_ENTITY, "Entity"),
+    (CONTENT_GROUP_GAMELOG, "Game log"),
+]
+
+
+def content_group_for(model_name: str) -> str:
+    """The content group of chunks from a model (ContentType.model)."""
+    if model_name == CONTENT_GROUP_GAMELOG:
+        return CONTENT_GROUP_GAMELOG
+    return CONTENT_GROUP_ENTITY
+
+
+# The HNSW indexes each mode searches
+VECTOR_INDEXES = {
+    VECTOR_SEARCH_FULL: [
+        HnswIndex(
+            name="embedding_hnsw_idx",
+            fields=["embedding"],
+            m=16,
+            ef_construction=64,
+            opclasses=["vector_cosine_ops"],
+        ),
+        # Per-group partial indexes for searches restricted to one group
+        HnswIndex(
+            name="embedding_entity_hnsw_idx",
+            fields=["embedding"],
+            m=16,
+            ef_construction=64,
+            opclasses=["vector_cosine_ops"],
+            condition=Q(content_group=CONTENT_GROUP_ENTITY),
+        ),
+        HnswIndex(
+            name="embedding_gamelog_hnsw_idx",
+            fields=["embedding"],
+            m=16,
+            ef_construction=64,
+            opclasses=["vector_cosine_ops"],
+            condition=Q(content_group=CONTENT_GROUP_GAMELOG),
+        ),
+    ],
+    VECTOR_SEARCH_HALFVEC: [
+        HnswIndex(
+            OpClass(halfvec_expression(), name="halfvec_cosine_ops"),
+            name="embedding_halfvec_hnsw_idx",
+            m=16,
+            ef_construction=64,
+        ),
+    ],
+    VECTOR_SEARCH_BINARY: [
+        HnswIndex(
+            OpClass(binary_expression(), name="bit_hamming_ops"),
+            name="embedding_bit_hnsw_idx",
+            m=16,
+            ef_construction=64,
+        ),
+    ],
+    VECTOR_SEARCH_SHORT: [
+        HnswIndex(
+            name="embedding_short_hnsw_idx",
+            fields=["embedding_short"],
+            m=16,
+            ef_construction=64,
+            opclasses=["vector_cosine_ops"],
+        ),
+    ],
+}
+
+
+def sync_vector_indexes(
+    model, schema_editor, vector_search: str, drop_unused: bool = True
+) -> Tuple[List[str], List[str]]:
+    """
+    Build the missing HNSW indexes of vector_search, then (with drop_unused)
+    drop the other modes' indexes. Both run CONCURRENTLY, so writes to the
+    chunks continue, and must not run inside a transaction. Searches keep
+    their old index until the new one is ready. Returns the names of the
+    built and dropped indexes.
+    """
+    if vector_search not in VECTOR_INDEXES:
+        raise ValueError(
+            f"Unknown vector search '{vector_search}'; expected one of "
+            f"{', '.join(VECTOR_SEARCH_MODES)}"
+        )
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        existing = connection.introspection.get_constraints(
+            cursor, model._meta.db_table
+        )
+
+    built, dropped = [], []
+    for index in VECTOR_INDEXES[vector_search]:
+        if index.name not in existing:
+            schema_editor.add_index(model, index, concurrently=True)
+            built.append(index.name)
+    if drop_unused:
+        for mode, indexes in VECTOR_INDEXES.items():
+            for index in indexes:
+                if mode != vector_search and index.name in existing:
+                    schema_editor.remove_index(model, index, concurrently=True)
+                    dropped.append(index.name)
+    return built, dropped
+
+
+def hnsw_settings(
+    ef_search: Optional[int] = None, iterative_scan: Optional[str] = None
+) -> List[Tuple[str, str]]:
+    """
+    The pgvector settings for one search, as (name, value) pairs for
+    set_config(). ef_search caps how many rows an HNSW scan returns.
+    iterative_scan ("strict_order" or "relaxed_order", pgvector >= 0.8) lets
+    the scan continue when filters discard rows, instead of returning fewer
+    than LIMIT. Falsy values leave the server's setting alone.
+    """
+    pairs = []
+    if ef_search:
+        pairs.append(("hnsw.ef_search", str(ef_search)))
+    if iterative_scan:
+        pairs.append(("hnsw.iterative_scan", iterative_scan))
+    return pairs
+
+
+def apply_hnsw_settings(cursor, pairs: List[Tuple[str, str]]) -> None:
+    """SET LOCAL each pair; only lasts until the current transaction ends."""
+    for name, value in pairs:
+        cursor.execute("SELECT set_config(%s, %s, true)", [name, value])
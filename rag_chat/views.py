@@ -2,18 +2,24 @@ import base64
 import json
 import logging
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.http import StreamingHttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from gqlauth.core.middlewares import USER_OR_ERROR_KEY
 
 from .models import ChatSession
+from .services.AsyncRAGService import AsyncRAGService
+from .services.async_db import close_async_pool
 from .services.RAGService import RAGService
 from .source_models import create_sources
 
 logger = logging.getLogger(__name__)
 
+NO_CONTEXT_RESPONSE = "I couldn't find any relevant information for that question. Could you try rephrasing it or asking about something more specific?"
+
 
 def _get_jwt_user(request):
     """
@@ -60,6 +66,55 @@ def _resolve_session_id(raw_id) -> int:
         raise ValueError(f"Invalid session ID: {raw_id}")
 
 
+def _parse_chat_request(request) -> JsonResponse | tuple[int, str, float | None]:
+    """
+    Parse and validate a chat stream request body.
+
+    Returns (session_pk, message, similarity_threshold), or a JsonResponse to
+    return as-is when the body is invalid.
+    """
+    try:
+        body = json.loads(request.body)
+    except (json.JSONDecodeError, ValueError):
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+
+    session_id = body.get("session_id")
+    message = body.get("message", "").strip()
+    similarity_threshold = body.get("similarity_threshold")
+
+    if not session_id or not message:
+        return JsonResponse(
+            {"error": "session_id and message are required"}, status=400
+        )
+
+    try:
+        pk = _resolve_session_id(session_id)
+    except ValueError:
+        return JsonResponse({"error": "Chat session not found"}, status=404)
+
+    return pk, message, similarity_threshold
+
+
+def _chat_model(user) -> str:
+    """Select model based on staff status."""
+    return (
+        settings.OPENAI_BEST_CHAT_MODEL
+        if user.is_staff
+        else settings.OPENAI_CHEAP_CHAT_MODEL
+    )
+
+
+def _cached_done_event(saved_message, cached: dict) -> dict:
+    """The final event for an answer served from the response cache."""
+    return {
+        "type": "done",
+        "message_id": saved_message.pk,
+        "tokens_used": 0,
+        "sources": cached["sources"].to_json(),
+        "cached": True,
+    }
+
+
 def _sse_event(data: dict) -> str:
     """Format a dict as an SSE data event."""
     return f"data: {json.dumps(data)}\n\n"
@@ -86,24 +141,14 @@ def chat_stream_view(request):
     if not _check_chat_permission(user):
         return JsonResponse({"error": "Permission denied"}, status=403)
 
-    try:
-        body = json.loads(request.body)
-    except (json.JSONDecodeError, ValueError):
-        return JsonResponse({"error": "Invalid JSON body"}, status=400)
-
-    session_id = body.get("session_id")
-    message = body.get("message", "").strip()
-    similarity_threshold = body.get("similarity_threshold")
-
-    if not session_id or not message:
-        return JsonResponse(
-            {"error": "session_id and message are required"}, status=400
-        )
+    parsed = _parse_chat_request(request)
+    if isinstance(parsed, JsonResponse):
+        return parsed
+    pk, message, similarity_threshold = parsed
 
     try:
-        pk = _resolve_session_id(session_id)
         session = ChatSession.objects.get(pk=pk)
-    except (ValueError, ChatSession.DoesNotExist):
+    except ChatSession.DoesNotExist:
         return JsonResponse({"error": "Chat session not found"}, status=404)
 
     if session.user != user:
@@ -112,16 +157,21 @@ def chat_stream_view(request):
             status=403,
         )
 
-    # Select model based on staff status
-    model = (
-        settings.OPENAI_BEST_CHAT_MODEL
-        if user.is_staff
-        else settings.OPENAI_CHEAP_CHAT_MODEL
-    )
-    rag_service = RAGService(model=model)
+    rag_service = RAGService(model=_chat_model(user))
 
     def event_stream():
         try:
+            cache_key = rag_service.response_cache_key(similarity_threshold, session)
+            query_embedding = rag_service.response_cache_embedding(message, cache_key)
+            cached = rag_service.get_cached_response(
+                message, cache_key, query_embedding
+            )
+            if cached is not None:
+                saved_message = rag_service.save_chat_message(session, message, cached)
+                yield _sse_event({"type": "token", "token": cached["response"]})
+                yield _sse_event(_cached_done_event(saved_message, cached))
+                return
+
             prepared = rag_service.prepare_context(
                 query=message,
                 similarity_threshold=similarity_threshold,
@@ -129,7 +179,7 @@ def chat_stream_view(request):
             )
 
             if prepared is None:
-                no_context_response = "I couldn't find any relevant information for that question. Could you try rephrasing it or asking about something more specific?"
+                no_context_response = NO_CONTEXT_RESPONSE
                 # Save to DB even when no context found
                 response_data = {
                     "response": no_context_response,
@@ -174,6 +224,9 @@ def chat_stream_view(request):
                 "tokens_used": tokens_used,
                 "similarity_threshold": prepared.similarity_threshold,
             }
+            rag_service.cache_response(
+                message, cache_key, response_data, query_embedding
+            )
             saved_message = rag_service.save_chat_message(
                 session, message, response_data
             )
@@ -195,3 +248,130 @@ def chat_stream_view(request):
     response["Cache-Control"] = "no-cache"
     response["X-Accel-Buffering"] = "no"  # Prevent nginx/proxy buffering
     return response
+
+
+@csrf_exempt
+@require_POST
+async def chat_stream_view_async(request):
+    """
+    Async version of chat_stream_view, served under ASGI.
+
+    Same request and event format. Retrieval and generation run on
+    AsyncRAGService, so a worker is not tied up while waiting on OpenAI or
+    the database.
+    """
+    user = await sync_to_async(_get_jwt_user)(request)
+
+    if not await sync_to_async(_check_chat_permission)(user):
+        return JsonResponse({"error": "Permission denied"}, status=403)
+
+    parsed = _parse_chat_request(request)
+    if isinstance(parsed, JsonResponse):
+        return parsed
+    pk, message, similarity_threshold = parsed
+
+    try:
+        session = await ChatSession.objects.aget(pk=pk)
+    except ChatSession.DoesNotExist:
+        return JsonResponse({"error": "Chat session not found"}, status=404)
+
+    if session.user_id != user.pk:
+        return JsonResponse(
+            {"error": "You can only send messages to your own chat sessions"},
+            status=403,
+        )
+
+    rag_service = AsyncRAGService(model=_chat_model(user))
+    save_chat_message = sync_to_async(rag_service.save_chat_message)
+    # Under WSGI the stream runs on a loop that ends with the request
+    request_scoped_pool = not isinstance(request, ASGIRequest)
+
+    async def event_stream():
+        try:
+            cache_key = await sync_to_async(rag_service.response_cache_key)(
+                similarity_threshold, session
+            )
+            query_embedding = await sync_to_async(rag_service.response_cache_embedding)(
+                message, cache_key
+            )
+            cached = await sync_to_async(rag_service.get_cached_response)(
+                message, cache_key, query_embedding
+            )
+            if cached is not None:
+                saved_message = await save_chat_message(session, message, cached)
+                yield _sse_event({"type": "token", "token": cached["response"]})
+                yield _sse_event(_cached_done_event(saved_message, cached))
+                return
+
+            prepared = await rag_service.aprepare_context(
+                query=message,
+                similarity_threshold=similarity_threshold,
+                session=session,
+            )
+
+            if prepared is None:
+                # Save to DB even when no context found
+                response_data = {
+                    "response": NO_CONTEXT_RESPONSE,
+                    "sources": create_sources([]),
+                    "tokens_used": 0,
+                    "similarity_threshold": similarity_threshold
+                    or rag_service.default_similarity_threshold,
+                }
+                saved_message = await save_chat_message(session, message, response_data)
+                yield _sse_event({"type": "token", "token": NO_CONTEXT_RESPONSE})
+                yield _sse_event(
+                    {
+                        "type": "done",
+                        "message_id": saved_message.pk,
+                        "tokens_used": 0,
+                        "sources": response_data["sources"].to_json(),
+                    }
+                )
+                return
+
+            full_response = []
+            tokens_used = 0
+
+            async for chunk in rag_service.agenerate_response_stream(message, prepared):
+                if chunk["type"] == "token":
+                    full_response.append(chunk["token"])
+                    yield _sse_event(chunk)
+                elif chunk["type"] == "done":
+                    tokens_used = chunk.get("tokens_used", 0)
+                elif chunk["type"] == "error":
+                    yield _sse_event(chunk)
+                    return
+
+            response_data = {
+                "response": "".join(full_response),
+                "sources": prepared.sources,
+                "tokens_used": tokens_used,
+                "similarity_threshold": prepared.similarity_threshold,
+            }
+            await sync_to_async(rag_service.cache_response)(
+                message, cache_key, response_data, query_embedding
+            )
+            saved_message = await save_chat_message(session, message, response_data)
+
+            yield _sse_event(
+                {
+                    "type": "done",
+                    "message_id": saved_message.pk,
+                    "tokens_used": tokens_used,
+                    "sources": prepared.sources.to_json(),
+                }
+            )
+
+        except Exception as e:
+            logger.error(f"Streaming chat error: {str(e)}")
+            yield _sse_event({"type": "error", "error": str(e)})
+
+        finally:
+            if request_scoped_pool:
+                await close_async_pool()
+
+    response = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Prevent nginx/proxy buffering
+    return response
@@ -14,6 +14,7 @@ class TranscriptionConfig:
         delay_between_requests: int = 21,
         recent_threshold_days: int = 180,
         openai_api_key: Optional[str] = None,
+        openai_base_url: Optional[str] = None,
         enable_text_cleaning: bool = True,
         enable_audio_preprocessing: bool = True,
         repetition_detection_threshold: float = 0.4,
@@ -25,6 +26,9 @@ class TranscriptionConfig:
         self.openai_api_key = openai_api_key or getattr(
             settings, "OPENAI_API_KEY", os.getenv("OPENAI_API_KEY")
         )
+        self.openai_base_url = openai_base_url or getattr(
+            settings, "OPENAI_BASE_URL", os.getenv("OPENAI_BASE_URL")
+        )
 
         # File Processing
         self.max_file_size_mb = max_file_size_mb  # Buffer under 25MB Whisper limit
@@ -45,7 +45,9 @@ class TranscriptionService:
                 "OpenAI API key not found. Set OPENAI_API_KEY in settings or environment."
             )
 
-        self.openai_client = OpenAI(api_key=self.config.openai_api_key)
+        self.openai_client = OpenAI(
+            api_key=self.config.openai_api_key, base_url=self.config.openai_base_url
+        )
 
         self.context_service = CampaignContextService(self.config)
         self.audio_service = AudioProcessingService(self.config)
@@ -390,7 +392,7 @@ class TranscriptionService:
                 print(f"Transcribing {file_path.name}...")
                 if chunk_info:
                     print(chunk_info)
-                response = self.openai_client.audio.transcribe(
+                response = self.openai_client.audio.transcriptions.create(
                     model="whisper-1",
                     file=f,
                     response_format="verbose_json",
@@ -406,7 +408,7 @@ class TranscriptionService:
                 )
 
                 # Validate response structure using WhisperResponse
-                whisper_response = WhisperResponse(response)
+                whisper_response = WhisperResponse(response.model_dump())
                 if not whisper_response.is_valid:
                     print(
                         f"⚠️ Invalid response format from Whisper API for {file_path.name}"
@@ -424,14 +426,14 @@ class TranscriptionService:
                     f.seek(0)  # Rewind file pointer before retry
                     try:
                         # Retry without prompt to reduce hallucinations
-                        response = self.openai_client.audio.transcribe(
+                        response = self.openai_client.audio.transcriptions.create(
                             model="whisper-1",
                             file=f,
                             response_format="verbose_json",
                             temperature=0,
                             language="en",
                         )
-                        whisper_response = WhisperResponse(response)
+                        whisper_response = WhisperResponse(response.model_dump())
                     except Exception as retry_exc:
                         print(
                             f"⚠️ Retry failed for {file_path.name}: {retry_exc}. Using first attempt's transcript."
@@ -630,7 +632,9 @@ Session log:
         print("prompt:", prompt)
         import tiktoken
 
-        openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        openai_client = OpenAI(
+            api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL
+        )
 
         encoding = tiktoken.encoding_for_model(model)
         num_tokens = len(encoding.encode(prompt))
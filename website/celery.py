@@ -4,6 +4,7 @@ Celery configuration for the website project.
 
 import os
 from celery import Celery
+from celery.signals import worker_process_init
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "website.settings")
@@ -30,6 +31,22 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
 
 
+@worker_process_init.connect
+def forget_inherited_db_pools(**kwargs):
+    """
+    A connection pool opened in the parent before forking can't be used by the
+    child: its connections belong to the parent and its maintenance threads
+    don't survive the fork. Drop it without closing (which would end the
+    parent's sessions); the child opens its own pool on first use.
+    """
+    from django.db import connections
+
+    for conn in connections.all(initialized_only=True):
+        pools = getattr(conn, "_connection_pools", None)
+        if pools:
+            pools.pop(conn.alias, None)
+
+
 # @app.task(bind=True, ignore_result=True)
 # def debug_task(self):
 #     print(f"Request: {self.request!r}")
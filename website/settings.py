@@ -48,6 +48,8 @@ AIREL_FOLDER_ID = os.environ.get("AIREL_FOLDER_ID")
 GOOGLE_SSO_CLIENT_ID = os.environ.get("GOOGLE_SSO_CLIENT_ID")
 GOOGLE_SSO_CLIENT_SECRET = os.environ.get("GOOGLE_SSO_CLIENT_SECRET")
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+# Point every OpenAI client elsewhere, e.g. at `manage.py openai_standin`
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL") or None
 OPENAI_EMBEDDINGS_MODEL = os.environ.get("OPENAI_EMBEDDINGS_MODEL")
 OPENAI_BEST_CHAT_MODEL = os.environ.get("OPENAI_BEST_CHAT_MODEL")
 OPENAI_CHEAP_CHAT_MODEL = os.environ.get("OPENAI_CHEAP_CHAT_MODEL")
@@ -181,6 +183,28 @@ DATABASES = {
     )
 }
 
+# Connection pooling (psycopg_pool, via Django's OPTIONS["pool"])
+# Each process (gunicorn worker, Celery worker child) keeps one pool that its
+# request threads, RAG fan-out threads and tasks check connections out of, so
+# server connections are opened once rather than per thread. Pooling replaces
+# persistent connections (conn_max_age). CONN_HEALTH_CHECKS makes the pool
+# check a connection before handing it out.
+DATABASE_POOL_ENABLED = os.environ.get("DATABASE_POOL_ENABLED", "True") == "True"
+if DATABASE_POOL_ENABLED:
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = (
+        os.environ.get("DATABASE_POOL_HEALTH_CHECKS", "True") == "True"
+    )
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": int(os.environ.get("DATABASE_POOL_MIN_SIZE", 2)),
+        "max_size": int(os.environ.get("DATABASE_POOL_MAX_SIZE", 10)),
+        # Seconds to wait for a free connection before raising PoolTimeout
+        "timeout": float(os.environ.get("DATABASE_POOL_TIMEOUT", 10)),
+        # Seconds an idle connection above min_size is kept open
+        "max_idle": float(os.environ.get("DATABASE_POOL_MAX_IDLE", 300)),
+        "name": "default",
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -308,10 +332,141 @@ AWS_S3_ADDRESSING_STYLE = "virtual"
 AWS_DEFAULT_ACL = None
 AWS_S3_FILE_OVERWRITE = False
 
+REDIS_URL = os.environ.get("REDIS_URL", "redis://redis:6379/0")
+
+# Caches
+# "default" stays process-local; "shared" is Redis-backed and visible to every
+# web and Celery process. Short socket timeouts keep a missing Redis from
+# stalling requests — callers treat shared-cache errors as misses.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "KEY_PREFIX": "dnd",
+        "OPTIONS": {
+            "socket_connect_timeout": 0.5,
+            "socket_timeout": 0.5,
+        },
+    },
+}
+
+# Query-embedding cache (rag_chat.embeddings)
+# In-process LRU bounded by entry count (~6KB per 1536-d float32 vector),
+# backed by the shared Redis cache. Set EMBEDDING_CACHE_ALIAS="" to disable
+# the shared tier.
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES", 2048))
+EMBEDDING_CACHE_TTL = int(os.environ.get("EMBEDDING_CACHE_TTL", 60 * 60 * 24 * 7))
+EMBEDDING_CACHE_ALIAS = os.environ.get("EMBEDDING_CACHE_ALIAS", "shared")
+
+# Exact alias matcher (rag_chat.services.alias_matcher)
+# Each process rebuilds its in-memory automaton when the version counter in
+# the shared cache moves; this bounds how often it checks.
+ALIAS_MATCHER_CACHE_ALIAS = os.environ.get("ALIAS_MATCHER_CACHE_ALIAS", "shared")
+ALIAS_MATCHER_VERSION_CHECK_INTERVAL = float(
+    os.environ.get("ALIAS_MATCHER_VERSION_CHECK_INTERVAL", 5)
+)
+
+# Digest of all GameLog summaries (rag_chat.services.log_summaries)
+# Invalidated on GameLog save/delete; the TTL is only a backstop.
+LOG_SUMMARIES_CACHE_ALIAS = os.environ.get("LOG_SUMMARIES_CACHE_ALIAS", "shared")
+LOG_SUMMARIES_CACHE_TTL = int(os.environ.get("LOG_SUMMARIES_CACHE_TTL", 60 * 60 * 24))
+
+# Async RAG pipeline (rag_chat.services.async_db)
+# psycopg pool used for the pipeline's searches: one per process under ASGI,
+# one per request for the async view under WSGI.
+RAG_ASYNC_DB_POOL_MIN_SIZE = int(os.environ.get("RAG_ASYNC_DB_POOL_MIN_SIZE", 1))
+RAG_ASYNC_DB_POOL_MAX_SIZE = int(os.environ.get("RAG_ASYNC_DB_POOL_MAX_SIZE", 10))
+
+# How RAGService.prepare_context orders query rewriting and retrieval:
+#   "sequential"   rewrite the query with the LLM, then retrieve on it
+#   "speculative"  retrieve on the raw query while the rewrite is in flight,
+#                  then search logs again with the rewritten query (and
+#                  entities too, if it names new ones) and fuse the results
+#   "skip_rewrite" retrieve on the raw query (plus history); no rewrite call
+RAG_RETRIEVAL_MODE = os.environ.get("RAG_RETRIEVAL_MODE", "sequential")
+
+# Worker threads shared by every request for the RAG pipeline's parallel
+# searches (rag_chat.services.fanout); each holds at most one DB connection.
+# When all are busy, searches run sequentially in the request thread.
+RAG_FANOUT_MAX_WORKERS = int(os.environ.get("RAG_FANOUT_MAX_WORKERS", 8))
+
+# Which HNSW index semantic search walks (rag_chat.vector_search):
+#   "full"     the float32 embedding index; exact similarities
+#   "halfvec"  the float16 expression index, half the size
+#   "binary"   the binary_quantize() expression index, 1/32 the size
+#   "short"    the 256-d embedding_short index, 1/6 the size
+# The coarse modes rerank their nearest RAG_VECTOR_RERANK_CANDIDATES
+# chunks by full-precision cosine similarity. Migrations don't build or drop
+# these indexes. After migrating and after each switch, run
+# `manage.py sync_vector_indexes`, which builds the configured mode's indexes
+# and drops the others (e.g. "halfvec" replaces the full-precision indexes).
+# Compare recall and latency first with `sync_vector_indexes --mode <mode>
+# --keep` and `compare_vector_indexes`.
+RAG_VECTOR_SEARCH = os.environ.get("RAG_VECTOR_SEARCH", "full")
+RAG_VECTOR_RERANK_CANDIDATES = int(os.environ.get("RAG_VECTOR_RERANK_CANDIDATES", 100))
+
+# Per-query pgvector HNSW settings (overridable per call on semantic_search).
+# An HNSW scan returns at most RAG_HNSW_EF_SEARCH rows, so keep it at least
+# RAG_VECTOR_RERANK_CANDIDATES. RAG_HNSW_ITERATIVE_SCAN ("strict_order" or
+# "relaxed_order", needs pgvector >= 0.8) keeps scanning when filters drop
+# rows; empty leaves it off.
+RAG_HNSW_EF_SEARCH = int(os.environ.get("RAG_HNSW_EF_SEARCH", 100))
+RAG_HNSW_ITERATIVE_SCAN = os.environ.get("RAG_HNSW_ITERATIVE_SCAN", "")
+
+# How retrieved game logs appear in the chat context:
+#   "full"    each log's complete text
+#   "chunks"  logs over RAG_LOG_FULL_TEXT_MAX_TOKENS are cut down to the
+#             chunks that matched the query, plus RAG_LOG_CHUNK_NEIGHBOURS
+#             chunks either side; shorter logs keep their full text
+RAG_LOG_CONTEXT_MODE = os.environ.get("RAG_LOG_CONTEXT_MODE", "full")
+RAG_LOG_FULL_TEXT_MAX_TOKENS = int(os.environ.get("RAG_LOG_FULL_TEXT_MAX_TOKENS", 4000))
+RAG_LOG_CHUNK_NEIGHBOURS = int(os.environ.get("RAG_LOG_CHUNK_NEIGHBOURS", 1))
+
+# Debounced reindexing of edited content (rag_chat.services.reindex_queue)
+# Saves of indexed entities and logs (and changes to their aliases, logs or
+# places) re-embed the object once it has gone RAG_REINDEX_QUIET_SECONDS
+# without another edit. The pending set lives in the shared cache; without it
+# every edit schedules its own reindex. RAG_AUTO_REINDEX=False turns the
+# hooks off, e.g. for bulk imports.
+RAG_AUTO_REINDEX = os.environ.get("RAG_AUTO_REINDEX", "True") == "True"
+RAG_REINDEX_QUIET_SECONDS = int(os.environ.get("RAG_REINDEX_QUIET_SECONDS", 30))
+RAG_REINDEX_CACHE_ALIAS = os.environ.get("RAG_REINDEX_CACHE_ALIAS", "shared")
+
+# Full-corpus embedding jobs (rag_chat.tasks.process_all_content)
+# Objects are processed RAG_EMBED_BATCH_SIZE to a Celery task, with at most
+# RAG_EMBED_CONCURRENCY tasks running at once. Raise the concurrency until the
+# embeddings rate limit, not the queue, bounds a full re-embed.
+RAG_EMBED_BATCH_SIZE = int(os.environ.get("RAG_EMBED_BATCH_SIZE", 20))
+RAG_EMBED_CONCURRENCY = int(os.environ.get("RAG_EMBED_CONCURRENCY", 4))
+# A failed object is retried in its batch after this many seconds, doubling
+# per attempt, like process_content's own retries
+RAG_EMBED_RETRY_DELAY = int(os.environ.get("RAG_EMBED_RETRY_DELAY", 10))
+
+# Chat response cache (rag_chat.services.response_cache)
+# Answers to questions asked without conversation history are reused for
+# RESPONSE_CACHE_TTL seconds (0 disables the cache), or until content changes.
+# Near-duplicate questions hit when their embeddings are at least this similar
+# (1 limits hits to exact matches). The corpus version lives in the shared
+# cache; without it nothing is cached.
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 60 * 60 * 24 * 7))
+RESPONSE_CACHE_SIMILARITY_THRESHOLD = float(
+    os.environ.get("RESPONSE_CACHE_SIMILARITY_THRESHOLD", 0.97)
+)
+RESPONSE_CACHE_ALIAS = os.environ.get("RESPONSE_CACHE_ALIAS", "shared")
+
 # Celery Configuration
-CELERY_BROKER_URL = os.environ.get("REDIS_URL", "redis://redis:6379/0")
+CELERY_BROKER_URL = REDIS_URL
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
+CELERY_BEAT_SCHEDULE = {
+    "evict-response-cache": {
+        "task": "rag_chat.tasks.evict_response_cache",
+        "schedule": 60 * 60,
+    },
+}
 
 # CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL")
 # CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND")
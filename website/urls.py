@@ -27,7 +27,7 @@ from website import settings
 
 # from strawberry.django.views import AsyncGraphQLView
 from .types import schema
-from rag_chat.views import chat_stream_view
+from rag_chat.views import chat_stream_view, chat_stream_view_async
 
 import logging
 
@@ -71,5 +71,6 @@ urlpatterns = [
         csrf_exempt(GraphQLView.as_view(schema=schema)),
     ),
     path("api/chat/stream/", chat_stream_view),
+    path("api/chat/stream/async/", chat_stream_view_async),
     # path("graphql/", AsyncGraphQLView.as_view(schema=schema)),
 ]